@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, FrozenSet, Optional, Sequence
+
+import pandas as pd
+
+WEEKDAY_LABELS = ["月", "火", "水", "木", "金", "土", "日"]
+CALENDAR_COLUMNS = [
+    "date",
+    "weekday",
+    "weekday_index",
+    "is_weekday",
+    "is_holiday",
+    "week_index",
+    "week_start_date",
+    "iso_year",
+    "iso_week",
+    "iso_week_key",
+]
+
+
+def _as_date(value) -> date:
+    if isinstance(value, date) and not isinstance(value, pd.Timestamp):
+        return value
+    return pd.Timestamp(value).date()
+
+
+@dataclass(frozen=True)
+class CalendarConfig:
+    """日付ごとの週番号・曜日判定の設定。
+
+    - week_start: 週の開始曜日（0=月曜 … 6=日曜）。当月内の週番号と週開始日に使う
+    - holidays: 祝日・休業日。is_holiday が立ち、is_weekday（平日）から外れる
+    ISO 週（iso_week_key）は week_start によらず月曜始まり。
+    """
+
+    week_start: int = 0
+    holidays: FrozenSet[date] = field(default_factory=frozenset)
+
+    def __post_init__(self) -> None:
+        if not 0 <= int(self.week_start) <= 6:
+            raise ValueError(f"week_start must be 0 (Monday) .. 6 (Sunday): {self.week_start}")
+        object.__setattr__(self, "week_start", int(self.week_start))
+        object.__setattr__(self, "holidays", frozenset(_as_date(value) for value in self.holidays))
+
+    def to_dict(self) -> Dict:
+        return {"week_start": self.week_start, "holidays": sorted(day.isoformat() for day in self.holidays)}
+
+
+DEFAULT_CALENDAR = CalendarConfig()
+
+
+def load_holidays(source, column: Optional[str] = None) -> FrozenSet[date]:
+    """祝日カレンダー（CSV）を読み込む。column 省略時は "date" 列、無ければ先頭列を日付として使う。"""
+
+    frame = pd.read_csv(source, dtype=str)
+    if frame.empty:
+        return frozenset()
+    if column is None:
+        column = "date" if "date" in frame.columns else frame.columns[0]
+    dates = pd.to_datetime(frame[column].str.strip(), errors="coerce", format="mixed").dropna()
+    return frozenset(dates.dt.date)
+
+
+@dataclass(frozen=True)
+class CalendarDay:
+    weekday: str
+    weekday_index: int
+    is_weekday: bool
+    is_holiday: bool
+    week_index: int
+    week_start_date: date
+    iso_year: int
+    iso_week: int
+
+    @property
+    def iso_week_key(self) -> int:
+        return self.iso_year * 100 + self.iso_week
+
+
+@lru_cache(maxsize=8192)
+def calendar_day(day: date, calendar: CalendarConfig = DEFAULT_CALENDAR) -> CalendarDay:
+    """1日分の暦情報（日付・設定ごとにキャッシュ）。"""
+
+    weekday_index = day.weekday()
+    offset = (weekday_index - calendar.week_start) % 7
+    first_offset = (day.replace(day=1).weekday() - calendar.week_start) % 7
+    is_holiday = day in calendar.holidays
+    iso_year, iso_week, _ = day.isocalendar()
+    return CalendarDay(
+        weekday=WEEKDAY_LABELS[weekday_index],
+        weekday_index=weekday_index,
+        is_weekday=weekday_index < 5 and not is_holiday,
+        is_holiday=is_holiday,
+        # 月初を含む週を 1 とする（week_start=0 なら compute_week_index と同じ）
+        week_index=(day.day - 1 + first_offset) // 7 + 1,
+        week_start_date=day - timedelta(days=offset),
+        iso_year=iso_year,
+        iso_week=iso_week,
+    )
+
+
+@lru_cache(maxsize=512)
+def _month_table(year: int, month: int, calendar: CalendarConfig) -> pd.DataFrame:
+    start = date(year, month, 1)
+    days = [start + timedelta(days=offset) for offset in range(31)]
+    days = [day for day in days if day.month == month]
+    rows = []
+    for day in days:
+        info = calendar_day(day, calendar)
+        rows.append(
+            (day, info.weekday, info.weekday_index, info.is_weekday, info.is_holiday, info.week_index,
+             info.week_start_date, info.iso_year, info.iso_week, info.iso_week_key)
+        )
+    table = pd.DataFrame(rows, columns=CALENDAR_COLUMNS, index=pd.DatetimeIndex([pd.Timestamp(day) for day in days]))
+    # 週次集計でそのまま min を取れるよう週開始日は datetime64 で持つ
+    table["week_start_date"] = pd.to_datetime(table["week_start_date"])
+    return table
+
+
+def calendar_table(start, end, calendar: Optional[CalendarConfig] = None) -> pd.DataFrame:
+    """[start, end] の暦テーブル（1日1行、index と week_start_date は datetime64）。月単位で構築してキャッシュする。
+
+    返す DataFrame はキャッシュと共有しうるため、呼び出し側で変更しないこと。
+    """
+
+    calendar = calendar or DEFAULT_CALENDAR
+    start, end = _as_date(start), _as_date(end)
+    if end < start:
+        return pd.DataFrame(columns=CALENDAR_COLUMNS)
+    months = pd.period_range(start, end, freq="M")
+    tables = [_month_table(period.year, period.month, calendar) for period in months]
+    table = tables[0] if len(tables) == 1 else pd.concat(tables)
+    return table.loc[pd.Timestamp(start) : pd.Timestamp(end)]
+
+
+def join_calendar(
+    dates: pd.Series,
+    calendar: Optional[CalendarConfig] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """日付列に暦テーブルを結合し、dates と同じ index の DataFrame を返す。
+
+    異なる日付（月あたり高々31個）だけで暦テーブルを引き、行ごとの計算はしない。
+    dates に欠損があってはならない。
+    """
+
+    columns = list(columns) if columns is not None else CALENDAR_COLUMNS
+    timestamps = pd.to_datetime(dates)
+    if timestamps.empty:
+        return pd.DataFrame({column: pd.Series(dtype=object) for column in columns}, index=dates.index)
+    codes, uniques = pd.factorize(timestamps.dt.normalize())
+    if (codes < 0).any():
+        raise ValueError("dates must not contain missing values")
+    table = calendar_table(uniques.min(), uniques.max(), calendar).reindex(uniques)[columns]
+    joined = {column: table[column].to_numpy()[codes] for column in columns}
+    return pd.DataFrame(joined, index=dates.index, columns=columns)
+
+
+def apply_calendar(df: pd.DataFrame, calendar: Optional[CalendarConfig] = None) -> pd.DataFrame:
+    """ShiftRecord / raw テーブルの weekday・week_index・is_weekday を暦設定に合わせて付け直す。"""
+
+    if df.empty or "date" not in df.columns:
+        return df
+    joined = join_calendar(df["date"], calendar, ["weekday", "week_index", "is_weekday"])
+    return df.assign(
+        weekday=joined["weekday"],
+        week_index=joined["week_index"].astype("int64"),
+        is_weekday=joined["is_weekday"].astype(bool),
+    )
+
+
+__all__ = [
+    "CALENDAR_COLUMNS",
+    "CalendarConfig",
+    "CalendarDay",
+    "DEFAULT_CALENDAR",
+    "WEEKDAY_LABELS",
+    "apply_calendar",
+    "calendar_day",
+    "calendar_table",
+    "join_calendar",
+    "load_holidays",
+]
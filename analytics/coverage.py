@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from .calendar_dim import WEEKDAY_LABELS
+from .profiling import timed
+from .timeparse import MINUTES_PER_DAY, MINUTES_TO_HHMM, duration_minutes, parse_hhmm_series
+
+COVERAGE_GROUPS = ("weekday", "date")
+DEFAULT_BIN_MINUTES = 15
+# 日付の曜日（1970-01-01 は木曜 = 3）
+_EPOCH_WEEKDAY = 3
+
+
+def _minute_grid(shift_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(日数, 1440) の分単位の在籍人数と、各行の日付（エポックからの日数）を返す。
+
+    各レコードの [入, 退) を区間にし、開始位置に +1・終了位置に -1 を置いた差分配列の
+    累積和で数える（レコードごとのループはしない）。退が入より前なら日付をまたぐ勤務として翌日に続ける。
+    範囲はデータの最初の日付〜最後の日付で、最後の日付からはみ出した分は数えない。
+    """
+
+    codes, uniques = pd.factorize(shift_df["date"])
+    unique_days = pd.to_datetime(pd.Series(uniques)).to_numpy().astype("datetime64[D]").astype("int64")
+    valid_days = unique_days[codes[codes >= 0]] if len(unique_days) else np.empty(0, dtype="int64")
+    if valid_days.size == 0:
+        return np.empty((0, MINUTES_PER_DAY), dtype="int64"), np.empty(0, dtype="int64")
+    first, last = int(valid_days.min()), int(valid_days.max())
+    days = np.arange(first, last + 1)
+
+    start = parse_hhmm_series(shift_df["start_time"]).to_numpy()
+    duration = duration_minutes(start, parse_hhmm_series(shift_df["end_time"]))
+    valid = (codes >= 0) & ~np.isnan(duration) & (duration > 0)
+    if not valid.any():
+        return np.zeros((len(days), MINUTES_PER_DAY), dtype="int64"), days
+
+    offset = (unique_days[codes[valid]] - first) * MINUTES_PER_DAY + start[valid].astype("int64")
+    stop = offset + duration[valid].astype("int64")
+    # 入時刻は 47:59 まで、勤務は 24 時間までなので、最後の日付の後ろに 3 日分あれば収まる
+    size = (len(days) + 3) * MINUTES_PER_DAY
+    diff = np.bincount(offset, minlength=size) - np.bincount(stop, minlength=size)
+    grid = np.cumsum(diff[:size])[: len(days) * MINUTES_PER_DAY].reshape(len(days), MINUTES_PER_DAY)
+    return grid, days
+
+
+@timed("coverage.staffing")
+def staffing_coverage(
+    shift_df: pd.DataFrame,
+    by: str = "weekday",
+    bin_minutes: int = DEFAULT_BIN_MINUTES,
+) -> pd.DataFrame:
+    """時刻ごとの在籍人数（曜日別または日付別）を bin_minutes 分刻みで返す（縦長の表）。
+
+    - by="date": 日付×時刻ごとの人数
+    - by="weekday": 曜日×時刻ごとの、その曜日の日付1日あたりの平均人数（days はその曜日の日数）
+    headcount は刻み内の平均人数、peak は刻み内の最大人数。minute は刻みの開始（0時からの分）。
+    minutes==0 の行（非勤務・欠損）は数えない。
+    """
+
+    if by not in COVERAGE_GROUPS:
+        raise ValueError(f"by must be one of {COVERAGE_GROUPS}: {by}")
+    bin_minutes = int(bin_minutes)
+    if bin_minutes <= 0 or MINUTES_PER_DAY % bin_minutes:
+        raise ValueError(f"bin_minutes must divide {MINUTES_PER_DAY}: {bin_minutes}")
+
+    keys = ["date", "weekday"] if by == "date" else ["weekday", "days"]
+    columns = [*keys, "minute", "time", "headcount", "peak"]
+    if shift_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    grid, days = _minute_grid(shift_df)
+    weekday = (days + _EPOCH_WEEKDAY) % 7
+    if by == "date":
+        curves = grid.astype("float64")
+        labels = {
+            "date": pd.to_datetime(days, unit="D").date,
+            "weekday": np.asarray(WEEKDAY_LABELS, dtype=object)[weekday],
+        }
+    else:
+        counts = np.bincount(weekday, minlength=7)
+        present = np.flatnonzero(counts)
+        sums = np.zeros((7, MINUTES_PER_DAY))
+        np.add.at(sums, weekday, grid)
+        curves = sums[present] / counts[present, None]
+        labels = {"weekday": np.asarray(WEEKDAY_LABELS, dtype=object)[present], "days": counts[present]}
+
+    n_bins = MINUTES_PER_DAY // bin_minutes
+    binned = curves.reshape(len(curves), n_bins, bin_minutes)
+    minutes = np.arange(n_bins) * bin_minutes
+    frame = {name: np.repeat(values, n_bins) for name, values in labels.items()}
+    frame.update(
+        minute=np.tile(minutes, len(curves)),
+        time=np.tile(MINUTES_TO_HHMM[minutes], len(curves)),
+        headcount=binned.mean(axis=2).ravel(),
+        peak=binned.max(axis=2).ravel(),
+    )
+    return pd.DataFrame(frame, columns=columns)
+
+
+__all__ = ["COVERAGE_GROUPS", "DEFAULT_BIN_MINUTES", "staffing_coverage"]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+from typing import IO, Dict, Iterator, Union
+
+import pandas as pd
+
+from .stats import StatsBundle
+
+EXPORT_FORMATS = ("csv", "parquet")
+# CSV をこの行数ずつ文字列化して書き出す（全体を1つの bytes にしない）
+CSV_CHUNK_ROWS = 50_000
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def export_tables(shift_df: pd.DataFrame, stats: StatsBundle) -> Dict[str, pd.DataFrame]:
+    """エクスポート対象のテーブル（ファイル名の stem → DataFrame）。"""
+
+    return {"shift_records": shift_df, **stats.tables()}
+
+
+def export_csv(df: pd.DataFrame) -> bytes:
+    """1テーブルを Excel で開ける UTF-8 (BOM 付き) の CSV にする（画面の個別ダウンロード用）。"""
+
+    return df.to_csv(index=False).encode("utf-8-sig")
+
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[bytes]:
+    """Excel で開ける UTF-8 (BOM 付き) の CSV を chunk_rows 行ずつ返す。"""
+
+    chunk_rows = max(1, int(chunk_rows))
+    yield UTF8_BOM + df.head(0).to_csv(index=False).encode("utf-8")
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start : start + chunk_rows].to_csv(index=False, header=False).encode("utf-8")
+
+
+def write_table(df: pd.DataFrame, fh: IO[bytes], fmt: str = "csv", chunk_rows: int = CSV_CHUNK_ROWS) -> None:
+    """1テーブルをバイナリストリームに書き出す。"""
+
+    if fmt == "csv":
+        for chunk in iter_csv_chunks(df, chunk_rows):
+            fh.write(chunk)
+    elif fmt == "parquet":
+        df.to_parquet(fh, index=False)
+    else:
+        raise ValueError(f"unsupported export format: {fmt}")
+
+
+def write_export_bundle(
+    target: Union[str, Path, IO[bytes]],
+    tables: Dict[str, pd.DataFrame],
+    fmt: str = "csv",
+    chunk_rows: int = CSV_CHUNK_ROWS,
+) -> None:
+    """全テーブルを1つの ZIP に書き出す。各エントリへは逐次書き込む。"""
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unsupported export format: {fmt}")
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, df in tables.items():
+            with archive.open(f"{name}.{fmt}", "w", force_zip64=True) as fh:
+                write_table(df, fh, fmt, chunk_rows)
+
+
+def write_export_dir(
+    directory: Union[str, Path],
+    tables: Dict[str, pd.DataFrame],
+    fmt: str = "csv",
+    chunk_rows: int = CSV_CHUNK_ROWS,
+) -> None:
+    """全テーブルを directory/<name>.<fmt> に書き出す。"""
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, df in tables.items():
+        with open(directory / f"{name}.{fmt}", "wb") as fh:
+            write_table(df, fh, fmt, chunk_rows)
+
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "export_csv",
+    "export_tables",
+    "iter_csv_chunks",
+    "write_export_bundle",
+    "write_export_dir",
+    "write_table",
+]
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from .memo import frame_fingerprint
+from .stats import SHIFT_RECORD_COLUMNS, StatsBundle, build_shift_frame, compute_all_stats, with_iso_week_index
+
+DEFAULT_HISTORY_DIR = Path(
+    os.environ.get("SHIFTSUMMA_HISTORY_DIR", Path.home() / ".local" / "share" / "shiftsumma" / "history")
+)
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+_MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+
+
+def _arrow_schema():
+    """保存時・読み込み時に使う固定スキーマ（欠損だけの列があってもパーツ間で型を揃える）。"""
+
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("employee_id", pa.string()),
+            ("date", pa.date32()),
+            ("weekday", pa.string()),
+            ("week_index", pa.int64()),
+            ("start_time", pa.string()),
+            ("end_time", pa.string()),
+            ("minutes", pa.int64()),
+            ("slot", pa.string()),
+            ("is_half", pa.bool_()),
+            ("is_weekday", pa.bool_()),
+            ("raw_status", pa.string()),
+        ]
+    )
+
+
+def _as_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    return pd.Timestamp(value).date()
+
+
+class ShiftHistoryStore:
+    """月ごとに分割して ShiftRecord を保存するローカルストア。
+
+    root/
+      manifest.json                  … 月ごとのパーツ一覧（件数・日付範囲・社員数・元ファイル名）
+      month=YYYY-MM/<part>.parquet   … 1回の追加（元ファイル）ごとに1ファイル
+
+    同じ source を同じ月に追加し直すとそのパーツを置き換える。
+    query は manifest の日付範囲で読むファイルを絞り、日付・社員の条件は Parquet 読み込み時に適用する。
+    """
+
+    def __init__(self, root: str | Path = DEFAULT_HISTORY_DIR) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    # --- manifest ---
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    def manifest(self) -> Dict:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"version": MANIFEST_VERSION, "months": {}}
+        if data.get("version") != MANIFEST_VERSION:
+            return {"version": MANIFEST_VERSION, "months": {}}
+        return data
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_name, self.manifest_path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def months(self) -> List[str]:
+        return sorted(self.manifest()["months"])
+
+    # --- 書き込み ---
+
+    def _part_path(self, month: str, part: str) -> Path:
+        return self.root / f"month={month}" / f"{part}.parquet"
+
+    def append(self, shift_df: pd.DataFrame, source: Optional[str] = None) -> List[str]:
+        """ShiftRecord DataFrame を月ごとに分けて保存し、書き込んだ月を返す。
+
+        source（元ファイル名など）が同じ追加は置き換える。省略時は内容ハッシュを使うため、
+        同じデータを何度追加しても重複しない。
+        """
+
+        if shift_df.empty:
+            return []
+        missing = [column for column in SHIFT_RECORD_COLUMNS if column not in shift_df.columns]
+        if missing:
+            raise ValueError(f"ShiftRecord DataFrame is missing columns: {', '.join(missing)}")
+        source = source or frame_fingerprint(shift_df)[:16]
+        part = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+        frame = shift_df[SHIFT_RECORD_COLUMNS]
+        schema = _arrow_schema()
+        dates = pd.to_datetime(frame["date"])
+        month_keys = dates.dt.strftime("%Y-%m")
+
+        written: List[str] = []
+        updated_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            manifest = self.manifest()
+            for month, rows in frame.groupby(month_keys, sort=True):
+                path = self._part_path(month, part)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                rows = rows.sort_values(["date", "employee_id"], kind="stable").reset_index(drop=True)
+                fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                os.close(fd)
+                try:
+                    rows.to_parquet(tmp_name, index=False, schema=schema)
+                    os.replace(tmp_name, path)
+                finally:
+                    if os.path.exists(tmp_name):
+                        os.remove(tmp_name)
+                month_dates = pd.to_datetime(rows["date"])
+                manifest["months"].setdefault(month, {})[part] = {
+                    "source": source,
+                    "rows": int(len(rows)),
+                    "employees": int(rows["employee_id"].nunique()),
+                    "min_date": month_dates.min().date().isoformat(),
+                    "max_date": month_dates.max().date().isoformat(),
+                    "updated_at": updated_at,
+                }
+                written.append(month)
+            self._write_manifest(manifest)
+        return written
+
+    def remove_month(self, month: str) -> None:
+        if not _MONTH_PATTERN.match(month):
+            raise ValueError(f"month must be YYYY-MM: {month}")
+        with self._lock:
+            manifest = self.manifest()
+            for part in manifest["months"].pop(month, {}):
+                try:
+                    self._part_path(month, part).unlink()
+                except OSError:
+                    continue
+            self._write_manifest(manifest)
+
+    # --- 読み込み ---
+
+    def _parts_in_range(self, start: Optional[date], end: Optional[date]) -> List[Path]:
+        paths = []
+        for month, parts in sorted(self.manifest()["months"].items()):
+            for part, info in sorted(parts.items()):
+                # 日付範囲が重ならないパーツは開かない
+                if start is not None and date.fromisoformat(info["max_date"]) < start:
+                    continue
+                if end is not None and date.fromisoformat(info["min_date"]) > end:
+                    continue
+                paths.append(self._part_path(month, part))
+        return paths
+
+    def query(
+        self,
+        start=None,
+        end=None,
+        employee_ids: Optional[Iterable[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """[start, end]（両端含む）の ShiftRecord を返す。employee_ids で社員を絞り込める。"""
+
+        import pyarrow.parquet as pq
+
+        start, end = _as_date(start), _as_date(end)
+        columns = list(columns) if columns is not None else list(SHIFT_RECORD_COLUMNS)
+        paths = self._parts_in_range(start, end)
+        if not paths:
+            return build_shift_frame([])[columns]
+
+        filters = []
+        if start is not None:
+            filters.append(("date", ">=", start))
+        if end is not None:
+            filters.append(("date", "<=", end))
+        if employee_ids is not None:
+            filters.append(("employee_id", "in", [str(employee_id) for employee_id in employee_ids]))
+
+        table = pq.read_table(
+            [str(path) for path in paths], columns=columns, filters=filters or None, schema=_arrow_schema()
+        )
+        result = table.to_pandas()
+        if "date" in result.columns and not result.empty:
+            result = result.sort_values(["date", "employee_id"] if "employee_id" in result.columns else ["date"], kind="stable")
+        return result.reset_index(drop=True)
+
+    def compute_stats(self, start=None, end=None, employee_ids: Optional[Iterable[str]] = None) -> StatsBundle:
+        """期間内の集計。週は ISO 週キー（例: 202601）で数えるため月をまたいで連続する。"""
+
+        return compute_all_stats(with_iso_week_index(self.query(start, end, employee_ids)))
+
+
+__all__ = ["DEFAULT_HISTORY_DIR", "ShiftHistoryStore"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .profiling import timed
+from .stats import SHIFT_RECORD_COLUMNS
+
+# 同じ (employee_id, date) が複数ファイルにある場合に残す行
+# - "last": 後に指定したファイルの行
+# - "first": 先に指定したファイルの行
+# - "max_minutes": 実働分の長い行（同じなら後のファイル）
+CONFLICT_POLICIES = ("last", "first", "max_minutes")
+# 競合の判定に使う列（曜日・週番号などは日付から決まるので比べない）
+CONTENT_COLUMNS = ["start_time", "end_time", "minutes", "slot", "raw_status"]
+
+
+@dataclass
+class MergeResult:
+    """結合した ShiftRecord と、内容が食い違った行の一覧。
+
+    - frame: (employee_id, date) ごとに1行に絞った ShiftRecord（社員・日付順）
+    - conflicts: 勤務内容（CONTENT_COLUMNS）が異なる候補があったキーの全候補。source（ファイル名）と kept（採用した行か）つき
+    - duplicates: 取り除いた行数（内容が同じ重複も含む）
+    """
+
+    frame: pd.DataFrame
+    conflicts: pd.DataFrame
+    duplicates: int
+
+
+@timed("merge.shift_frames")
+def merge_shift_frames(
+    frames: Sequence[pd.DataFrame],
+    policy: str = "last",
+    sources: Optional[Sequence[str]] = None,
+) -> MergeResult:
+    """複数ファイルの ShiftRecord DataFrame を1つにまとめ、(employee_id, date) の重複を policy で解消する。
+
+    1回の concat のあと、キーを整数コードにして並べ替え・境界判定し、最後に残す行だけを取り出す。
+    行ごとの比較や DataFrame の逐次追加はしない。sources は frames と同じ順のファイル名（省略時は "0", "1", ...）。
+    """
+
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"policy must be one of {CONFLICT_POLICIES}: {policy}")
+    frames = list(frames)
+    sources = [str(name) for name in sources] if sources is not None else [str(index) for index in range(len(frames))]
+    if len(sources) != len(frames):
+        raise ValueError("sources must have the same length as frames")
+
+    parts = [(index, frame) for index, frame in enumerate(frames) if not frame.empty]
+    columns = list(parts[0][1].columns) if parts else list(SHIFT_RECORD_COLUMNS)
+    if not parts:
+        return MergeResult(pd.DataFrame(columns=columns), pd.DataFrame(columns=[*columns, "source", "kept"]), 0)
+
+    combined = pd.concat([frame for _, frame in parts], ignore_index=True)[columns]
+    order = np.repeat([index for index, _ in parts], [len(frame) for _, frame in parts])
+    group = _key_codes(combined)
+
+    # 同じキーの中で残す行が末尾（first なら先頭）に来るよう並べ、キーの境界で1行ずつ取る
+    sort_keys = (order, group) if policy != "max_minutes" else (order, combined["minutes"].to_numpy(), group)
+    positions = np.lexsort(sort_keys)
+    sorted_group = group[positions]
+    if policy == "first":
+        boundary = np.r_[True, sorted_group[1:] != sorted_group[:-1]]
+    else:
+        boundary = np.r_[sorted_group[1:] != sorted_group[:-1], True]
+    kept = positions[boundary]
+
+    # 重複のうち、勤務内容が候補間で異なるキーだけを競合として返す
+    sizes = np.bincount(group)
+    candidates = np.flatnonzero(sizes[group] > 1)
+    content_columns = [column for column in CONTENT_COLUMNS if column in combined.columns]
+    content = pd.util.hash_pandas_object(combined[content_columns].take(candidates), index=False).to_numpy()
+    distinct = pd.DataFrame({"group": group[candidates], "content": content}).drop_duplicates()
+    variants = np.bincount(distinct["group"].to_numpy(), minlength=len(sizes))
+    in_conflict = candidates[variants[group[candidates]] > 1]
+    in_conflict = in_conflict[np.lexsort((order[in_conflict], group[in_conflict]))]
+    conflicts = combined.take(in_conflict).assign(
+        source=np.asarray(sources, dtype=object)[order[in_conflict]],
+        kept=np.isin(in_conflict, kept),
+    ).reset_index(drop=True)
+
+    frame = combined.take(kept).reset_index(drop=True)
+    return MergeResult(frame=frame, conflicts=conflicts, duplicates=len(combined) - len(frame))
+
+
+def _key_codes(frame: pd.DataFrame) -> np.ndarray:
+    """(employee_id, date) ごとの整数コード（社員番号・日付の昇順）。
+
+    型の違い（文字列/カテゴリ、date/Timestamp）があってもキーが一致するよう正規化して比べる。
+    """
+
+    employee, _ = pd.factorize(frame["employee_id"].astype(str), sort=True)
+    days = pd.to_datetime(frame["date"]).dt.normalize().to_numpy().astype("datetime64[D]").astype("int64")
+    days -= days.min()
+    codes, _ = pd.factorize(employee.astype("int64") * (int(days.max()) + 1) + days, sort=True)
+    return codes
+
+
+__all__ = ["CONFLICT_POLICIES", "CONTENT_COLUMNS", "MergeResult", "merge_shift_frames"]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from datetime import date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class ShiftRecord:
     """社員×日単位のシフト基本モデル。"""
 
@@ -22,7 +24,11 @@ class ShiftRecord:
     raw_status: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        # 値はすべて不変なので asdict の deepcopy は不要
+        return {name: getattr(self, name) for name in SHIFT_RECORD_FIELDS}
+
+
+SHIFT_RECORD_FIELDS = tuple(f.name for f in fields(ShiftRecord))
 
 
 @dataclass
@@ -69,10 +75,118 @@ class ShiftParseConfig:
 
     full_threshold_minutes: int = 270  # 4.5h
     half_min_minutes: int = 180  # 3h
+    # 半日の AM/PM 判定（0時からの経過分）: 退が am_end 以前なら AM、入が pm_start 以降なら PM
+    am_end_minutes: int = 14 * 60 + 30  # 14:30
+    pm_start_minutes: int = 13 * 60 + 30  # 13:30
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
 
-def records_to_dicts(records: List[ShiftRecord]) -> List[Dict[str, Any]]:
+class ShiftRecordBatch:
+    """ShiftRecord の列を型付き配列で保持するコンテナ。
+
+    レコードごとのオブジェクトは持たず、反復・添字アクセス時に ShiftRecord を都度生成する。
+    DataFrame との相互変換は列単位で行う。
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    # 列ごとの格納型（文字列は欠損を None とする object 配列）
+    FIELD_DTYPES: Dict[str, Any] = {
+        "employee_id": object,
+        "date": "datetime64[D]",
+        "weekday": object,
+        "week_index": np.int32,
+        "start_time": object,
+        "end_time": object,
+        "minutes": np.int32,
+        "slot": object,
+        "is_half": np.bool_,
+        "is_weekday": np.bool_,
+        "raw_status": object,
+    }
+
+    def __init__(self, columns: Dict[str, Any]) -> None:
+        missing = [name for name in SHIFT_RECORD_FIELDS if name not in columns]
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(missing)}")
+        arrays = {name: np.asarray(columns[name], dtype=self.FIELD_DTYPES[name]) for name in SHIFT_RECORD_FIELDS}
+        lengths = {len(array) for array in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError("all columns must have the same length")
+        for array in arrays.values():
+            array.flags.writeable = False
+        self._columns = arrays
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[ShiftRecord]) -> "ShiftRecordBatch":
+        records = list(records)
+        return cls({name: [getattr(record, name) for record in records] for name in SHIFT_RECORD_FIELDS})
+
+    @classmethod
+    def from_frame(cls, df) -> "ShiftRecordBatch":
+        """ShiftRecord DataFrame（build_shift_frame / to_dataframe の出力）から生成。"""
+
+        columns: Dict[str, Any] = {}
+        for name, dtype in cls.FIELD_DTYPES.items():
+            values = df[name]
+            if dtype is object:
+                columns[name] = values.astype(object).where(values.notna(), None).to_numpy()
+            elif name == "date":
+                columns[name] = values.to_numpy(dtype="datetime64[D]")
+            else:
+                columns[name] = values.to_numpy()
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[ShiftRecord]:
+        values = [self._python_values(name) for name in SHIFT_RECORD_FIELDS]
+        for row in zip(*values):
+            yield ShiftRecord(*row)
+
+    def __getitem__(self, index: int) -> ShiftRecord:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ShiftRecordBatch index out of range")
+        # 1要素スライスの tolist() で numpy スカラーも Python の値に揃える
+        return ShiftRecord(*(self._columns[name][index : index + 1].tolist()[0] for name in SHIFT_RECORD_FIELDS))
+
+    def column(self, name: str) -> np.ndarray:
+        """列の配列（読み取り専用）を返す。"""
+
+        return self._columns[name]
+
+    def _python_values(self, name: str) -> List[Any]:
+        # datetime64[D] は tolist() で date になる
+        return self._columns[name].tolist()
+
+    def to_frame(self):
+        """ShiftRecord DataFrame に変換（dict をレコードごとに作らない）。"""
+
+        import pandas as pd
+
+        data = {}
+        for name in SHIFT_RECORD_FIELDS:
+            array = self._columns[name]
+            if name == "date":
+                data[name] = array.astype(object)
+            elif array.dtype.kind in "iu":
+                data[name] = array.astype(np.int64)
+            else:
+                data[name] = array
+        return pd.DataFrame(data, columns=list(SHIFT_RECORD_FIELDS))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        values = [self._python_values(name) for name in SHIFT_RECORD_FIELDS]
+        return [dict(zip(SHIFT_RECORD_FIELDS, row)) for row in zip(*values)]
+
+
+def records_to_dicts(records: Union[Iterable[ShiftRecord], ShiftRecordBatch]) -> List[Dict[str, Any]]:
+    if isinstance(records, ShiftRecordBatch):
+        return records.to_dicts()
     return [record.to_dict() for record in records]
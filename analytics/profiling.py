@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+PROFILE_FORMAT_VERSION = 1
+SUMMARY_COLUMNS = ["name", "calls", "total_s", "max_s", "rows", "pages"]
+
+# 計測中の RunProfile。無効時は None で、span / timed はほぼ何もしない
+_active: ContextVar[Optional["RunProfile"]] = ContextVar("shiftsumma_profile", default=None)
+
+
+@dataclass
+class Span:
+    """名前付きの計測区間。start は計測開始からの経過秒、depth は入れ子の深さ。"""
+
+    name: str
+    start: float
+    seconds: float = 0.0
+    depth: int = 0
+    rows: Optional[int] = None
+    pages: Optional[int] = None
+
+    def add(self, rows: int = 0, pages: int = 0) -> None:
+        """処理した行数・ページ数を加算する。"""
+
+        if rows:
+            self.rows = (self.rows or 0) + int(rows)
+        if pages:
+            self.pages = (self.pages or 0) + int(pages)
+
+
+class _NullSpan:
+    """計測無効時に返す何もしない区間（全呼び出しで共有）。"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def add(self, rows: int = 0, pages: int = 0) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _SpanContext:
+    __slots__ = ("profile", "span")
+
+    def __init__(self, profile: "RunProfile", name: str, rows: Optional[int], pages: Optional[int]) -> None:
+        self.profile = profile
+        self.span = Span(name=name, start=0.0, rows=rows, pages=pages)
+
+    def __enter__(self) -> Span:
+        profile = self.profile
+        self.span.depth = profile._depth
+        profile._depth += 1
+        profile.spans.append(self.span)
+        self.span.start = time.perf_counter() - profile._origin
+        return self.span
+
+    def __exit__(self, *exc) -> bool:
+        profile = self.profile
+        self.span.seconds = time.perf_counter() - profile._origin - self.span.start
+        profile._depth -= 1
+        return False
+
+
+@dataclass
+class RunProfile:
+    """1回の実行（Streamlit の再実行・CLI の1ファイルなど）で記録した計測区間。"""
+
+    label: str = ""
+    spans: List[Span] = field(default_factory=list)
+    total_seconds: float = 0.0
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    cprofile_text: Optional[str] = None
+    _origin: float = field(default_factory=time.perf_counter, repr=False)
+    _depth: int = field(default=0, repr=False)
+
+    def summary(self) -> pd.DataFrame:
+        """区間名ごとの呼び出し回数・合計/最大秒数・行数・ページ数（記録順）。"""
+
+        if not self.spans:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        frame = pd.DataFrame([asdict(span) for span in self.spans])
+        grouped = frame.groupby("name", sort=False).agg(
+            calls=("seconds", "size"),
+            total_s=("seconds", "sum"),
+            max_s=("seconds", "max"),
+            rows=("rows", lambda values: values.sum(min_count=1)),
+            pages=("pages", lambda values: values.sum(min_count=1)),
+        )
+        return grouped.reset_index()[SUMMARY_COLUMNS].astype({"rows": "Int64", "pages": "Int64"})
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": PROFILE_FORMAT_VERSION,
+            "label": self.label,
+            "created_at": self.created_at,
+            "total_seconds": self.total_seconds,
+            "spans": [asdict(span) for span in self.spans],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=1)
+
+
+def current_profile() -> Optional[RunProfile]:
+    return _active.get()
+
+
+def merge_profiles(profiles: Sequence[RunProfile]) -> RunProfile:
+    """先頭の RunProfile に、残り（ワーカースレッドの解析ジョブなど）の区間を加えたものを返す。
+
+    加えた区間の start は元の RunProfile の開始からの秒数のまま。total_seconds・cProfile は先頭のものを使う。
+    """
+
+    first, *others = profiles
+    if not others:
+        return first
+    return RunProfile(
+        label=first.label,
+        spans=[span for profile in profiles for span in profile.spans],
+        total_seconds=first.total_seconds,
+        created_at=first.created_at,
+        cprofile_text=first.cprofile_text,
+    )
+
+
+def span(name: str, rows: Optional[int] = None, pages: Optional[int] = None):
+    """with で囲んだ区間を計測する。計測無効時は共有の何もしないオブジェクトを返す。
+
+        with span("pdf.page", pages=1) as s:
+            rows = extract(page)
+            s.add(rows=len(rows))
+    """
+
+    profile = _active.get()
+    if profile is None:
+        return _NULL_SPAN
+    return _SpanContext(profile, name, rows, pages)
+
+
+def _input_rows(args) -> Optional[int]:
+    if args and isinstance(args[0], (pd.DataFrame, list, tuple)):
+        return len(args[0])
+    return None
+
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """関数呼び出し全体を計測するデコレーター。行数には第1引数（DataFrame / リスト）の件数を記録する。"""
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _active.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            with _SpanContext(profile, name, _input_rows(args), None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(name: str, iterable: Iterable[T], rows: Optional[Callable[[T], int]] = None) -> Iterator[T]:
+    """イテレーターの要素を1つ取り出すごとに計測する（ワーカーの結果待ちなど）。
+
+    ジェネレーターの yield をまたいで区間を開くと入れ子が崩れるため、取り出し処理だけを囲む。
+    """
+
+    profile = _active.get()
+    if profile is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with _SpanContext(profile, name, None, None) as current:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                profile.spans.remove(current)
+                return
+            if rows is not None:
+                current.add(rows=rows(item))
+        yield item
+
+
+@contextmanager
+def profile_run(enabled: bool = True, label: str = "", cprofile: bool = False) -> Iterator[Optional[RunProfile]]:
+    """区間の記録を有効にして RunProfile を返す。enabled=False なら None を返し何も記録しない。
+
+    cprofile=True なら同じ区間を cProfile でも計測し、累積時間順の上位を cprofile_text に残す。
+    """
+
+    if not enabled:
+        yield None
+        return
+    profile = RunProfile(label=label)
+    token = _active.set(profile)
+    profiler = cProfile.Profile() if cprofile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        profile.total_seconds = time.perf_counter() - profile._origin
+        _active.reset(token)
+        if profiler is not None:
+            buffer = io.StringIO()
+            pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(40)
+            profile.cprofile_text = buffer.getvalue()
+
+
+__all__ = [
+    "RunProfile",
+    "Span",
+    "current_profile",
+    "merge_profiles",
+    "profile_run",
+    "span",
+    "timed",
+    "timed_iter",
+]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .stats import WEEKDAY_LABELS
+from .timeparse import minutes_to_hhmm_series, parse_hhmm_series
+
+SLOT_LABELS = ["AM半日", "Full", "PM半日", "NA"]
+
+# ShiftRecord DataFrame のコンパクト表現。
+# - 低カーディナリティの文字列列はカテゴリ型
+# - 入/退時刻は 0 時からの経過分（欠損・不正値は <NA>）
+# - date は datetime64、実働分は小さい整数型。週番号は ISO 週キー（例: 202601）も入る int32
+COMPACT_DTYPES: Dict[str, object] = {
+    "employee_id": "category",
+    "date": "datetime64[ns]",
+    "weekday": pd.CategoricalDtype(WEEKDAY_LABELS, ordered=True),
+    "week_index": "int32",
+    "start_time": "Int16",
+    "end_time": "Int16",
+    "minutes": "int16",
+    "slot": pd.CategoricalDtype(SLOT_LABELS),
+    "is_half": "bool",
+    "is_weekday": "bool",
+    "raw_status": "category",
+}
+TIME_COLUMNS = ("start_time", "end_time")
+
+
+def to_compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """ShiftRecord DataFrame（または raw テーブル）をコンパクトな型に変換。
+
+    入/退時刻は分に変換されるため、解釈できない文字列は <NA> になる。
+    """
+
+    converted = {}
+    for column, dtype in COMPACT_DTYPES.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if column in TIME_COLUMNS:
+            values = parse_hhmm_series(values)
+        elif column == "date":
+            values = pd.to_datetime(values)
+        converted[column] = values.astype(dtype)
+    return df.assign(**converted)
+
+
+def from_compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """コンパクト表現を build_shift_frame と同じ型（文字列・date オブジェクト）に戻す。"""
+
+    converted = {}
+    for column in df.columns:
+        values = df[column]
+        if column in TIME_COLUMNS:
+            converted[column] = minutes_to_hhmm_series(values)
+        elif column == "date":
+            converted[column] = pd.to_datetime(values).dt.date
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            converted[column] = values.astype(str).where(values.notna(), np.nan)
+        elif column in ("week_index", "minutes"):
+            converted[column] = values.astype("int64")
+    return df.assign(**converted)
+
+
+def memory_per_record(df: pd.DataFrame) -> float:
+    """1レコードあたりのメモリ使用量(バイト)。文字列の実体も含めて計測する。"""
+
+    if len(df) == 0:
+        return 0.0
+    return float(df.memory_usage(deep=True, index=False).sum()) / len(df)
+
+
+def memory_report(df: pd.DataFrame) -> Dict[str, float]:
+    """列ごとの1レコードあたりバイト数と合計。"""
+
+    if len(df) == 0:
+        return {"total": 0.0}
+    usage = df.memory_usage(deep=True, index=False) / len(df)
+    report = {column: round(float(value), 2) for column, value in usage.items()}
+    report["total"] = round(float(usage.sum()), 2)
+    return report
+
+
+__all__ = [
+    "COMPACT_DTYPES",
+    "SLOT_LABELS",
+    "from_compact_frame",
+    "memory_per_record",
+    "memory_report",
+    "to_compact_frame",
+]
@@ -1,51 +1,60 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
-from typing import Iterable, List, Optional, Sequence
+import weakref
+from dataclasses import dataclass, fields
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+from .calendar_dim import DEFAULT_CALENDAR, WEEKDAY_LABELS, CalendarConfig, calendar_day, join_calendar
 from .models import (
     ShiftParseConfig,
     ShiftRecord,
+    ShiftRecordBatch,
     WeekdaySlotStats,
     WeeklyEmployeeStats,
     WeeklyTeamStats,
 )
+from .profiling import timed
+from .timeparse import duration_minutes, parse_hhmm_series, parse_hhmm_to_minutes
 
-WEEKDAY_LABELS = ["月", "火", "水", "木", "金", "土", "日"]
 HALF_SLOTS = {"AM半日", "PM半日"}
 WORKING_SLOTS_ORDER = ["AM半日", "Full", "PM半日"]
+SHIFT_RECORD_COLUMNS = [f.name for f in fields(ShiftRecord)]
+# 閾値に依存しない列（slot / is_half 以外）
+RAW_SHIFT_COLUMNS = [name for name in SHIFT_RECORD_COLUMNS if name not in {"slot", "is_half"}]
 
 
-def parse_hhmm_to_minutes(value: Optional[str]) -> Optional[int]:
-    """"hh:mm"を分に変換。"""
+def compute_week_index(current: date) -> int:
+    """月曜始まりで当月内の週番号(1〜)を計算。"""
 
-    if value is None:
-        return None
-    try:
-        hour, minute = value.split(":")
-        return int(hour) * 60 + int(minute)
-    except Exception:
-        return None
+    return calendar_day(current).week_index
 
 
-def compute_week_index(current: date) -> int:
-    """月曜始まりで当月内の週番号(1〜)を計算。"""
+def iso_week_key(dates: Union[pd.Series, Sequence[date]]) -> pd.Series:
+    """ISO 年・週番号から月をまたいで一意な週キーを作る（例: 2025-12-29 → 202601）。"""
 
-    first_day = current.replace(day=1)
-    first_monday = first_day - timedelta(days=first_day.weekday())
-    week_start = current - timedelta(days=current.weekday())
-    return ((week_start - first_monday).days // 7) + 1
+    dates = dates if isinstance(dates, pd.Series) else pd.Series(dates)
+    return join_calendar(dates, columns=["iso_week_key"])["iso_week_key"].astype("int64").rename("week_index")
+
+
+def with_iso_week_index(df: pd.DataFrame) -> pd.DataFrame:
+    """week_index（当月内の週番号）を ISO 週キーに置き換える。複数月の週次集計用。"""
+
+    if df.empty:
+        return df
+    return df.assign(week_index=iso_week_key(df["date"]).to_numpy())
 
 
 def determine_slot(
     minutes: int,
-    start_time: Optional[str],
-    end_time: Optional[str],
+    start_time: Union[str, int, None],
+    end_time: Union[str, int, None],
     config: ShiftParseConfig,
 ) -> tuple[str, bool]:
-    """実働分からスロットと半日判定を返す。"""
+    """実働分からスロットと半日判定を返す。入/退は "HH:MM" でも分でもよい。"""
 
     if minutes <= 0:
         return "NA", False
@@ -55,9 +64,11 @@ def determine_slot(
 
     if minutes >= config.half_min_minutes:
         # 半日候補
-        if end_time and end_time <= "14:30":
+        end_minutes = parse_hhmm_to_minutes(end_time)
+        if end_minutes is not None and end_minutes <= config.am_end_minutes:
             return "AM半日", True
-        if start_time and start_time >= "13:30":
+        start_minutes = parse_hhmm_to_minutes(start_time)
+        if start_minutes is not None and start_minutes >= config.pm_start_minutes:
             return "PM半日", True
         return "PM半日", True
 
@@ -72,38 +83,38 @@ def build_shift_record(
     end_time: Optional[str],
     raw_status: Optional[str],
     config: ShiftParseConfig,
+    calendar: CalendarConfig = DEFAULT_CALENDAR,
 ) -> ShiftRecord:
     start_minutes = parse_hhmm_to_minutes(start_time)
     end_minutes = parse_hhmm_to_minutes(end_time)
 
     minutes = 0
     if start_minutes is not None and end_minutes is not None:
-        minutes = end_minutes - start_minutes
-        if minutes < 0:
-            minutes += 24 * 60
+        minutes = int(duration_minutes(start_minutes, end_minutes))
 
-    slot, is_half = determine_slot(minutes, start_time, end_time, config)
-    weekday_index = work_date.weekday()
-    weekday_label = WEEKDAY_LABELS[weekday_index]
+    slot, is_half = determine_slot(minutes, start_minutes, end_minutes, config)
+    day = calendar_day(work_date, calendar)
 
     return ShiftRecord(
         employee_id=str(employee_id),
         date=work_date,
-        weekday=weekday_label,
-        week_index=compute_week_index(work_date),
+        weekday=day.weekday,
+        week_index=day.week_index,
         start_time=start_time,
         end_time=end_time,
         minutes=minutes,
         slot=slot,
         is_half=is_half,
-        is_weekday=weekday_index < 5,
+        is_weekday=day.is_weekday,
         raw_status=raw_status,
     )
 
 
+@timed("stats.build_shift_records_from_rows")
 def build_shift_records_from_rows(
     rows: Iterable[dict],
     config: Optional[ShiftParseConfig] = None,
+    calendar: Optional[CalendarConfig] = None,
 ) -> List[ShiftRecord]:
     """行データからShiftRecordを生成する共通関数。"""
 
@@ -122,111 +133,253 @@ def build_shift_records_from_rows(
             end_time=row.get("end_time"),
             raw_status=row.get("raw_status"),
             config=config,
+            calendar=calendar or DEFAULT_CALENDAR,
         )
         records.append(record)
     return records
 
 
-def to_dataframe(records: Sequence[ShiftRecord]) -> pd.DataFrame:
+def _classify_slot_columns(
+    minutes: np.ndarray,
+    end_time: pd.Series,
+    config: ShiftParseConfig,
+) -> tuple[np.ndarray, np.ndarray]:
+    """determine_slot を列演算で適用し、(slot, is_half) を返す。"""
+
+    is_full = minutes > config.full_threshold_minutes
+    is_half_candidate = ~is_full & (minutes >= config.half_min_minutes)
+    # コンパクト表現では退時刻が既に 0 時からの経過分（数値列はそのまま使われる）
+    ends_in_am = (parse_hhmm_series(end_time) <= config.am_end_minutes).to_numpy()
+
+    slot = np.full(len(minutes), "PM半日", dtype=object)
+    slot[is_half_candidate & ends_in_am] = "AM半日"
+    slot[is_full] = "Full"
+    slot[minutes <= 0] = "NA"
+    is_half = (minutes > 0) & ~is_full
+    return slot, is_half
+
+
+@timed("stats.build_raw_shift_frame")
+def build_raw_shift_frame(
+    rows: Union[Iterable[dict], pd.DataFrame], calendar: Optional[CalendarConfig] = None
+) -> pd.DataFrame:
+    """閾値に依存しない列（実働分・曜日・週番号など）だけの raw テーブルを構築。
+
+    slot / is_half は classify_slots で後から付与する。閾値を変えても
+    ファイルの再解析は不要。曜日・週番号・平日判定は暦テーブル（calendar_dim）から引く。
+    """
+
+    frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    if frame.empty or "date" not in frame.columns:
+        return pd.DataFrame(columns=RAW_SHIFT_COLUMNS)
+
+    frame = frame.reindex(columns=["employee_id", "date", "start_time", "end_time", "raw_status"])
+    work_dates = pd.to_datetime(frame["date"], format="ISO8601")
+    has_date = work_dates.notna().to_numpy()
+    frame = frame[has_date].reset_index(drop=True)
+    work_dates = work_dates[has_date].reset_index(drop=True)
+    if frame.empty:
+        return pd.DataFrame(columns=RAW_SHIFT_COLUMNS)
+
+    minutes = duration_minutes(parse_hhmm_series(frame["start_time"]), parse_hhmm_series(frame["end_time"]))
+    minutes = np.nan_to_num(minutes, nan=0).astype("int64")
+
+    days = join_calendar(work_dates, calendar, ["date", "weekday", "week_index", "is_weekday"])
+
+    return pd.DataFrame(
+        {
+            "employee_id": frame["employee_id"].astype(str),
+            "date": days["date"].to_numpy(),
+            "weekday": days["weekday"].to_numpy(),
+            "week_index": days["week_index"].to_numpy().astype("int64"),
+            "start_time": frame["start_time"],
+            "end_time": frame["end_time"],
+            "minutes": minutes,
+            "is_weekday": days["is_weekday"].to_numpy().astype(bool),
+            "raw_status": frame["raw_status"],
+        },
+        columns=RAW_SHIFT_COLUMNS,
+    )
+
+
+@timed("stats.classify_slots")
+def classify_slots(raw: pd.DataFrame, config: Optional[ShiftParseConfig] = None) -> pd.DataFrame:
+    """raw テーブルに閾値設定から slot / is_half を付与し ShiftRecord DataFrame を返す。"""
+
+    config = config or ShiftParseConfig()
+    if raw.empty:
+        return pd.DataFrame(columns=SHIFT_RECORD_COLUMNS)
+
+    slot, is_half = _classify_slot_columns(raw["minutes"].to_numpy(), raw["end_time"], config)
+    return raw.assign(slot=slot, is_half=is_half)[SHIFT_RECORD_COLUMNS]
+
+
+@timed("stats.build_shift_frame")
+def build_shift_frame(
+    rows: Union[Iterable[dict], pd.DataFrame],
+    config: Optional[ShiftParseConfig] = None,
+    calendar: Optional[CalendarConfig] = None,
+) -> pd.DataFrame:
+    """行データ（dict の列または DataFrame）から ShiftRecord DataFrame を列演算で構築。
+
+    build_shift_records_from_rows → to_dataframe と同じスキーマを、
+    ShiftRecord オブジェクトを経由せずに生成する。
+    """
+
+    return classify_slots(build_raw_shift_frame(rows, calendar), config)
+
+
+def build_shift_record_batch(
+    rows: Union[Iterable[dict], pd.DataFrame],
+    config: Optional[ShiftParseConfig] = None,
+) -> ShiftRecordBatch:
+    """行データから ShiftRecordBatch を列演算で構築（ShiftRecord を必要とする連携向け）。"""
+
+    return ShiftRecordBatch.from_frame(build_shift_frame(rows, config))
+
+
+def to_dataframe(records: Union[Sequence[ShiftRecord], ShiftRecordBatch]) -> pd.DataFrame:
+    if isinstance(records, ShiftRecordBatch):
+        return records.to_frame()
     return pd.DataFrame([record.to_dict() for record in records])
 
 
-def weekly_employee_stats(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return pd.DataFrame(columns=[f.name for f in WeeklyEmployeeStats.__dataclass_fields__.values()])
+WEEKLY_EMPLOYEE_COLUMNS = [f.name for f in fields(WeeklyEmployeeStats)]
+WEEKLY_TEAM_COLUMNS = [f.name for f in fields(WeeklyTeamStats)]
+WEEKDAY_SLOT_COLUMNS = [f.name for f in fields(WeekdaySlotStats)]
+WEEKDAY_NA_COLUMNS = ["weekday", "count"]
+
+
+@dataclass(frozen=True)
+class StatsBundle:
+    """ダッシュボード / エクスポートで使う集計テーブル一式。"""
+
+    weekly_employee: pd.DataFrame
+    weekly_team: pd.DataFrame
+    weekday_slot: pd.DataFrame
+    weekday_slot_working: pd.DataFrame
+    weekday_na: pd.DataFrame
+
+    def tables(self) -> Dict[str, pd.DataFrame]:
+        """エクスポート用のテーブル名 → DataFrame。"""
+
+        return {
+            "weekly_employee_stats": self.weekly_employee,
+            "weekly_team_stats": self.weekly_team,
+            "weekday_slot_stats": self.weekday_slot,
+            "weekday_slot_stats_working": self.weekday_slot_working,
+            "weekday_na_counts": self.weekday_na,
+        }
+
 
-    grouped = df.groupby(["employee_id", "week_index"])
-    agg = grouped.agg(
+def _employee_week_frame(df: pd.DataFrame, calendar: Optional[CalendarConfig] = None) -> pd.DataFrame:
+    """社員×週の中間集計（週次の社員別・チーム別集計で共有）。
+
+    すべて組み込みの集計（sum / min）で済むよう、判定列と週開始日（暦テーブルから結合）を先に作る。
+    週開始日は日付に対して単調なので「最小日付の週開始日」＝「週開始日の最小値」。
+    """
+
+    prepared = pd.DataFrame(
+        {
+            "employee_id": df["employee_id"],
+            "week_index": df["week_index"].astype("int64"),
+            # コンパクト型（int16）のままだとチーム合計で桁あふれするため広げる
+            "minutes": df["minutes"].astype("int64"),
+            "is_working": df["minutes"].gt(0),
+            "is_half": df["is_half"],
+            "week_start": join_calendar(df["date"], calendar, ["week_start_date"])["week_start_date"],
+        }
+    )
+    employee_week = prepared.groupby(["employee_id", "week_index"], observed=True).agg(
         week_minutes=("minutes", "sum"),
-        week_workdays=("minutes", lambda s: (s > 0).sum()),
+        week_workdays=("is_working", "sum"),
         week_half_days=("is_half", "sum"),
-        week_start_date=("date", lambda s: (s.min() - timedelta(days=s.min().weekday()))),
+        week_start=("week_start", "min"),
     ).reset_index()
+    return _categories_to_str(employee_week, ["employee_id"])
 
-    agg["week_hours"] = (agg["week_minutes"] / 60).round(2)
-    agg["week_half_ratio"] = agg.apply(
-        lambda row: row["week_half_days"] / row["week_workdays"] if row["week_workdays"] else 0.0,
-        axis=1,
-    )
 
-    return agg[
-        [
-            "employee_id",
-            "week_index",
-            "week_start_date",
-            "week_minutes",
-            "week_hours",
-            "week_workdays",
-            "week_half_days",
-            "week_half_ratio",
-        ]
-    ].sort_values(["employee_id", "week_index"])
-
-
-def weekly_team_stats(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return pd.DataFrame(columns=[f.name for f in WeeklyTeamStats.__dataclass_fields__.values()])
+def _weekday_slot_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """平日の 曜日×slot×勤務有無 ごとの件数（曜日別集計で共有）。"""
 
-    agg = df.groupby("week_index").agg(
-        total_minutes=("minutes", "sum"),
-        total_hours=("minutes", lambda s: (s.sum() / 60).round(2)),
-        week_start_date=("date", lambda s: (s.min() - timedelta(days=s.min().weekday()))),
-        employee_count=("employee_id", lambda s: s.nunique()),
-    ).reset_index()
-    agg["avg_hours_per_employee"] = agg.apply(
-        lambda row: row["total_hours"] / row["employee_count"] if row["employee_count"] else 0.0,
-        axis=1,
+    weekday_df = df[df["is_weekday"]]
+    counts = (
+        weekday_df.assign(is_working=weekday_df["minutes"] > 0, is_zero=weekday_df["minutes"] == 0)
+        .groupby(["weekday", "slot", "is_working", "is_zero"], observed=True)
+        .size()
+        .reset_index(name="count")
     )
-    return agg[
-        [
-            "week_index",
-            "week_start_date",
-            "total_minutes",
-            "total_hours",
-            "avg_hours_per_employee",
-        ]
-    ].sort_values("week_index")
+    return _categories_to_str(counts, ["weekday", "slot"])
 
 
-def weekday_slot_stats(df: pd.DataFrame) -> pd.DataFrame:
-    if df.empty:
-        return pd.DataFrame(columns=[f.name for f in WeekdaySlotStats.__dataclass_fields__.values()])
+def _categories_to_str(frame: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """カテゴリ型のキー列を文字列に戻す（コンパクト表現でも出力の型・並び順を揃える）。"""
 
-    weekday_df = df[df["is_weekday"]].copy()
-    if weekday_df.empty:
-        return pd.DataFrame(columns=[f.name for f in WeekdaySlotStats.__dataclass_fields__.values()])
+    converted = {
+        column: frame[column].astype(str)
+        for column in columns
+        if isinstance(frame[column].dtype, pd.CategoricalDtype)
+    }
+    return frame.assign(**converted) if converted else frame
 
-    grouped = weekday_df.groupby(["weekday", "slot"]).size().reset_index(name="count")
-    total_by_weekday = weekday_df.groupby("weekday").size().rename("total")
-    grouped = grouped.merge(total_by_weekday, on="weekday", how="left")
-    grouped["ratio_in_day"] = grouped["count"] / grouped["total"]
 
-    return grouped[["weekday", "slot", "count", "ratio_in_day"]].sort_values(["weekday", "slot"])
+def _safe_ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    """分母 0 の行は 0.0 にした割り算。"""
 
+    return numerator.div(denominator.where(denominator != 0)).where(denominator != 0, 0.0)
 
-def weekday_slot_stats_working(df: pd.DataFrame) -> pd.DataFrame:
-    """曜日×時間帯（勤務ありのみ）を集計。
 
-    - 対象: minutes > 0 かつ slot in {"AM半日","Full","PM半日"}
-    - 表示: 平日（月〜金）のみ
-    - ratio_in_day: 同一weekday内（勤務あり）の構成比
-    """
+def _weekly_employee_from(employee_week: pd.DataFrame) -> pd.DataFrame:
+    if employee_week.empty:
+        return pd.DataFrame(columns=WEEKLY_EMPLOYEE_COLUMNS)
+
+    agg = employee_week.assign(
+        week_start_date=employee_week["week_start"].dt.date,
+        week_hours=(employee_week["week_minutes"] / 60).round(2),
+        week_half_ratio=_safe_ratio(employee_week["week_half_days"], employee_week["week_workdays"]),
+    )
+    return agg[WEEKLY_EMPLOYEE_COLUMNS].sort_values(["employee_id", "week_index"])
+
+
+def _weekly_team_from(employee_week: pd.DataFrame) -> pd.DataFrame:
+    if employee_week.empty:
+        return pd.DataFrame(columns=WEEKLY_TEAM_COLUMNS)
+
+    # 社員×週の1行が「その週に出てくる社員1人」に対応する
+    agg = employee_week.groupby("week_index").agg(
+        total_minutes=("week_minutes", "sum"),
+        week_start=("week_start", "min"),
+        employee_count=("employee_id", "size"),
+    ).reset_index()
+    agg["total_hours"] = (agg["total_minutes"] / 60).round(2)
+    agg["week_start_date"] = agg["week_start"].dt.date
+    agg["avg_hours_per_employee"] = _safe_ratio(agg["total_hours"], agg["employee_count"])
+    return agg[WEEKLY_TEAM_COLUMNS].sort_values("week_index")
 
-    columns = [f.name for f in WeekdaySlotStats.__dataclass_fields__.values()]
-    if df.empty:
-        return pd.DataFrame(columns=columns)
 
-    working_df = df[(df["minutes"] > 0) & (df["slot"].isin(WORKING_SLOTS_ORDER))].copy()
-    working_df = working_df[working_df["is_weekday"]]
-    if working_df.empty:
-        return pd.DataFrame(columns=columns)
+def _weekday_slot_from(slot_counts: pd.DataFrame) -> pd.DataFrame:
+    if slot_counts.empty:
+        return pd.DataFrame(columns=WEEKDAY_SLOT_COLUMNS)
+
+    grouped = slot_counts.groupby(["weekday", "slot"])["count"].sum().reset_index()
+    total_by_weekday = grouped.groupby("weekday")["count"].sum().rename("total")
+    grouped = grouped.merge(total_by_weekday, on="weekday", how="left")
+    grouped["ratio_in_day"] = grouped["count"] / grouped["total"]
+
+    return grouped[WEEKDAY_SLOT_COLUMNS].sort_values(["weekday", "slot"])
+
+
+def _weekday_slot_working_from(slot_counts: pd.DataFrame) -> pd.DataFrame:
+    working = slot_counts[slot_counts["is_working"] & slot_counts["slot"].isin(WORKING_SLOTS_ORDER)]
+    if working.empty:
+        return pd.DataFrame(columns=WEEKDAY_SLOT_COLUMNS)
 
     # 全weekday×slot を作って 0 埋め（表示が安定する）
     full_index = pd.MultiIndex.from_product(
         [WEEKDAY_LABELS[:5], WORKING_SLOTS_ORDER],
         names=["weekday", "slot"],
     )
-    counts = working_df.groupby(["weekday", "slot"]).size().reindex(full_index, fill_value=0)
+    counts = working.groupby(["weekday", "slot"])["count"].sum().reindex(full_index, fill_value=0)
     grouped = counts.reset_index(name="count")
     totals = grouped.groupby("weekday")["count"].transform("sum")
     grouped["ratio_in_day"] = grouped["count"].div(totals.where(totals > 0, 1))
@@ -235,7 +388,53 @@ def weekday_slot_stats_working(df: pd.DataFrame) -> pd.DataFrame:
     # 並び順を固定
     grouped["weekday"] = pd.Categorical(grouped["weekday"], categories=WEEKDAY_LABELS[:5], ordered=True)
     grouped["slot"] = pd.Categorical(grouped["slot"], categories=WORKING_SLOTS_ORDER, ordered=True)
-    return grouped[["weekday", "slot", "count", "ratio_in_day"]].sort_values(["weekday", "slot"])
+    return grouped[WEEKDAY_SLOT_COLUMNS].sort_values(["weekday", "slot"])
+
+
+def _weekday_na_from(slot_counts: pd.DataFrame) -> pd.DataFrame:
+    na_counts = slot_counts[slot_counts["is_zero"]]
+    if na_counts.empty:
+        return pd.DataFrame(columns=WEEKDAY_NA_COLUMNS)
+
+    counts = (
+        na_counts.groupby("weekday")["count"]
+        .sum()
+        .reindex(WEEKDAY_LABELS[:5], fill_value=0)
+        .reset_index(name="count")
+    )
+    counts["weekday"] = pd.Categorical(counts["weekday"], categories=WEEKDAY_LABELS[:5], ordered=True)
+    return counts[WEEKDAY_NA_COLUMNS].sort_values("weekday")
+
+
+def weekly_employee_stats(df: pd.DataFrame, calendar: Optional[CalendarConfig] = None) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=WEEKLY_EMPLOYEE_COLUMNS)
+    return _weekly_employee_from(_employee_week_frame(df, calendar))
+
+
+def weekly_team_stats(df: pd.DataFrame, calendar: Optional[CalendarConfig] = None) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=WEEKLY_TEAM_COLUMNS)
+    return _weekly_team_from(_employee_week_frame(df, calendar))
+
+
+def weekday_slot_stats(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=WEEKDAY_SLOT_COLUMNS)
+    return _weekday_slot_from(_weekday_slot_counts(df))
+
+
+def weekday_slot_stats_working(df: pd.DataFrame) -> pd.DataFrame:
+    """曜日×時間帯（勤務ありのみ）を集計。
+
+    - 対象: minutes > 0 かつ slot in {"AM半日","Full","PM半日"}
+    - 表示: 平日（月〜金）のみ
+    - ratio_in_day: 同一weekday内（勤務あり）の構成比
+    """
+
+    if df.empty:
+        return pd.DataFrame(columns=WEEKDAY_SLOT_COLUMNS)
+    return _weekday_slot_working_from(_weekday_slot_counts(df))
 
 
 def weekday_na_counts(df: pd.DataFrame) -> pd.DataFrame:
@@ -245,33 +444,83 @@ def weekday_na_counts(df: pd.DataFrame) -> pd.DataFrame:
     """
 
     if df.empty:
-        return pd.DataFrame(columns=["weekday", "count"])
+        return pd.DataFrame(columns=WEEKDAY_NA_COLUMNS)
+    return _weekday_na_from(_weekday_slot_counts(df))
 
-    na_df = df[(df["minutes"] == 0) & (df["is_weekday"])].copy()
-    if na_df.empty:
-        return pd.DataFrame(columns=["weekday", "count"])
 
-    counts = (
-        na_df.groupby("weekday")
-        .size()
-        .reindex(WEEKDAY_LABELS[:5], fill_value=0)
-        .reset_index(name="count")
-    )
-    counts["weekday"] = pd.Categorical(counts["weekday"], categories=WEEKDAY_LABELS[:5], ordered=True)
-    return counts[["weekday", "count"]].sort_values("weekday")
+# id(df) -> (df への弱参照, 暦設定, 集計結果)。df が破棄されたらエントリも消える。
+_STATS_MEMO: Dict[int, Tuple[weakref.ref, CalendarConfig, StatsBundle]] = {}
+
+
+def _forget_stats(key: int, ref: weakref.ref) -> None:
+    entry = _STATS_MEMO.get(key)
+    if entry is not None and entry[0] is ref:
+        del _STATS_MEMO[key]
+
+
+@timed("stats.compute_all_stats")
+def compute_all_stats(df: pd.DataFrame, calendar: Optional[CalendarConfig] = None) -> StatsBundle:
+    """全集計テーブルを共有の中間集計から1回で導出する。
+
+    同じ DataFrame オブジェクト・暦設定に対する2回目以降の呼び出しはメモ化した結果を返す
+    （集計後に df をインプレースで変更しない前提）。calendar は週開始日の算出に使う
+    （df の week_index を付けたときと同じ設定を渡す）。
+    """
+
+    calendar = calendar or DEFAULT_CALENDAR
+    key = id(df)
+    entry = _STATS_MEMO.get(key)
+    if entry is not None and entry[0]() is df and entry[1] == calendar:
+        return entry[2]
+
+    if df.empty:
+        bundle = StatsBundle(
+            weekly_employee=pd.DataFrame(columns=WEEKLY_EMPLOYEE_COLUMNS),
+            weekly_team=pd.DataFrame(columns=WEEKLY_TEAM_COLUMNS),
+            weekday_slot=pd.DataFrame(columns=WEEKDAY_SLOT_COLUMNS),
+            weekday_slot_working=pd.DataFrame(columns=WEEKDAY_SLOT_COLUMNS),
+            weekday_na=pd.DataFrame(columns=WEEKDAY_NA_COLUMNS),
+        )
+    else:
+        employee_week = _employee_week_frame(df, calendar)
+        slot_counts = _weekday_slot_counts(df)
+        bundle = StatsBundle(
+            weekly_employee=_weekly_employee_from(employee_week),
+            weekly_team=_weekly_team_from(employee_week),
+            weekday_slot=_weekday_slot_from(slot_counts),
+            weekday_slot_working=_weekday_slot_working_from(slot_counts),
+            weekday_na=_weekday_na_from(slot_counts),
+        )
+
+    ref = weakref.ref(df, lambda ref, key=key: _forget_stats(key, ref))
+    _STATS_MEMO[key] = (ref, calendar, bundle)
+    return bundle
 
 
 __all__ = [
+    "CalendarConfig",
     "ShiftParseConfig",
     "ShiftRecord",
+    "ShiftRecordBatch",
+    "StatsBundle",
     "WEEKDAY_LABELS",
+    "RAW_SHIFT_COLUMNS",
+    "SHIFT_RECORD_COLUMNS",
     "WORKING_SLOTS_ORDER",
     "build_shift_record",
+    "build_raw_shift_frame",
+    "build_shift_frame",
+    "build_shift_record_batch",
     "build_shift_records_from_rows",
+    "classify_slots",
+    "compute_all_stats",
+    "parse_hhmm_series",
+    "iso_week_key",
     "to_dataframe",
     "weekly_employee_stats",
     "weekly_team_stats",
     "weekday_slot_stats",
     "weekday_slot_stats_working",
     "weekday_na_counts",
+    "with_iso_week_index",
 ]
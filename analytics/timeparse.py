@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 24 * 60
+# 日付またぎの表記（例: "26:00"）も受け付けるため 47:59 まで持つ
+MAX_HOUR = 47
+
+
+def _build_hhmm_table() -> Dict[str, int]:
+    table: Dict[str, int] = {}
+    for hour in range(MAX_HOUR + 1):
+        for minute in range(60):
+            value = hour * 60 + minute
+            table[f"{hour}:{minute:02d}"] = value
+            table[f"{hour:02d}:{minute:02d}"] = value
+    return table
+
+
+# "H:MM" / "HH:MM" → 0時からの経過分。解釈はすべてこの表の参照で行う
+HHMM_TO_MINUTES: Dict[str, int] = _build_hhmm_table()
+# 経過分 → "HH:MM"（from_compact_frame などの逆変換用）
+MINUTES_TO_HHMM = np.array(
+    [f"{value // 60:02d}:{value % 60:02d}" for value in range((MAX_HOUR + 1) * 60)], dtype=object
+)
+
+
+def parse_hhmm_to_minutes(value: Union[str, int, None]) -> Optional[int]:
+    """"H:MM" / "HH:MM" を分に変換。整数（既に分）はそのまま返し、解釈できなければ None。"""
+
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str):
+        return None
+    minutes = HHMM_TO_MINUTES.get(value)
+    if minutes is None:
+        minutes = HHMM_TO_MINUTES.get(value.strip())
+    return minutes
+
+
+def parse_hhmm_series(values: pd.Series) -> pd.Series:
+    """時刻列を分（float64、不正値は NaN）に一括変換。ユニーク値ごとに1回だけ表を引く。"""
+
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype("float64")
+    codes, uniques = pd.factorize(values)
+    table = np.array(
+        [np.nan if (parsed := parse_hhmm_to_minutes(value)) is None else parsed for value in uniques],
+        dtype="float64",
+    )
+    result = np.full(len(codes), np.nan)
+    valid = codes >= 0
+    result[valid] = table[codes[valid]]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def duration_minutes(start_minutes, end_minutes) -> np.ndarray:
+    """入/退の分から実働分を計算（退が入より前なら日付またぎとして24時間足す）。欠損は NaN。"""
+
+    duration = np.asarray(end_minutes, dtype="float64") - np.asarray(start_minutes, dtype="float64")
+    return np.where(duration < 0, duration + MINUTES_PER_DAY, duration)
+
+
+def minutes_to_hhmm_series(minutes: pd.Series) -> pd.Series:
+    """分を "HH:MM" 文字列に戻す。欠損・範囲外は NaN。"""
+
+    values = minutes.astype("float64").to_numpy()
+    valid = ~np.isnan(values) & (values >= 0) & (values < len(MINUTES_TO_HHMM))
+    result = np.full(len(values), np.nan, dtype=object)
+    result[valid] = MINUTES_TO_HHMM[values[valid].astype("int64")]
+    return pd.Series(result, index=minutes.index, name=minutes.name)
+
+
+__all__ = [
+    "HHMM_TO_MINUTES",
+    "MINUTES_PER_DAY",
+    "duration_minutes",
+    "minutes_to_hhmm_series",
+    "parse_hhmm_series",
+    "parse_hhmm_to_minutes",
+]
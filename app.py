@@ -1,36 +1,64 @@
 from __future__ import annotations
 
+import io
+import math
+import tempfile
 from datetime import datetime
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import streamlit as st
-from matplotlib import font_manager, rcParams
 
+from analytics.calendar_dim import DEFAULT_CALENDAR, CalendarConfig, apply_calendar, load_holidays
+from analytics.coverage import COVERAGE_GROUPS, DEFAULT_BIN_MINUTES, staffing_coverage
+from analytics.export import export_csv, export_tables, write_export_bundle
+from analytics.history import ShiftHistoryStore
+from analytics.memo import FrameMemo, frame_fingerprint
+from analytics.merge import CONFLICT_POLICIES, MergeResult, merge_shift_frames
+from analytics.profiling import RunProfile, merge_profiles, profile_run, span, timed
 from analytics.stats import (
     ShiftParseConfig,
     WEEKDAY_LABELS,
     WORKING_SLOTS_ORDER,
-    build_shift_records_from_rows,
-    to_dataframe,
-    weekly_employee_stats,
-    weekday_na_counts,
-    weekday_slot_stats,
-    weekday_slot_stats_working,
+    build_raw_shift_frame,
+    classify_slots,
+    compute_all_stats,
 )
-from parsers.excel_parser import ExcelShiftParser
-from parsers.pdf_parser import PdfShiftParser
+from parsers.cache import ParseCache, file_digest
+from parsers.jobs import ParseJob, ParseJobManager
+from parsers.pdf_layout import LayoutStore
+
+# matplotlib と各パーサー（pdfplumber / openpyxl）は起動を速くするため使う時点で import する
 
 
 PAGE_TITLE = "シフト管理・分析ダッシュボード"
+SUPPORTED_UPLOAD_SUFFIXES = {".pdf", ".xlsx", ".xls"}
+# 解析ジョブの進捗表示を更新する間隔(秒)
+PARSE_PROGRESS_INTERVAL = 0.5
+# 複数ファイルで同じ社員・日付の行があった場合の扱い（analytics.merge の policy）
+CONFLICT_POLICY_LABELS = {
+    "last": "後のファイルを優先",
+    "first": "先のファイルを優先",
+    "max_minutes": "実働の長い方を優先",
+}
 SAMPLE_EMPLOYEES = ["101", "102", "201"]
+# 社員×週ヒートマップ: 1ページの社員数、セル内の数値を描く上限セル数、社員名を全て出す上限行数
+HEATMAP_PAGE_SIZE = 50
+HEATMAP_ANNOTATE_MAX_CELLS = 600
+HEATMAP_MAX_YTICKS = 60
+# 時間帯別の在籍人数: 刻み(分)の選択肢と、集計単位の表示名
+COVERAGE_BIN_CHOICES = [DEFAULT_BIN_MINUTES, 30, 60, 5, 1]
+COVERAGE_GROUP_LABELS = {"weekday": "曜日別（1日あたり平均）", "date": "日付別"}
+FIGURE_DPI = 100
 
 
 def configure_matplotlib_font() -> None:
     """Noto Sans JP があれば登録して matplotlib に適用。"""
 
+    from matplotlib import font_manager, rcParams
+
     font_path = Path("assets/NotoSansJP-Regular.ttf")
     if font_path.exists():
         font_manager.fontManager.addfont(str(font_path))
@@ -40,9 +68,19 @@ def configure_matplotlib_font() -> None:
     rcParams["axes.unicode_minus"] = False
 
 
+@lru_cache(maxsize=None)
+def get_pyplot():
+    """初めてグラフを描くときに matplotlib.pyplot を読み込み、フォント設定を適用して返す。"""
+
+    import matplotlib.pyplot as plt
+
+    configure_matplotlib_font()
+    return plt
+
+
 @st.cache_data
 def generate_sample_records(target_month: str) -> pd.DataFrame:
-    """デモ用のシフトデータを生成。"""
+    """デモ用のシフトデータ（閾値に依存しない raw テーブル）を生成。"""
 
     month_start = pd.to_datetime(f"{target_month}-01")
     month_end = (month_start + pd.offsets.MonthEnd(0)).date()
@@ -64,21 +102,261 @@ def generate_sample_records(target_month: str) -> pd.DataFrame:
                     "raw_status": None,
                 }
             )
-    config = ShiftParseConfig()
-    records = build_shift_records_from_rows(rows, config)
-    return to_dataframe(records)
+    return build_raw_shift_frame(rows)
+
+
+@st.cache_resource
+def get_parse_cache() -> ParseCache:
+    """セッション間で共有する解析結果キャッシュ。"""
+
+    return ParseCache()
+
+
+@st.cache_resource
+def get_frame_memo() -> FrameMemo:
+    """解析・分類・集計結果のメモ（セッション間で共有、メモリ上限つき LRU）。
+
+    キーは入力の内容ハッシュと設定値なので、データが変わらない再実行では再計算しない。
+    """
+
+    return FrameMemo()
+
+
+@st.cache_resource
+def get_layout_store() -> LayoutStore:
+    """PDF レイアウトのテンプレート（ファイル・セッション間で再利用）。"""
 
+    return LayoutStore()
+
+
+@st.cache_resource
+def get_history_store() -> ShiftHistoryStore:
+    """月ごとに保存した過去の ShiftRecord（月をまたぐ集計用）。"""
+
+    return ShiftHistoryStore()
+
+
+@st.cache_resource
+def get_parse_jobs() -> ParseJobManager:
+    """バックグラウンドの解析ジョブ（セッション間で共有し、同じファイルの解析は1つにまとめる）。"""
+
+    return ParseJobManager()
+
+
+def upload_key(upload, target_month: str) -> tuple:
+    """アップロードファイルの raw テーブルのメモキー（内容ハッシュ・種別・対象月）。"""
 
-def parse_uploaded_file(upload, target_month: str, config: ShiftParseConfig) -> pd.DataFrame:
     suffix = Path(upload.name).suffix.lower()
+    return ("raw", file_digest(upload), suffix, target_month if suffix == ".pdf" else None)
+
+
+def parse_uploaded_file(upload, target_month: str) -> pd.DataFrame:
+    """アップロードファイルを閾値に依存しない raw テーブルに変換（同じ内容・対象月ならメモから返す）。"""
+
+    key = upload_key(upload, target_month)
+    return get_frame_memo().get_or_compute(
+        key, lambda: _parse_uploaded_file(upload, key[2], target_month, get_parse_cache(), get_layout_store())
+    )
+
+
+@timed("app.parse_upload")
+def _parse_uploaded_file(
+    upload, suffix: str, target_month: str, cache: ParseCache, layouts: LayoutStore, progress=None
+) -> pd.DataFrame:
+    """Streamlit に依存しない解析本体（ワーカースレッドからも呼ぶ）。"""
+
     if suffix in {".xlsx", ".xls"}:
-        parser = ExcelShiftParser(config)
-        return parser.read(upload)
+        from parsers.excel_parser import ExcelShiftParser
+
+        parser = ExcelShiftParser(cache=cache, streaming=True)
+        return parser.read_raw(upload, progress)
     if suffix == ".pdf":
-        parser = PdfShiftParser(config)
-        return parser.read(upload, target_month)
-    st.warning("PDF か Excel ファイルをアップロードしてください。")
-    return pd.DataFrame()
+        from parsers.pdf_parser import PdfShiftParser
+
+        parser = PdfShiftParser(cache=cache, layouts=layouts)
+        return parser.read_raw(upload, target_month, progress)
+    raise ValueError(f"unsupported file type: {suffix}")
+
+
+def start_parse_job(upload, target_month: str) -> ParseJob:
+    """解析をワーカースレッドで開始する。同じファイル・対象月の解析が実行中ならそのジョブに合流する。"""
+
+    key = upload_key(upload, target_month)
+    # UploadedFile は再実行で差し替わるため、内容をコピーしてワーカーに渡す
+    buffer = io.BytesIO(upload.getvalue())
+    buffer.name = upload.name
+    memo, cache, layouts = get_frame_memo(), get_parse_cache(), get_layout_store()
+
+    def run(job: ParseJob) -> pd.DataFrame:
+        return memo.get_or_compute(
+            key, lambda: _parse_uploaded_file(buffer, key[2], target_month, cache, layouts, job.report)
+        )
+
+    return get_parse_jobs().submit(key, run, label=upload.name)
+
+
+def load_raw_frames(parts: List[Tuple[pd.DataFrame, Optional[str]]], exclude_ids: List[str]) -> None:
+    """解析結果（ファイルごとの raw テーブルとファイル名）を表示対象として session_state に設定する。"""
+
+    loaded = []
+    for raw_df, name in parts:
+        raw_df = apply_exclusions(raw_df, exclude_ids)
+        loaded.append(
+            {
+                "df": raw_df,
+                "source": Path(name).suffix.lower() if name else "sample",
+                "name": name,
+                # 内容ハッシュは読み込み時に1回だけ計算し、以降の再実行ではキーとして使い回す
+                "key": frame_fingerprint(raw_df),
+            }
+        )
+    st.session_state.raw_parts = loaded
+    names = [part["name"] for part in loaded if part["name"]]
+    st.session_state.raw_name = " + ".join(names) if names else None
+
+
+def collect_parse_job() -> None:
+    """全ファイルの解析ジョブが終わったら結果（または失敗・キャンセル）を反映する。"""
+
+    pending = st.session_state.get("parse_job")
+    if pending is None:
+        return
+    manager = get_parse_jobs()
+    jobs = [(manager.get(key), key, name) for key, name in pending["files"]]
+    if any(job is not None and not job.done() for job, _, _ in jobs):
+        return
+    st.session_state.parse_job = None
+    # ワーカースレッドで記録した解析の区間は、この再実行の計測パネルに加える
+    finished_profiles = [job.profile for job, _, _ in jobs if job is not None and job.profile is not None]
+    st.session_state.parse_profiles = finished_profiles
+    if any(job is not None and job.state == "cancelled" for job, _, _ in jobs):
+        st.info("解析をキャンセルしました。")
+        return
+    parts = []
+    for job, key, name in jobs:
+        if job is None:
+            # 解析済みのファイルや一覧から外れた終了ジョブは、メモに残っている結果を使う
+            raw_df = get_frame_memo().get(key)
+            if raw_df is not None:
+                parts.append((raw_df, name))
+        elif job.state == "failed":
+            st.error(f"{name} の解析に失敗しました: {job.exception()}")
+        else:
+            parts.append((job.result(), name))
+    if parts:
+        load_raw_frames(parts, pending["exclude_ids"])
+
+
+@st.fragment(run_every=PARSE_PROGRESS_INTERVAL)
+def render_parse_progress() -> None:
+    """実行中の解析ジョブのファイルごとの進捗。全て終わったらアプリ全体を再実行して結果を表示する。"""
+
+    pending = st.session_state.get("parse_job")
+    if pending is None:
+        return
+    manager = get_parse_jobs()
+    jobs = [(manager.get(key), name) for key, name in pending["files"]]
+    running = [(job, name) for job, name in jobs if job is not None and not job.done()]
+    if not running:
+        st.rerun()
+    for job, name in running:
+        progress = job.progress
+        if progress.pages_total:
+            text = f"{name} を解析中: {progress.pages_done} / {progress.pages_total} ページ・{progress.rows} 行"
+        else:
+            text = f"{name} を解析中: {progress.rows} 行"
+        st.progress(progress.fraction, text=f"{text}（{job.elapsed:.0f} 秒）")
+    if len(jobs) > 1:
+        st.caption(f"完了 {len(jobs) - len(running)} / {len(jobs)} ファイル")
+    if st.button("解析をキャンセル"):
+        for job, _ in running:
+            job.cancel()
+        st.rerun()
+
+
+@timed("app.classify")
+def classify_shift_frame(raw_df: pd.DataFrame, source: str | None, config: ShiftParseConfig) -> pd.DataFrame:
+    """raw テーブルに閾値を適用。閾値変更時は再解析せずここだけ再実行する。"""
+
+    if source == ".pdf":
+        from parsers.pdf_parser import PdfShiftParser
+
+        return PdfShiftParser(config).classify(raw_df)
+    return classify_slots(raw_df, config)
+
+
+def classify_cached(
+    raw_key: str,
+    source: str | None,
+    config: ShiftParseConfig,
+    raw_df: pd.DataFrame,
+    calendar: CalendarConfig = DEFAULT_CALENDAR,
+) -> pd.DataFrame:
+    """raw テーブルの内容ハッシュ・種別・閾値・暦設定をキーに分類結果をメモする。"""
+
+    def compute() -> pd.DataFrame:
+        shift_df = classify_shift_frame(raw_df, source, config)
+        # raw テーブルは既定の暦（月曜始まり・祝日なし）で作られている
+        return shift_df if calendar == DEFAULT_CALENDAR else apply_calendar(shift_df, calendar)
+
+    key = ("shift", raw_key, source, tuple(sorted(config.to_dict().items())), calendar)
+    return get_frame_memo().get_or_compute(key, compute)
+
+
+def merge_cached(
+    parts: List[Dict],
+    config: ShiftParseConfig,
+    calendar: CalendarConfig,
+    policy: str,
+) -> MergeResult:
+    """ファイルごとに分類した ShiftRecord を (employee_id, date) で重複を除いて結合する（結果はメモする）。"""
+
+    def compute() -> MergeResult:
+        frames = [classify_cached(part["key"], part["source"], config, part["df"], calendar) for part in parts]
+        return merge_shift_frames(frames, policy, [part["name"] or part["source"] for part in parts])
+
+    key = (
+        "merge",
+        tuple((part["key"], part["source"]) for part in parts),
+        tuple(sorted(config.to_dict().items())),
+        calendar,
+        policy,
+    )
+    return get_frame_memo().get_or_compute(key, compute)
+
+
+def stats_cached(
+    raw_key: str,
+    source: str | None,
+    config: ShiftParseConfig,
+    shift_df: pd.DataFrame,
+    calendar: CalendarConfig = DEFAULT_CALENDAR,
+):
+    """分類結果と同じキー（入力の内容ハッシュ + 閾値 + 暦設定）で集計結果をメモする。"""
+
+    key = ("stats", raw_key, source, tuple(sorted(config.to_dict().items())), calendar)
+    return get_frame_memo().get_or_compute(key, lambda: compute_all_stats(shift_df, calendar))
+
+
+def coverage_cached(
+    raw_key: str,
+    source: str | None,
+    config: ShiftParseConfig,
+    shift_df: pd.DataFrame,
+    by: str,
+    bin_minutes: int,
+) -> pd.DataFrame:
+    """時間帯別の在籍人数を、分類結果と同じキー + 集計単位・刻みでメモする。"""
+
+    key = ("coverage", raw_key, source, tuple(sorted(config.to_dict().items())), by, int(bin_minutes))
+    return get_frame_memo().get_or_compute(key, lambda: staffing_coverage(shift_df, by, bin_minutes))
+
+
+@st.cache_data(show_spinner=False)
+def read_holidays(data: bytes):
+    """アップロードされた祝日カレンダー CSV を日付の集合にする。"""
+
+    return load_holidays(io.BytesIO(data))
 
 
 def apply_exclusions(df: pd.DataFrame, exclude_ids: List[str]) -> pd.DataFrame:
@@ -96,9 +374,10 @@ def compute_warning(df: pd.DataFrame) -> str:
     return f"入時刻欠損: {missing_start}件 / 退時刻欠損: {missing_end}件 / 実働0分: {zero_minutes}件"
 
 
+@timed("plot.employee_trend")
 def plot_employee_trend(stats_df: pd.DataFrame, employee: str, target_hours: float):
     emp_df = stats_df[stats_df["employee_id"] == employee]
-    fig, ax = plt.subplots()
+    fig, ax = get_pyplot().subplots()
     ax.plot(emp_df["week_index"], emp_df["week_hours"], marker="o", label="週実働時間")
     ax.axhline(target_hours, color="red", linestyle="--", label="目標")
     ax.set_xlabel("週")
@@ -109,19 +388,51 @@ def plot_employee_trend(stats_df: pd.DataFrame, employee: str, target_hours: flo
     return fig
 
 
-def plot_employee_heatmap(stats_df: pd.DataFrame):
+def employee_heatmap_matrix(stats_df: pd.DataFrame, sort_by_hours: bool = False) -> pd.DataFrame:
+    """社員×週の実働時間行列。sort_by_hours なら合計時間の多い順に並べる（似た勤務量の社員が隣り合う）。"""
+
+    pivot = stats_df.pivot(index="employee_id", columns="week_index", values="week_hours").fillna(0)
+    if sort_by_hours:
+        pivot = pivot.loc[pivot.sum(axis=1).sort_values(ascending=False, kind="stable").index]
+    return pivot
+
+
+def heatmap_page_count(n_employees: int, page_size: int = HEATMAP_PAGE_SIZE) -> int:
+    return max(1, math.ceil(n_employees / page_size))
+
+
+@timed("plot.employee_heatmap")
+def plot_employee_heatmap(
+    stats_df: pd.DataFrame,
+    page: Optional[int] = None,
+    page_size: int = HEATMAP_PAGE_SIZE,
+    sort_by_hours: bool = False,
+):
+    """社員×週ヒートマップ。page を指定すると page_size 人ずつ表示（None なら全員）。
+
+    セル数が HEATMAP_ANNOTATE_MAX_CELLS を超えると数値を描かず、
+    社員ラベルは最大 HEATMAP_MAX_YTICKS 個に間引く。セルはラスタ画像として描く。
+    """
+
     if stats_df.empty:
         return None
-    pivot = stats_df.pivot(index="employee_id", columns="week_index", values="week_hours").fillna(0)
-    fig, ax = plt.subplots()
-    cax = ax.imshow(pivot.values, aspect="auto")
-    ax.set_xticks(range(pivot.shape[1]))
+    pivot = employee_heatmap_matrix(stats_df, sort_by_hours)
+    if page is not None:
+        pivot = pivot.iloc[page * page_size : (page + 1) * page_size]
+    rows, cols = pivot.shape
+    values = pivot.to_numpy()
+
+    fig, ax = get_pyplot().subplots(figsize=(8, min(max(4.0, rows * 0.25), 16)))
+    cax = ax.imshow(values, aspect="auto", interpolation="nearest", rasterized=True)
+    ax.set_xticks(range(cols))
     ax.set_xticklabels(pivot.columns)
-    ax.set_yticks(range(pivot.shape[0]))
-    ax.set_yticklabels(pivot.index)
-    for i in range(pivot.shape[0]):
-        for j in range(pivot.shape[1]):
-            ax.text(j, i, f"{pivot.values[i, j]:.1f}", ha="center", va="center", color="white")
+    step = max(1, math.ceil(rows / HEATMAP_MAX_YTICKS))
+    ax.set_yticks(range(0, rows, step))
+    ax.set_yticklabels(pivot.index[::step])
+    if rows * cols <= HEATMAP_ANNOTATE_MAX_CELLS:
+        for i in range(rows):
+            for j in range(cols):
+                ax.text(j, i, f"{values[i, j]:.1f}", ha="center", va="center", color="white")
     fig.colorbar(cax, ax=ax, label="週実働時間")
     ax.set_xlabel("週")
     ax.set_ylabel("社員")
@@ -133,7 +444,7 @@ def plot_weekday_slot_heatmap(slot_df: pd.DataFrame):
     if slot_df.empty:
         return None
     ordered = slot_df.pivot(index="weekday", columns="slot", values="count").reindex(WEEKDAY_LABELS[:5])
-    fig, ax = plt.subplots()
+    fig, ax = get_pyplot().subplots()
     data = ordered.fillna(0).values
     cax = ax.imshow(data, aspect="auto")
     ax.set_xticks(range(ordered.shape[1]))
@@ -152,6 +463,7 @@ def plot_weekday_slot_heatmap(slot_df: pd.DataFrame):
     return fig
 
 
+@timed("plot.weekday_slot_heatmap_working")
 def plot_weekday_slot_heatmap_working(slot_df: pd.DataFrame):
     """勤務あり（minutes>0）だけの曜日×時間帯ヒートマップ。
 
@@ -166,7 +478,7 @@ def plot_weekday_slot_heatmap_working(slot_df: pd.DataFrame):
         .reindex(index=WEEKDAY_LABELS[:5], columns=WORKING_SLOTS_ORDER)
         .fillna(0)
     )
-    fig, ax = plt.subplots()
+    fig, ax = get_pyplot().subplots()
     data = pivot.values
     cax = ax.imshow(data, aspect="auto")
     ax.set_xticks(range(pivot.shape[1]))
@@ -187,10 +499,40 @@ def plot_weekday_slot_heatmap_working(slot_df: pd.DataFrame):
     return fig
 
 
+@timed("plot.staffing_heatmap")
+def plot_staffing_heatmap(coverage_df: pd.DataFrame, by: str):
+    """曜日（または日付）×時刻の在籍人数ヒートマップ。横軸は2時間ごとに目盛りを振る。"""
+
+    if coverage_df.empty:
+        return None
+    pivot = coverage_df.pivot(index=by, columns="minute", values="headcount")
+    if by == "weekday":
+        pivot = pivot.reindex(index=[label for label in WEEKDAY_LABELS if label in pivot.index])
+        ylabels = [str(label) for label in pivot.index]
+    else:
+        weekdays = coverage_df.drop_duplicates("date").set_index("date")["weekday"]
+        ylabels = [f"{day:%m/%d}({weekdays[day]})" for day in pivot.index]
+    minutes = pivot.columns.to_numpy()
+    fig, ax = get_pyplot().subplots(figsize=(10, max(3.0, len(pivot) * 0.25)))
+    cax = ax.imshow(pivot.to_numpy(), aspect="auto", interpolation="nearest")
+    ticks = [index for index, minute in enumerate(minutes) if minute % 120 == 0]
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([f"{minutes[index] // 60:02d}:00" for index in ticks])
+    step = max(1, math.ceil(len(ylabels) / HEATMAP_MAX_YTICKS))
+    ax.set_yticks(range(0, len(ylabels), step))
+    ax.set_yticklabels(ylabels[::step])
+    fig.colorbar(cax, ax=ax, label="人数")
+    ax.set_xlabel("時刻")
+    ax.set_ylabel("曜日" if by == "weekday" else "日付")
+    ax.set_title("時間帯別の在籍人数")
+    return fig
+
+
+@timed("plot.weekday_na_bar")
 def plot_weekday_na_bar(na_df: pd.DataFrame):
     if na_df.empty:
         return None
-    fig, ax = plt.subplots()
+    fig, ax = get_pyplot().subplots()
     ax.bar(na_df["weekday"].astype(str), na_df["count"].astype(int))
     ax.set_xlabel("曜日")
     ax.set_ylabel("NA件数")
@@ -199,48 +541,185 @@ def plot_weekday_na_bar(na_df: pd.DataFrame):
     return fig
 
 
-def export_csv(df: pd.DataFrame) -> bytes:
-    return df.to_csv(index=False).encode("utf-8-sig")
+@timed("plot.to_png")
+def figure_to_png(fig) -> Optional[bytes]:
+    """図を PNG に変換して閉じる（pyplot が図を保持し続けないように）。"""
+
+    if fig is None:
+        return None
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=FIGURE_DPI, bbox_inches="tight")
+    get_pyplot().close(fig)
+    return buffer.getvalue()
+
+
+# 描画結果は入力の集計テーブル（と表示オプション）のハッシュでキャッシュし、
+# 再実行時に内容が変わっていないグラフは描き直さない
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_employee_trend(stats_df: pd.DataFrame, employee: str, target_hours: float) -> Optional[bytes]:
+    return figure_to_png(plot_employee_trend(stats_df, employee, target_hours))
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_employee_heatmap(
+    stats_df: pd.DataFrame, page: Optional[int], page_size: int, sort_by_hours: bool
+) -> Optional[bytes]:
+    return figure_to_png(plot_employee_heatmap(stats_df, page, page_size, sort_by_hours))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_weekday_slot_heatmap_working(slot_df: pd.DataFrame) -> Optional[bytes]:
+    return figure_to_png(plot_weekday_slot_heatmap_working(slot_df))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_staffing_heatmap(coverage_df: pd.DataFrame, by: str) -> Optional[bytes]:
+    return figure_to_png(plot_staffing_heatmap(coverage_df, by))
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_weekday_na_bar(na_df: pd.DataFrame) -> Optional[bytes]:
+    return figure_to_png(plot_weekday_na_bar(na_df))
+
+
+def export_bundle(tables: Dict[str, pd.DataFrame], fmt: str) -> bytes:
+    """全テーブルを1つの ZIP にまとめる。一時ファイルに逐次書き込み、最後に ZIP だけを読み出す。"""
+
+    with tempfile.TemporaryFile() as fh:
+        write_export_bundle(fh, tables, fmt)
+        fh.seek(0)
+        return fh.read()
+
+
+def render_profile_panel(profile: Optional[RunProfile]) -> None:
+    """サイドバー下部の計測パネル。計測の有効化と、直前の実行の区間ごとの内訳を表示する。"""
+
+    st.sidebar.checkbox("処理時間を計測", key="profile_enabled")
+    st.sidebar.checkbox("cProfile も取得（遅くなります）", key="profile_cprofile")
+    if profile is None:
+        return
+    with st.sidebar.expander(f"処理時間の内訳（合計 {profile.total_seconds:.2f} 秒）"):
+        st.dataframe(profile.summary(), hide_index=True)
+        st.download_button(
+            "計測結果 JSON",
+            data=profile.to_json(),
+            file_name=f"shiftsumma_profile_{profile.created_at.replace(':', '')}.json",
+            mime="application/json",
+        )
+        if profile.cprofile_text:
+            st.code(profile.cprofile_text, language=None)
 
 
 def main():
-    configure_matplotlib_font()
     st.set_page_config(page_title=PAGE_TITLE, layout="wide")
     st.title(PAGE_TITLE)
 
+    # 計測の設定はパネル（サイドバー最下部）で変更され、次の再実行から反映される
+    enabled = bool(st.session_state.get("profile_enabled", False))
+    cprofile = enabled and bool(st.session_state.get("profile_cprofile", False))
+    with profile_run(enabled, label="streamlit", cprofile=cprofile) as profile:
+        render_dashboard()
+    parse_profiles = st.session_state.pop("parse_profiles", [])
+    if profile is not None:
+        profile = merge_profiles([profile, *parse_profiles])
+    render_profile_panel(profile)
+
+
+def render_dashboard():
     st.sidebar.header("入力設定")
-    uploaded = st.sidebar.file_uploader("シフトファイルをアップロード", type=["pdf", "xlsx", "xls"])
+    uploads = st.sidebar.file_uploader(
+        "シフトファイルをアップロード（複数可）", type=["pdf", "xlsx", "xls"], accept_multiple_files=True
+    )
     target_month = st.sidebar.text_input("対象年月 (YYYY-MM)", value=datetime.today().strftime("%Y-%m"))
     full_threshold = st.sidebar.number_input("Full判定閾値(分)", value=270, step=30)
     half_threshold = st.sidebar.number_input("半日判定閾値(分)", value=180, step=30)
     exclude_input = st.sidebar.text_input("除外社員ID(カンマ区切り)")
     exclude_ids = [x.strip() for x in exclude_input.split(",") if x.strip()]
+    week_start = st.sidebar.selectbox("週の開始曜日", range(7), format_func=lambda index: f"{WEEKDAY_LABELS[index]}曜")
+    holiday_file = st.sidebar.file_uploader("祝日カレンダー (CSV・任意)", type=["csv"])
+    holidays = read_holidays(holiday_file.getvalue()) if holiday_file is not None else frozenset()
+    calendar = CalendarConfig(week_start=int(week_start), holidays=holidays)
+    policy = st.sidebar.selectbox(
+        "複数ファイルで社員・日付が重複した場合",
+        CONFLICT_POLICIES,
+        format_func=CONFLICT_POLICY_LABELS.get,
+        disabled=len(uploads or []) < 2,
+    )
 
     run_button = st.sidebar.button("集計実行")
     sample_button = st.sidebar.button("サンプルデータで試す")
 
     config = ShiftParseConfig(full_threshold_minutes=int(full_threshold), half_min_minutes=int(half_threshold))
 
-    if "shift_df" not in st.session_state:
-        st.session_state.shift_df = pd.DataFrame()
-
-    if run_button and uploaded:
-        shift_df = parse_uploaded_file(uploaded, target_month, config)
-        shift_df = apply_exclusions(shift_df, exclude_ids)
-        st.session_state.shift_df = shift_df
+    if "raw_parts" not in st.session_state:
+        st.session_state.raw_parts = []
+        st.session_state.raw_name = None
+
+    if run_button and uploads:
+        supported = [upload for upload in uploads if Path(upload.name).suffix.lower() in SUPPORTED_UPLOAD_SUFFIXES]
+        if len(supported) < len(uploads):
+            st.warning("PDF か Excel ファイルをアップロードしてください。")
+        memo = get_frame_memo()
+        if supported and all(upload_key(upload, target_month) in memo for upload in supported):
+            # 全て解析済みならジョブにせずそのまま使う
+            parts = [(parse_uploaded_file(upload, target_month), upload.name) for upload in supported]
+            load_raw_frames(parts, exclude_ids)
+        elif supported:
+            # 解析はファイルごとのジョブとしてワーカー（上限つき）で並行に進め、画面は進捗表示だけ先に返す。
+            # 連打しても同じジョブに合流する。解析済みのファイルはジョブにせずメモから読む
+            files = []
+            for upload in supported:
+                key = upload_key(upload, target_month)
+                if key not in memo:
+                    start_parse_job(upload, target_month)
+                files.append((key, upload.name))
+            st.session_state.parse_job = {"files": files, "exclude_ids": exclude_ids}
     elif sample_button:
-        st.session_state.shift_df = generate_sample_records(target_month)
+        load_raw_frames([(generate_sample_records(target_month), None)], [])
+
+    collect_parse_job()
+
+    cache_stats = get_parse_cache().stats()
+    memo_stats = get_frame_memo().stats()
+    st.sidebar.caption(
+        f"解析キャッシュ: ヒット {cache_stats['hits']} / ミス {cache_stats['misses']}"
+        f" ・ 集計メモ: ヒット {memo_stats['hits']} / ミス {memo_stats['misses']}"
+    )
 
-    shift_df = st.session_state.shift_df
+    parts = st.session_state.raw_parts
+    merged = None
+    if not parts:
+        raw_key, source, shift_df = None, None, pd.DataFrame()
+    elif len(parts) == 1:
+        raw_key, source = parts[0]["key"], parts[0]["source"]
+        shift_df = classify_cached(raw_key, source, config, parts[0]["df"], calendar)
+    else:
+        merged = merge_cached(parts, config, calendar, policy)
+        # 集計のメモキーは結合元の内容ハッシュと重複の扱いで決まる
+        raw_key, source = "+".join(part["key"] for part in parts), f"merged:{policy}"
+        shift_df = merged.frame
 
     st.subheader("A. データ読み込み・フィルタ")
+    if st.session_state.get("parse_job") is not None:
+        render_parse_progress()
     if shift_df.empty:
         st.info("左側のアップロードまたはサンプルボタンでデータを読み込んでください。")
         return
 
     st.write(f"ShiftRecord 件数: {len(shift_df)}")
+    if merged is not None:
+        st.caption(f"{len(parts)} ファイルを結合（重複 {merged.duplicates} 行を除外）")
+        if not merged.conflicts.empty:
+            n_keys = len(merged.conflicts.drop_duplicates(["employee_id", "date"]))
+            with st.expander(f"内容の異なる重複: {n_keys} 件（{CONFLICT_POLICY_LABELS[policy]}）"):
+                st.dataframe(merged.conflicts, hide_index=True)
     st.warning(compute_warning(shift_df))
 
+    # 全タブ・エクスポートで同じ集計結果を共有する
+    stats = stats_cached(raw_key, source, config, shift_df, calendar)
+
     tabs = st.tabs(
         [
             "社員×週の実働時間",
@@ -251,55 +730,104 @@ def main():
 
     with tabs[0]:
         st.subheader("B. 社員別×週別の実働時間・フェアネス")
-        weekly_emp = weekly_employee_stats(shift_df)
+        weekly_emp = stats.weekly_employee
         st.dataframe(weekly_emp)
 
         target_hours = st.number_input("社員共通 目標週時間", value=20.0, step=1.0)
         employees = weekly_emp["employee_id"].unique().tolist()
         if employees:
             selected_emp = st.selectbox("表示する社員", employees)
-            fig = plot_employee_trend(weekly_emp, selected_emp, target_hours)
-            st.pyplot(fig)
-
-            heatmap_fig = plot_employee_heatmap(weekly_emp)
-            if heatmap_fig:
-                st.pyplot(heatmap_fig)
+            with span("render.employee_trend"):
+                st.image(render_employee_trend(weekly_emp, selected_emp, float(target_hours)))
+
+            page = None
+            sort_by_hours = False
+            if len(employees) > HEATMAP_PAGE_SIZE:
+                # 社員が多い場合はページ送り（または全員の概要表示）にする
+                sort_by_hours = st.checkbox("合計実働時間の多い順に並べる")
+                pages = heatmap_page_count(len(employees))
+                if not st.checkbox("全員を概要表示（数値・社員番号は間引き）"):
+                    page = int(st.number_input(f"ページ (1〜{pages})", min_value=1, max_value=pages, value=1)) - 1
+            with span("render.employee_heatmap"):
+                heatmap_png = render_employee_heatmap(weekly_emp, page, HEATMAP_PAGE_SIZE, sort_by_hours)
+                if heatmap_png:
+                    st.image(heatmap_png)
         else:
             st.info("社員データがありません")
 
     with tabs[1]:
         st.subheader("C. 曜日×時間帯のシフト配置")
         st.markdown("#### (A) 勤務ありのみ（minutes>0 / AM半日・Full・PM半日）")
-        working_slot_df = weekday_slot_stats_working(shift_df)
+        working_slot_df = stats.weekday_slot_working
         st.dataframe(working_slot_df)
-        working_heatmap = plot_weekday_slot_heatmap_working(working_slot_df)
-        if working_heatmap:
-            st.pyplot(working_heatmap)
+        with span("render.weekday_slot_heatmap_working"):
+            working_heatmap = render_weekday_slot_heatmap_working(working_slot_df)
+            if working_heatmap:
+                st.image(working_heatmap)
 
         st.markdown("#### (B) NA（非勤務）だけの件数（平日のみ / minutes==0）")
-        na_df = weekday_na_counts(shift_df)
+        na_df = stats.weekday_na
         st.dataframe(na_df)
-        na_bar = plot_weekday_na_bar(na_df)
-        if na_bar:
-            st.pyplot(na_bar)
+        with span("render.weekday_na_bar"):
+            na_bar = render_weekday_na_bar(na_df)
+            if na_bar:
+                st.image(na_bar)
 
         st.caption("勤務ありの分布（偏り）と、非勤務/欠損（NA）を切り分けて確認できます。")
 
+        st.markdown("#### (C) 時間帯別の在籍人数（入〜退の時刻から分単位で集計）")
+        coverage_by = st.radio(
+            "集計単位", COVERAGE_GROUPS, horizontal=True, format_func=COVERAGE_GROUP_LABELS.get, key="coverage_by"
+        )
+        coverage_bin = st.selectbox(
+            "刻み(分)", COVERAGE_BIN_CHOICES, key="coverage_bin", help="刻み内の平均人数を表示します（peak は最大人数）。"
+        )
+        coverage_df = coverage_cached(raw_key, source, config, shift_df, coverage_by, coverage_bin)
+        with span("render.staffing_heatmap"):
+            coverage_heatmap = render_staffing_heatmap(coverage_df, coverage_by)
+            if coverage_heatmap:
+                st.image(coverage_heatmap)
+        st.download_button(
+            "時間帯別在籍人数 CSV",
+            data=partial(export_csv, coverage_df),
+            file_name=f"staffing_coverage_{coverage_by}_{coverage_bin}min.csv",
+        )
+
     with tabs[2]:
         st.subheader("D. データエクスポート")
-        weekly_emp = weekly_employee_stats(shift_df)
-        slot_df = weekday_slot_stats(shift_df)
-        working_slot_df = weekday_slot_stats_working(shift_df)
-        na_df = weekday_na_counts(shift_df)
-        st.download_button("ShiftRecord CSV", data=export_csv(shift_df), file_name="shift_records.csv")
-        st.download_button("WeeklyEmployeeStats CSV", data=export_csv(weekly_emp), file_name="weekly_employee_stats.csv")
-        st.download_button("WeekdaySlotStats CSV", data=export_csv(slot_df), file_name="weekday_slot_stats.csv")
+        # ボタンには生成関数を渡し、クリックされたときだけファイルを作る
+        tables = export_tables(shift_df, stats)
+        export_format = st.radio("形式", ["csv", "parquet"], horizontal=True, format_func=str.upper)
+        st.download_button(
+            "全テーブルを ZIP でダウンロード",
+            data=partial(export_bundle, tables, export_format),
+            file_name=f"shiftsumma_{export_format}.zip",
+            mime="application/zip",
+        )
+        st.caption("個別の CSV")
+        st.download_button("ShiftRecord CSV", data=partial(export_csv, shift_df), file_name="shift_records.csv")
+        st.download_button(
+            "WeeklyEmployeeStats CSV",
+            data=partial(export_csv, stats.weekly_employee),
+            file_name="weekly_employee_stats.csv",
+        )
+        st.download_button(
+            "WeekdaySlotStats CSV", data=partial(export_csv, stats.weekday_slot), file_name="weekday_slot_stats.csv"
+        )
         st.download_button(
             "WeekdaySlotStats(working) CSV",
-            data=export_csv(working_slot_df),
+            data=partial(export_csv, stats.weekday_slot_working),
             file_name="weekday_slot_stats_working.csv",
         )
-        st.download_button("WeekdayNA(counts) CSV", data=export_csv(na_df), file_name="weekday_na_counts.csv")
+        st.download_button(
+            "WeekdayNA(counts) CSV", data=partial(export_csv, stats.weekday_na), file_name="weekday_na_counts.csv"
+        )
+
+        st.caption("履歴ストア（月をまたぐ集計用）")
+        if st.button("この月のデータを履歴に保存"):
+            # 同じファイル名で保存し直した場合は置き換える
+            months = get_history_store().append(shift_df, source=st.session_state.raw_name)
+            st.success(f"保存しました: {', '.join(months)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""性能計測用スクリプト（python -m benchmarks.<name> で実行）。"""
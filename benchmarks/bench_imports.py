@@ -0,0 +1,117 @@
+"""主要モジュールの import 時間（コールドスタート）を計測する。
+
+    python -m benchmarks.bench_imports --repeat 5 --output import_times.json
+    python -m benchmarks.bench_imports --baseline import_times.json --tolerance 0.3
+
+各モジュールを新しいインタープリタで `-X importtime` 付きで import し、
+累積 import 時間の中央値を JSON で出力する。--baseline を渡すと、
+基準値から tolerance を超えて遅くなったモジュールがあれば終了コード 1 を返す。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TARGET_MODULES = [
+    "app",
+    "analytics.stats",
+    "parsers.cache",
+    "parsers.excel_parser",
+    "parsers.pdf_parser",
+    "shiftsumma.cli",
+]
+# 起動時に読み込まれていないことを確認したい重いモジュール
+HEAVY_MODULES = ["matplotlib", "pdfplumber", "openpyxl"]
+
+
+def measure_import(module: str) -> Dict[str, object]:
+    """新しいプロセスで module を import し、累積時間(ms)と読み込まれた重いモジュールを返す。"""
+
+    code = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us: Optional[int] = None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative_us = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(",") if name]
+    return {"cumulative_ms": (cumulative_us or 0) / 1000, "heavy_modules": loaded}
+
+
+def run(modules: Sequence[str], repeat: int) -> Dict[str, Dict[str, object]]:
+    report: Dict[str, Dict[str, object]] = {}
+    for module in modules:
+        samples: List[float] = []
+        heavy: List[str] = []
+        for _ in range(repeat):
+            measured = measure_import(module)
+            samples.append(measured["cumulative_ms"])
+            heavy = measured["heavy_modules"]
+        report[module] = {
+            "median_ms": round(statistics.median(samples), 2),
+            "min_ms": round(min(samples), 2),
+            "samples_ms": [round(sample, 2) for sample in samples],
+            "heavy_modules": heavy,
+        }
+    return report
+
+
+def find_regressions(report, baseline, tolerance: float) -> List[str]:
+    messages = []
+    for module, result in report.items():
+        base = baseline.get(module)
+        if not base:
+            continue
+        limit = base["median_ms"] * (1 + tolerance)
+        if result["median_ms"] > limit:
+            messages.append(f"{module}: {result['median_ms']}ms > {limit:.2f}ms (baseline {base['median_ms']}ms)")
+        new_heavy = set(result["heavy_modules"]) - set(base.get("heavy_modules", []))
+        if new_heavy:
+            messages.append(f"{module}: 新たに {', '.join(sorted(new_heavy))} を import している")
+    return messages
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=TARGET_MODULES, help="計測するモジュール")
+    parser.add_argument("--repeat", type=int, default=5, help="モジュールごとの計測回数")
+    parser.add_argument("--output", type=Path, help="結果 JSON の出力先（省略時は標準出力）")
+    parser.add_argument("--baseline", type=Path, help="比較対象の結果 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="許容する悪化率 (0.3 = 30%%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.modules, max(1, args.repeat))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = find_regressions(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
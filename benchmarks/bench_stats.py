@@ -0,0 +1,133 @@
+"""analytics.stats のレコード構築・集計（時間帯別の在籍人数を含む）・エクスポートを規模別に計測する。
+
+    python -m benchmarks.bench_stats --scales 10 100 1000 10000 --months 1 --output bench_stats.json
+
+社員数（scales）ごとに合成データを生成し、各関数の実行時間の中央値を
+JSON レポート（コミット間で比較できる形式）に書き出す。
+ShiftRecord オブジェクトを経由する関数は --max-object-rows を超える規模では計測しない。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from analytics import coverage, stats
+from analytics.export import export_csv
+from benchmarks.workload import generate_workload, workload_rows
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SCALES = [10, 100, 1000]
+DEFAULT_MAX_OBJECT_ROWS = 500_000
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def time_call(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {"median_s": statistics.median(samples), "min_s": min(samples)}
+
+
+def bench_scale(n_employees: int, months: int, repeat: int, max_object_rows: int, seed: int = 0) -> List[Dict]:
+    workload = generate_workload(n_employees, months=months, seed=seed)
+    rows = len(workload)
+    shift_df = stats.build_shift_frame(workload)
+
+    cases: Dict[str, Callable[[], object]] = {}
+    if rows <= max_object_rows:
+        row_dicts = workload_rows(workload)
+        records = stats.build_shift_records_from_rows(row_dicts)
+        cases["build_shift_records_from_rows"] = lambda: stats.build_shift_records_from_rows(row_dicts)
+        cases["to_dataframe"] = lambda: stats.to_dataframe(records)
+    cases["build_shift_frame"] = lambda: stats.build_shift_frame(workload)
+    batch = stats.build_shift_record_batch(workload)
+    cases["build_shift_record_batch"] = lambda: stats.build_shift_record_batch(workload)
+    cases["batch_to_dataframe"] = lambda: stats.to_dataframe(batch)
+    cases["weekly_employee_stats"] = lambda: stats.weekly_employee_stats(shift_df)
+    cases["weekly_team_stats"] = lambda: stats.weekly_team_stats(shift_df)
+    cases["weekday_slot_stats"] = lambda: stats.weekday_slot_stats(shift_df)
+    cases["weekday_slot_stats_working"] = lambda: stats.weekday_slot_stats_working(shift_df)
+    cases["weekday_na_counts"] = lambda: stats.weekday_na_counts(shift_df)
+    # メモ化を避けるため毎回コピーに対して計測する
+    cases["compute_all_stats"] = lambda: stats.compute_all_stats(shift_df.copy(deep=False))
+    cases["staffing_coverage"] = lambda: coverage.staffing_coverage(shift_df, "date", 1)
+    cases["export_csv"] = lambda: export_csv(shift_df)
+
+    results = []
+    for name, func in cases.items():
+        timing = time_call(func, repeat)
+        results.append(
+            {
+                "function": name,
+                "employees": n_employees,
+                "months": months,
+                "rows": rows,
+                "median_s": round(timing["median_s"], 6),
+                "min_s": round(timing["min_s"], 6),
+                "rows_per_s": round(rows / timing["median_s"]) if timing["median_s"] > 0 else None,
+            }
+        )
+    return results
+
+
+def run(scales: Sequence[int], months: int, repeat: int, max_object_rows: int) -> Dict:
+    results: List[Dict] = []
+    for n_employees in scales:
+        results.extend(bench_scale(n_employees, months, repeat, max_object_rows))
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="社員数のリスト")
+    parser.add_argument("--months", type=int, default=1, help="生成する月数")
+    parser.add_argument("--repeat", type=int, default=3, help="関数ごとの計測回数")
+    parser.add_argument("--max-object-rows", type=int, default=DEFAULT_MAX_OBJECT_ROWS, help="オブジェクト経由の関数を計測する最大行数")
+    parser.add_argument("--output", type=Path, help="結果 JSON の出力先（省略時は標準出力）")
+    args = parser.parse_args(argv)
+
+    report = run(args.scales, args.months, max(1, args.repeat), args.max_object_rows)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        for result in report["results"]:
+            print(f"{result['employees']:>7} {result['function']:<30} {result['median_s'] * 1000:10.2f} ms")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""ベンチマーク用の合成シフトデータ生成。
+
+app.py の generate_sample_records（3名固定・平日のみ）を一般化し、
+N 名 × M か月分の行データを列演算でまとめて生成する。
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# (入, 退, 重み)。Full / AM半日 / PM半日 / 夜勤（日付またぎ）が混在するように配分
+SHIFT_PATTERNS = [
+    ("09:00", "18:00", 0.30),
+    ("09:30", "18:30", 0.15),
+    ("10:00", "19:00", 0.10),
+    ("09:00", "13:00", 0.12),
+    ("9:30", "14:00", 0.08),
+    ("13:30", "17:30", 0.12),
+    ("14:00", "18:00", 0.08),
+    ("22:00", "06:00", 0.05),
+]
+STATUSES = ["公休", "非番", "休"]
+WEEKDAY_OFF_RATE = 0.12
+WEEKEND_OFF_RATE = 0.70
+MISSING_TIME_RATE = 0.02
+
+
+def generate_workload(
+    n_employees: int,
+    months: int = 1,
+    start_month: str = "2025-01",
+    seed: int = 0,
+) -> pd.DataFrame:
+    """社員×日の行データ（employee_id, date, start_time, end_time, raw_status）を生成。
+
+    - 休み（公休/非番/休）は平日より土日に多い
+    - 入/退時刻の片方だけ欠けた行を MISSING_TIME_RATE の割合で含む
+    """
+
+    rng = np.random.default_rng(seed)
+    first = pd.Period(start_month, freq="M")
+    dates = pd.date_range(first.start_time, (first + months - 1).end_time.normalize(), freq="D")
+    n_dates = len(dates)
+    total = n_employees * n_dates
+
+    employee_ids = np.array([f"{100000 + idx}" for idx in range(n_employees)], dtype=object)
+    employee_col = np.repeat(employee_ids, n_dates)
+    date_col = np.tile(np.asarray(dates.date, dtype=object), n_employees)
+    is_weekend = np.tile(dates.weekday.to_numpy() >= 5, n_employees)
+
+    off_rate = np.where(is_weekend, WEEKEND_OFF_RATE, WEEKDAY_OFF_RATE)
+    is_off = rng.random(total) < off_rate
+
+    weights = np.array([weight for _, _, weight in SHIFT_PATTERNS])
+    pattern = rng.choice(len(SHIFT_PATTERNS), size=total, p=weights / weights.sum())
+    starts = np.array([start for start, _, _ in SHIFT_PATTERNS], dtype=object)[pattern]
+    ends = np.array([end for _, end, _ in SHIFT_PATTERNS], dtype=object)[pattern]
+    starts[is_off] = None
+    ends[is_off] = None
+
+    missing = rng.random(total)
+    starts[missing < MISSING_TIME_RATE / 2] = None
+    ends[(missing >= MISSING_TIME_RATE / 2) & (missing < MISSING_TIME_RATE)] = None
+
+    statuses = np.full(total, None, dtype=object)
+    statuses[is_off] = np.array(STATUSES, dtype=object)[rng.integers(0, len(STATUSES), size=int(is_off.sum()))]
+
+    return pd.DataFrame(
+        {
+            "employee_id": employee_col,
+            "date": date_col,
+            "start_time": starts,
+            "end_time": ends,
+            "raw_status": statuses,
+        }
+    )
+
+
+def workload_rows(frame: pd.DataFrame) -> List[Dict]:
+    """build_shift_records_from_rows に渡す dict の行リストへ変換。"""
+
+    return frame.to_dict(orient="records")
+
+
+__all__ = ["SHIFT_PATTERNS", "generate_workload", "workload_rows"]
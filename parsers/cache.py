@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from analytics.models import ShiftParseConfig
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("SHIFTSUMMA_CACHE_DIR", Path.home() / ".cache" / "shiftsumma" / "parse"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_SUFFIX = ".parquet"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file) -> str:
+    """パスまたはファイルライクオブジェクトの内容から SHA-256 を計算。
+
+    ファイルライクの場合は読み取り位置を先頭に戻してから返す。
+    """
+
+    digest = hashlib.sha256()
+    if isinstance(file, bytes):
+        digest.update(file)
+        return digest.hexdigest()
+    if isinstance(file, (str, Path)):
+        with open(file, "rb") as fh:
+            for chunk in iter(lambda: fh.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    if hasattr(file, "getbuffer"):
+        digest.update(file.getbuffer())
+        return digest.hexdigest()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """ファイル内容ハッシュをキーにした ShiftRecord DataFrame のディスクキャッシュ。
+
+    - 保存形式: Parquet（1エントリ1ファイル）
+    - 上限: max_bytes を超えたら最終アクセスが古い順に削除（LRU）
+    - hits / misses でヒット状況を確認できる
+    """
+
+    def __init__(self, cache_dir: str | Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        content_digest: str,
+        parser_name: str,
+        parser_version: str,
+        target_month: Optional[str] = None,
+        config: Optional[ShiftParseConfig] = None,
+    ) -> str:
+        payload = {
+            "content": content_digest,
+            "parser": parser_name,
+            "version": parser_version,
+            "target_month": target_month,
+            "config": config.to_dict() if config is not None else None,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            df = pd.read_parquet(path)
+        except (FileNotFoundError, OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        # 最終アクセス時刻を更新して LRU の順序に反映
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        path = self._path(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_name, index=False)
+            os.replace(tmp_name, path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        self._evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        df = compute()
+        self.put(key, df)
+        return df
+
+    def _entries(self):
+        entries = []
+        for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+
+__all__ = ["DEFAULT_CACHE_DIR", "ParseCache", "file_digest"]
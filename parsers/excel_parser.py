@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import List
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
 
 import pandas as pd
 
-from analytics.stats import build_shift_records_from_rows, ShiftParseConfig
+from analytics.profiling import span
+from analytics.stats import build_raw_shift_frame, classify_slots, ShiftParseConfig
+from parsers.cache import ParseCache, file_digest
+from parsers.jobs import ProgressCallback
 
 
 EXPECTED_COLUMNS = {
@@ -15,42 +18,156 @@ EXPECTED_COLUMNS = {
     "end_time": "end_time",
     "status": "raw_status",
 }
+# ストリーミング読み込み時の1チャンクあたりの行数
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _infer_value_dtypes(frame: pd.DataFrame) -> pd.DataFrame:
+    """object 列の型を推定し直す（pd.read_excel で読んだ場合と型を揃える）。
+
+    社員IDは整数のまま文字列化したいので対象外（欠損があると float になるため）。
+    """
+
+    inferred = {col: frame[col].infer_objects() for col in frame.columns if col != "employee_id"}
+    return frame.assign(**inferred)
 
 
 class ExcelShiftParser:
-    """Excel からシフトを読み込むシンプルな実装。"""
+    """Excel からシフトを読み込むシンプルな実装。
+
+    read_raw（閾値に依存しない raw テーブル）と classify（slot 判定）の2段階。
+    streaming=True にすると読み取り専用ワークブックから全シートを chunk_size 行ずつ
+    読み込み、チャンク単位で raw テーブルに変換する（.xlsx のみ）。
+    """
+
+    # 読み込みロジックを変えたら上げる（キャッシュキーに含まれる）
+    PARSER_VERSION = "2"
 
-    def __init__(self, config: ShiftParseConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: ShiftParseConfig | None = None,
+        cache: ParseCache | None = None,
+        streaming: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
         self.config = config or ShiftParseConfig()
+        self.cache = cache
+        self.streaming = streaming
+        self.chunk_size = max(1, int(chunk_size))
+
+    def read(self, file, progress: ProgressCallback | None = None) -> pd.DataFrame:
+        return self.classify(self.read_raw(file, progress))
+
+    def read_raw(self, file, progress: ProgressCallback | None = None) -> pd.DataFrame:
+        """閾値に依存しない raw テーブル（build_raw_shift_frame の形式）を返す。
+
+        progress はストリーミング時のみ、チャンクごとに (処理済みシート数, シート数, 行数) で呼ばれる。
+        """
+
+        if self.cache is None:
+            return self._parse_raw(file, progress)
+        # ストリーミングは全シートを読むため、先頭シートのみの通常モードとは別エントリ
+        parser_name = f"{type(self).__name__}:streaming" if self._use_streaming(file) else type(self).__name__
+        key = ParseCache.make_key(file_digest(file), parser_name, self.PARSER_VERSION)
+        return self.cache.get_or_compute(key, lambda: self._parse_raw(file, progress))
+
+    def classify(self, raw: pd.DataFrame) -> pd.DataFrame:
+        return classify_slots(raw, self.config)
 
-    def read(self, file) -> pd.DataFrame:
-        df = pd.read_excel(file)
+    def iter_raw_frames(self, file, progress: ProgressCallback | None = None) -> Iterator[pd.DataFrame]:
+        """全シートを chunk_size 行ずつ読み、チャンクごとの raw テーブルを返す。
+
+        読み込み中に保持するのは1チャンク分の行だけなので、呼び出し側が
+        チャンクを逐次処理すればファイルサイズによらずメモリ使用量は一定。
+        """
+
+        from openpyxl import load_workbook
+
+        with span("excel.open_workbook"):
+            workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            sheet_count = len(workbook.worksheets)
+            produced = 0
+            if progress is not None:
+                progress(0, sheet_count, 0)
+            for sheet_number, worksheet in enumerate(workbook.worksheets, start=1):
+                header: Optional[Sequence] = None
+                buffer: List[tuple] = []
+                for values in worksheet.iter_rows(values_only=True):
+                    if header is None:
+                        if self._is_header_row(values):
+                            header = values
+                        continue
+                    if all(value is None for value in values):
+                        continue
+                    buffer.append(values)
+                    if len(buffer) >= self.chunk_size:
+                        produced += len(buffer)
+                        if progress is not None:
+                            progress(sheet_number - 1, sheet_count, produced)
+                        yield self._chunk_to_raw(buffer, header)
+                        buffer = []
+                if header is not None and buffer:
+                    produced += len(buffer)
+                    yield self._chunk_to_raw(buffer, header)
+                if progress is not None:
+                    progress(sheet_number, sheet_count, produced)
+        finally:
+            workbook.close()
+
+    def _use_streaming(self, file) -> bool:
+        # openpyxl は旧形式の .xls を読めない
+        name = file if isinstance(file, (str, Path)) else getattr(file, "name", "")
+        return self.streaming and Path(str(name)).suffix.lower() != ".xls"
+
+    def _parse_raw(self, file, progress: ProgressCallback | None = None) -> pd.DataFrame:
+        if self._use_streaming(file):
+            frames = list(self.iter_raw_frames(file, progress))
+            if not frames:
+                return build_raw_shift_frame([])
+            # 欠損だけのチャンクは object 型になるため、連結後に列全体で型を揃え直す
+            return _infer_value_dtypes(pd.concat(frames, ignore_index=True))
+        with span("excel.read_excel") as current:
+            df = pd.read_excel(file)
+            current.add(rows=len(df))
         df = self._normalize_columns(df)
-        records = build_shift_records_from_rows(df.to_dict(orient="records"), self.config)
-        return pd.DataFrame([r.to_dict() for r in records])
+        return build_raw_shift_frame(df)
+
+    @staticmethod
+    def _is_header_row(values: Sequence) -> bool:
+        names = {str(value).strip().lower() for value in values if value is not None}
+        return "date" in names and "employee_id" in names
+
+    def _chunk_to_raw(self, rows: List[tuple], header: Sequence) -> pd.DataFrame:
+        width = len(header)
+        with span("excel.chunk", rows=len(rows)):
+            # 行ごとの列数のばらつきを吸収し、セル値は Python オブジェクトのまま保持する
+            padded = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+            columns = [str(name) if name is not None else f"column_{idx}" for idx, name in enumerate(header)]
+            chunk = self._normalize_columns(pd.DataFrame(padded, columns=columns, dtype=object))
+            return _infer_value_dtypes(build_raw_shift_frame(_infer_value_dtypes(chunk)))
 
     def _normalize_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        lower_map = {col.lower(): col for col in df.columns}
+        lower_map = {str(col).strip().lower(): col for col in df.columns}
         rename_map = {}
         for key, target in EXPECTED_COLUMNS.items():
             if key in lower_map:
                 rename_map[lower_map[key]] = target
         normalized = df.rename(columns=rename_map)
-        # 日付を date 型に揃える
+        # 日付を datetime64 に揃える（解釈できない値は NaT → raw テーブル構築時に除外）
         if "date" in normalized.columns:
-            normalized["date"] = normalized["date"].apply(self._parse_date)
+            normalized["date"] = self._parse_dates(normalized["date"])
         return normalized[[col for col in EXPECTED_COLUMNS.values() if col in normalized.columns]]
 
     @staticmethod
-    def _parse_date(value):
-        if pd.isna(value):
-            return None
-        if isinstance(value, datetime):
-            return value.date()
-        try:
-            return pd.to_datetime(value).date()
-        except Exception:
-            return None
+    def _parse_dates(values: pd.Series) -> pd.Series:
+        """日付列を一括変換。ISO 形式で解釈できなかった値だけ書式推定で再解釈する。"""
+
+        parsed = pd.to_datetime(values, errors="coerce", format="ISO8601")
+        leftover = parsed.isna() & values.notna()
+        if leftover.any():
+            parsed[leftover] = pd.to_datetime(values[leftover].astype(str), errors="coerce", format="mixed")
+        return parsed
 
 
 __all__ = ["ExcelShiftParser"]
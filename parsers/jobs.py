@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional
+
+import pandas as pd
+
+from analytics.profiling import RunProfile, current_profile, profile_run
+
+# (処理済みページ数, 総ページ数, ここまでの行数)。総ページ数が分からない場合は 0
+ProgressCallback = Callable[[int, int, int], None]
+
+DEFAULT_JOB_WORKERS = 2
+# 終了したジョブ（結果を含む）を何件まで保持するか。超えたら古いものから外す
+MAX_FINISHED_JOBS = 16
+
+
+class ParseCancelled(Exception):
+    """解析ジョブがキャンセルされた（進捗報告の時点で中断する）。"""
+
+
+@dataclass(frozen=True)
+class JobProgress:
+    pages_done: int = 0
+    pages_total: int = 0
+    rows: int = 0
+
+    @property
+    def fraction(self) -> float:
+        if self.pages_total <= 0:
+            return 0.0
+        return min(1.0, self.pages_done / self.pages_total)
+
+
+class ParseJob:
+    """バックグラウンドで実行中の解析1件。report を進捗コールバックとしてパーサーに渡す。
+
+    キャンセルは report の呼び出し時（ページの区切り）に ParseCancelled を送出して反映する。
+    """
+
+    def __init__(self, key: Hashable, label: str = "") -> None:
+        self.key = key
+        self.label = label
+        self.started_at = time.monotonic()
+        self.progress = JobProgress()
+        # 投入時に計測が有効だった場合の、このジョブ（ワーカースレッド）で記録した区間
+        self.profile: Optional[RunProfile] = None
+        self._cancel = threading.Event()
+        self._future: Optional[Future] = None
+
+    def report(self, pages_done: int, pages_total: int, rows: int) -> None:
+        if self._cancel.is_set():
+            raise ParseCancelled(self.label or str(self.key))
+        # 不変オブジェクトの差し替えなので、読み取り側はロック不要
+        self.progress = JobProgress(pages_done, pages_total, rows)
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        if self._future is not None:
+            self._future.cancel()  # 開始前ならそのまま取り消される
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    @property
+    def state(self) -> str:
+        """"running" / "cancelled" / "failed" / "done" のいずれか。"""
+
+        if not self.done():
+            return "cancelled" if self.cancelled else "running"
+        if self._future.cancelled() or self.cancelled:
+            return "cancelled"
+        return "failed" if self._future.exception() is not None else "done"
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def result(self, timeout: Optional[float] = None) -> pd.DataFrame:
+        """結果を待って返す。キャンセル済みなら ParseCancelled、失敗時は解析の例外を送出する。"""
+
+        try:
+            return self._future.result(timeout)
+        except CancelledError as exc:
+            raise ParseCancelled(self.label or str(self.key)) from exc
+
+    def exception(self) -> Optional[BaseException]:
+        """失敗時の例外。実行中・キャンセル済みなら None。"""
+
+        if self.state != "failed":
+            return None
+        return self._future.exception()
+
+
+def _run_job(func: Callable[[ParseJob], pd.DataFrame], job: ParseJob, profiled: bool) -> pd.DataFrame:
+    # 投入した再実行の RunProfile は終わっているので、ジョブ専用の RunProfile に差し替えて記録する
+    with profile_run(profiled, label=f"parse:{job.label or job.key}") as profile:
+        job.profile = profile
+        return func(job)
+
+
+class ParseJobManager:
+    """解析ジョブをワーカースレッドで実行する。同じキーの実行中ジョブには新しく投入せず合流させる。"""
+
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="shiftsumma-parse")
+        self._jobs: Dict[Hashable, ParseJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, func: Callable[[ParseJob], pd.DataFrame], label: str = "") -> ParseJob:
+        """func(job) を実行するジョブを返す。同じ key のジョブが実行中ならそれを返す。
+
+        呼び出し元で計測（profile_run）が有効なら、ジョブ専用の RunProfile に区間を記録して job.profile に残す。
+        ワーカースレッドには呼び出し元のコンテキスト変数を引き継ぐ。
+        """
+
+        with self._lock:
+            existing = self._jobs.get(key)
+            if existing is not None and not existing.done() and not existing.cancelled:
+                return existing
+            job = ParseJob(key, label)
+            context = contextvars.copy_context()
+            job._future = self._executor.submit(context.run, _run_job, func, job, current_profile() is not None)
+            self._jobs.pop(key, None)
+            self._jobs[key] = job
+            self._prune()
+            return job
+
+    def _prune(self) -> None:
+        finished = [key for key, job in self._jobs.items() if job.done()]
+        for key in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[key]
+
+    def get(self, key: Hashable) -> Optional[ParseJob]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def running(self) -> List[ParseJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done()]
+
+    def shutdown(self) -> None:
+        for job in self.running():
+            job.cancel()
+        self._executor.shutdown(wait=True)
+
+
+__all__ = [
+    "DEFAULT_JOB_WORKERS",
+    "MAX_FINISHED_JOBS",
+    "JobProgress",
+    "ParseCancelled",
+    "ParseJob",
+    "ParseJobManager",
+    "ProgressCallback",
+]
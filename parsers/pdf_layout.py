@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import statistics
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from parsers.cache import DEFAULT_CACHE_DIR
+
+DEFAULT_LAYOUT_PATH = DEFAULT_CACHE_DIR.parent / "pdf_layouts.json"
+LAYOUT_FORMAT_VERSION = 1
+WEEKDAY_TEXTS = ("月", "火", "水", "木", "金", "土", "日")
+SECTION_TEXTS = ("入", "退")
+EMPLOYEE_ID_PATTERN = re.compile(r"^\d{6,}$")
+# 曜日ラベルの位置ずれとして許容する幅(pt)。超えたらレイアウトが変わったとみなす
+COLUMN_TOLERANCE = 1.0
+# 表領域・曜日行の上下左右に持たせる余白(pt)
+REGION_MARGIN = 2.0
+
+
+def is_row_anchor(word: dict) -> bool:
+    """行の目印（入/退ラベルか社員番号）なら True。表の左端はこれらの左端で決まる。"""
+
+    text = (word.get("text") or "").strip()
+    return text in SECTION_TEXTS or bool(EMPLOYEE_ID_PATTERN.match(text))
+
+
+def detect_day_columns(words: List[dict]) -> List[float]:
+    """曜日ラベルの x0 (小数1桁) を昇順で返す。"""
+
+    return sorted({round(word["x0"], 1) for word in words if word.get("text") in WEEKDAY_TEXTS})
+
+
+@dataclass(frozen=True)
+class PdfLayout:
+    """シフト表1ページ分のレイアウト（日の列位置と表領域）。
+
+    表の下端は社員数で月ごとに変わるため持たない（ページ下端まで）。
+    """
+
+    page_width: float
+    page_height: float
+    columns: Tuple[float, ...]
+    header_top: float
+    header_bottom: float
+    table_left: float
+    table_right: float
+
+    @property
+    def fingerprint(self) -> str:
+        payload = json.dumps(
+            [
+                round(self.page_width),
+                round(self.page_height),
+                self.columns,
+                round(self.header_top, 1),
+                # 見出しが同じで表だけずれたレイアウトも別テンプレートとして持てるようにする
+                round(self.table_left, 1),
+            ]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def table_bbox(self) -> Tuple[float, float, float, float]:
+        return (self.table_left, self.header_top, self.table_right, self.page_height)
+
+    @property
+    def header_bbox(self) -> Tuple[float, float, float, float]:
+        return (self.table_left, self.header_top, self.table_right, self.header_bottom)
+
+    @property
+    def anchor_bbox(self) -> Tuple[float, float, float, float]:
+        """曜日行より下・最初の日の列より左の帯（行の目印がある範囲。表が左右にずれても収まる）。"""
+
+        return (0.0, self.header_bottom, self.columns[0], self.page_height)
+
+    def contains(self, word: dict) -> bool:
+        return (
+            word["x0"] >= self.table_left
+            and word["x1"] <= self.table_right
+            and word["top"] >= self.header_top
+        )
+
+    def matches_header(self, header_words: List[dict]) -> bool:
+        """曜日行の単語が同じ列位置に並んでいれば True。"""
+
+        columns = detect_day_columns(header_words)
+        if len(columns) != len(self.columns):
+            return False
+        return all(abs(found - known) <= COLUMN_TOLERANCE for found, known in zip(columns, self.columns))
+
+    def matches_anchors(self, anchor_words: List[dict]) -> bool:
+        """行の目印があり、その左端が table_left と同じ位置なら True（表だけが左右にずれていないか）。"""
+
+        anchors = [word for word in anchor_words if is_row_anchor(word)]
+        if not anchors:
+            return False
+        left = min(word["x0"] for word in anchors) - REGION_MARGIN
+        return abs(left - self.table_left) <= COLUMN_TOLERANCE
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PdfLayout":
+        return cls(**{**data, "columns": tuple(data["columns"])})
+
+
+def detect_layout(page, words: List[dict]) -> Optional[PdfLayout]:
+    """ページ全体の単語からレイアウトを検出。曜日行・社員番号列が無ければ None。"""
+
+    header = [word for word in words if word.get("text") in WEEKDAY_TEXTS]
+    anchors = [word for word in words if is_row_anchor(word)]
+    columns = detect_day_columns(header)
+    if len(columns) < 2 or not anchors:
+        return None
+
+    pitch = statistics.median(right - left for left, right in zip(columns, columns[1:]))
+    return PdfLayout(
+        page_width=float(page.width),
+        page_height=float(page.height),
+        columns=tuple(columns),
+        header_top=min(word["top"] for word in header) - REGION_MARGIN,
+        header_bottom=max(word["bottom"] for word in header) + REGION_MARGIN,
+        table_left=min(word["x0"] for word in anchors) - REGION_MARGIN,
+        # 最終列の右端（次の列があるはずの位置の手前）まで
+        table_right=columns[-1] + pitch - REGION_MARGIN,
+    )
+
+
+class LayoutStore:
+    """検出済みレイアウトの保存先。同じページサイズのテンプレートを曜日行で照合して再利用する。
+
+    - path=None ならメモリ上のみ（永続化しない）
+    - 曜日行の位置や、行の目印（社員番号・入/退）から求めた表の左端が変わったページ
+      （レイアウトのずれ）はテンプレートを使わない
+    - hits / misses / drifts で照合結果を確認できる
+    """
+
+    def __init__(self, path: str | Path | None = DEFAULT_LAYOUT_PATH) -> None:
+        self.path = Path(path) if path is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.drifts = 0
+        self._lock = threading.Lock()
+        self._layouts: Dict[str, PdfLayout] = self._load()
+
+    def __getstate__(self) -> Dict:
+        # ワーカープロセスへ渡せるようロックは除く
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, PdfLayout]:
+        if self.path is None:
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != LAYOUT_FORMAT_VERSION:
+            return {}
+        layouts = {}
+        for item in data.get("layouts", []):
+            try:
+                layout = PdfLayout.from_dict(item)
+            except (TypeError, KeyError):
+                continue
+            layouts[layout.fingerprint] = layout
+        return layouts
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 他プロセスが追加したテンプレートを消さないよう、ディスク上の内容と合わせて書く
+        merged = {**self._load(), **self._layouts}
+        payload = {"version": LAYOUT_FORMAT_VERSION, "layouts": [layout.to_dict() for layout in merged.values()]}
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False)
+            os.replace(tmp_name, self.path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+    def layouts(self) -> List[PdfLayout]:
+        with self._lock:
+            return list(self._layouts.values())
+
+    def match(self, page) -> Optional[PdfLayout]:
+        """ページに合うテンプレートを返す。曜日行と表の左の帯だけを切り出して照合する。
+
+        見出しが同じでも表の位置がずれていれば、古い切り出し範囲は使わずに全体検出に戻す。
+        """
+
+        size = (round(float(page.width)), round(float(page.height)))
+        candidates = [
+            layout for layout in self.layouts() if (round(layout.page_width), round(layout.page_height)) == size
+        ]
+        for layout in candidates:
+            header_words = page.crop(layout.header_bbox).extract_words(keep_blank_chars=False)
+            if not layout.matches_header(header_words):
+                continue
+            anchor_words = page.crop(layout.anchor_bbox).extract_words(keep_blank_chars=False)
+            if layout.matches_anchors(anchor_words):
+                with self._lock:
+                    self.hits += 1
+                return layout
+        with self._lock:
+            if candidates:
+                self.drifts += 1
+            else:
+                self.misses += 1
+        return None
+
+    def add(self, layout: PdfLayout) -> None:
+        with self._lock:
+            if layout.fingerprint in self._layouts:
+                return
+            self._layouts[layout.fingerprint] = layout
+            self._save()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "drifts": self.drifts, "layouts": len(self._layouts)}
+
+
+__all__ = [
+    "DEFAULT_LAYOUT_PATH",
+    "EMPLOYEE_ID_PATTERN",
+    "LayoutStore",
+    "PdfLayout",
+    "detect_day_columns",
+    "detect_layout",
+    "is_row_anchor",
+]
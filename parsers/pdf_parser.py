@@ -1,70 +1,340 @@
 from __future__ import annotations
 
+import io
 import re
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Set
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import pdfplumber
 import pandas as pd
 
-from analytics.stats import ShiftParseConfig, build_shift_records_from_rows
+from analytics.profiling import span, timed, timed_iter
+from analytics.stats import ShiftParseConfig, build_raw_shift_frame, classify_slots
+from analytics.timeparse import duration_minutes, parse_hhmm_series
+from parsers.cache import ParseCache, file_digest
+from parsers.jobs import ProgressCallback
+from parsers.pdf_layout import EMPLOYEE_ID_PATTERN, LayoutStore, PdfLayout, detect_day_columns, detect_layout
 
 TIME_PATTERN = re.compile(r"\b(\d{1,2}:\d{2})\b")
 STATUS_PATTERN = re.compile(r"(非番|公休|休)")
-EMPLOYEE_ID_PATTERN = re.compile(r"^\d{6,}$")
+SECTION_LABELS = {"入": "start", "退": "end"}
+# 1ワーカーあたりのページ範囲数。範囲を細かくして負荷の偏りを抑える。
+CHUNKS_PER_WORKER = 4
+
+PdfSource = Union[str, Path, bytes]
+
+# ワーカープロセス側で保持する PDF ソースとレイアウト（initializer で1回だけ受け取る）
+_worker_source: PdfSource | None = None
+_worker_layouts: LayoutStore | None = None
+
+
+def _init_worker(source: PdfSource, layouts: LayoutStore | None = None) -> None:
+    global _worker_source, _worker_layouts
+    _worker_source = source
+    _worker_layouts = layouts
+
+
+def _open_source(source: PdfSource):
+    if isinstance(source, bytes):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+
+def _extract_page_range(page_range: Tuple[int, int], target_month: str) -> List[Dict]:
+    """ワーカー側で PDF を開き、[start, stop) のページから行データを抽出。"""
+
+    start, stop = page_range
+    parser = PdfShiftParser(layouts=_worker_layouts)
+    rows: List[Dict] = []
+    with _open_source(_worker_source) as pdf:
+        for page in pdf.pages[start:stop]:
+            rows.extend(parser._extract_page(page, target_month))
+            page.close()
+    return rows
+
+
+def _split_page_ranges(page_count: int, chunk_count: int) -> List[Tuple[int, int]]:
+    chunk_count = max(1, min(chunk_count, page_count))
+    bounds = [page_count * i // chunk_count for i in range(chunk_count + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(chunk_count) if bounds[i] < bounds[i + 1]]
+
+
+def _midline(word: dict) -> float:
+    return (word["top"] + word["bottom"]) / 2
+
+
+class _PageIndex:
+    """1ページ分の単語を (社員, 日, 入/退) に割り当てる空間インデックス。
+
+    - 日の列: 曜日ラベル x0 の中点を境界にして二分探索（等距離なら左の列）
+    - 社員の行帯: 社員番号の上端から次の社員番号の上端まで
+    - 入/退の区分: 同じ行帯内で、単語の中心線より上にある直近の「入」「退」ラベル
+    - 表の下端: 最後の「入」「退」ラベルの下端（その下の集計行・注記は対象外）
+    各単語の判定は二分探索のみで、ページ全体を1回走査して割り当てる。
+    """
+
+    def __init__(self, words: List[dict], columns: List[float]) -> None:
+        self.words = words
+        self.column_bounds = [(left + right) / 2 for left, right in zip(columns, columns[1:])]
+        self.has_columns = bool(columns)
+
+        anchors = sorted(
+            (word["top"], text)
+            for word in words
+            if EMPLOYEE_ID_PATTERN.match(text := (word.get("text") or "").strip())
+        )
+        self.band_tops = [top for top, _ in anchors]
+        self.band_employees = [employee_id for _, employee_id in anchors]
+
+        labels = sorted(
+            (word["top"], self._band_of(_midline(word)), SECTION_LABELS[word["text"].strip()])
+            for word in words
+            if (word.get("text") or "").strip() in SECTION_LABELS
+        )
+        self.label_tops = [top for top, _, _ in labels]
+        self.label_bands = [band for _, band, _ in labels]
+        self.label_sections = [section for _, _, section in labels]
+        self.table_bottom = max(
+            (word["bottom"] for word in words if (word.get("text") or "").strip() in SECTION_LABELS),
+            default=None,
+        )
+
+    def _band_of(self, y: float) -> Optional[int]:
+        band = bisect_right(self.band_tops, y) - 1
+        return band if band >= 0 else None
+
+    def _section_of(self, y: float, band: int) -> Optional[str]:
+        label = bisect_right(self.label_tops, y) - 1
+        if label < 0 or self.label_bands[label] != band:
+            return None
+        return self.label_sections[label]
+
+    def day_of(self, x0: float) -> int:
+        # 列リストを 1..len で日付にマッピング
+        return bisect_left(self.column_bounds, x0) + 1
+
+    def assign(self) -> Dict[str, List[Tuple[str, int, str]]]:
+        """社員番号ごとの (section, day, text) のリスト。単語の出現順を保つ。"""
+
+        cells: Dict[str, List[Tuple[str, int, str]]] = defaultdict(list)
+        if not self.has_columns or not self.band_tops or self.table_bottom is None:
+            return cells
+        for word in self.words:
+            text = (word.get("text") or "").strip()
+            if not text or text in SECTION_LABELS or EMPLOYEE_ID_PATTERN.match(text):
+                continue
+            y = _midline(word)
+            if y > self.table_bottom:
+                continue
+            band = self._band_of(y)
+            if band is None:
+                continue
+            section = self._section_of(y, band)
+            if section is None:
+                continue
+            cells[self.band_employees[band]].append((section, self.day_of(word["x0"]), text))
+        return cells
 
 
 class PdfShiftParser:
-    """pdfplumber を使った座標ベースのたたき台実装。"""
+    """pdfplumber を使った座標ベースのたたき台実装。
+
+    workers > 1 を指定するとページ範囲をプロセスプールに分配して抽出する。
+    結果の行順は直列実行と同一。cache を渡すと同一内容のファイルは再解析しない。
+
+    解析は2段階: read_raw（閾値に依存しない抽出、キャッシュ対象）と
+    classify（退時刻ずれ補正 + slot 判定）。閾値変更時は classify だけ再実行すればよい。
 
-    def __init__(self, config: ShiftParseConfig | None = None) -> None:
+    layouts（LayoutStore）を渡すと、検出したレイアウトをテンプレートとして保存し、
+    同じレイアウトのページでは曜日行の検出を省いて表領域の単語だけを抽出する。
+    """
+
+    # 抽出ロジックを変えたら上げる（キャッシュキーに含まれる）
+    PARSER_VERSION = "4"
+
+    def __init__(
+        self,
+        config: ShiftParseConfig | None = None,
+        workers: int = 1,
+        cache: ParseCache | None = None,
+        layouts: LayoutStore | None = None,
+    ) -> None:
         self.config = config or ShiftParseConfig()
+        self.workers = max(1, int(workers))
+        self.cache = cache
+        self.layouts = layouts
 
-    def read(self, file, target_month: str) -> pd.DataFrame:
+    def read(self, file, target_month: str, progress: ProgressCallback | None = None) -> pd.DataFrame:
         # target_month: "YYYY-MM"
-        rows: List[Dict] = []
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                rows.extend(self._extract_page(page, target_month))
-        records = build_shift_records_from_rows(rows, self.config)
-        return pd.DataFrame([r.to_dict() for r in records])
+        return self.classify(self.read_raw(file, target_month, progress))
+
+    def iter_rows(self, file, target_month: str, progress: ProgressCallback | None = None) -> Iterator[Dict]:
+        """ページを処理するたびにその行データを返すジェネレーター。
+
+        処理済みページのキャッシュ（文字・レイアウトオブジェクト）はすぐに解放するため、
+        呼び出し側が逐次処理すればページ数によらずメモリ使用量はほぼ一定。
+        progress を渡すと開始時と各ページ（並列時はページ範囲）の処理後に呼び出す。
+        """
+
+        for rows in self._iter_page_rows(file, target_month, progress):
+            yield from rows
+
+    def iter_raw_frames(self, file, target_month: str) -> Iterator[pd.DataFrame]:
+        """ページごとの raw テーブル（行の無いページは飛ばす）。"""
+
+        for rows in self._iter_page_rows(file, target_month):
+            if rows:
+                yield build_raw_shift_frame(rows)
+
+    def iter_frames(self, file, target_month: str) -> Iterator[pd.DataFrame]:
+        """ページごとの ShiftRecord DataFrame。退時刻ずれ補正はページ内の行どうしで行う。"""
+
+        for raw in self.iter_raw_frames(file, target_month):
+            yield self.classify(raw)
+
+    def read_raw(self, file, target_month: str, progress: ProgressCallback | None = None) -> pd.DataFrame:
+        """閾値に依存しない raw テーブル（build_raw_shift_frame の形式）を返す。
+
+        キャッシュにある場合は解析しないため progress は呼ばれない。
+        """
+
+        if self.cache is None:
+            return self._parse_raw(file, target_month, progress)
+        key = ParseCache.make_key(file_digest(file), type(self).__name__, self.PARSER_VERSION, target_month)
+        return self.cache.get_or_compute(key, lambda: self._parse_raw(file, target_month, progress))
+
+    def classify(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """raw テーブルに現在の閾値設定を適用して ShiftRecord DataFrame を返す。"""
+
+        return classify_slots(self._fix_misaligned_end_times(raw), self.config)
+
+    def _parse_raw(self, file, target_month: str, progress: ProgressCallback | None = None) -> pd.DataFrame:
+        return build_raw_shift_frame(list(self.iter_rows(file, target_month, progress)))
+
+    def _iter_page_rows(
+        self, file, target_month: str, progress: ProgressCallback | None = None
+    ) -> Iterator[List[Dict]]:
+        """ページ（並列時はページ範囲）単位の行データのリストを順に返す。"""
+
+        if self.workers > 1:
+            yield from self._iter_parallel_chunks(file, target_month, progress)
+        else:
+            yield from self._iter_serial_pages(file, target_month, progress)
+
+    def _iter_serial_pages(
+        self, file, target_month: str, progress: ProgressCallback | None = None
+    ) -> Iterator[List[Dict]]:
+        with span("pdf.open"):
+            pdf = pdfplumber.open(file)
+        with pdf:
+            page_count = len(pdf.pages)
+            produced = 0
+            if progress is not None:
+                progress(0, page_count, 0)
+            for number, page in enumerate(pdf.pages, start=1):
+                with span("pdf.page", pages=1) as current:
+                    rows = self._extract_page(page, target_month)
+                    # pdfplumber はページのキャッシュを文書を閉じるまで保持するため、ここで解放する
+                    page.close()
+                    current.add(rows=len(rows))
+                produced += len(rows)
+                if progress is not None:
+                    # キャンセル時はここで例外になり、with を抜けて PDF が閉じられる
+                    progress(number, page_count, produced)
+                yield rows
+
+    def _iter_parallel_chunks(
+        self, file, target_month: str, progress: ProgressCallback | None = None
+    ) -> Iterator[List[Dict]]:
+        source = self._to_source(file)
+        with _open_source(source) as pdf:
+            page_count = len(pdf.pages)
+        if page_count <= 1:
+            yield from self._iter_serial_pages(self._as_openable(source), target_month, progress)
+            return
+
+        page_ranges = _split_page_ranges(page_count, self.workers * CHUNKS_PER_WORKER)
+        workers = min(self.workers, len(page_ranges))
+        pages_done = produced = 0
+        if progress is not None:
+            progress(0, page_count, 0)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source, self.layouts))
+        try:
+            futures = [executor.submit(_extract_page_range, page_range, target_month) for page_range in page_ranges]
+            # 投入順に結果を受け取るため、ページ順が保たれる。ワーカー内の区間は記録されず、待ち時間だけを計測する
+            results = (future.result() for future in futures)
+            for (start, stop), rows in zip(page_ranges, timed_iter("pdf.page_range", results, rows=len)):
+                pages_done += stop - start
+                produced += len(rows)
+                if progress is not None:
+                    progress(pages_done, page_count, produced)
+                yield rows
+        finally:
+            # キャンセル・例外・ジェネレーターの close で抜けた場合は未着手のページ範囲を取り消し、
+            # 実行中の範囲の終了も待たない（with の shutdown(wait=True) は全範囲の完了を待ってしまう）
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _to_source(file) -> PdfSource:
+        """ワーカーへ渡せる形（パスまたはバイト列）に変換。"""
+
+        if isinstance(file, (str, Path, bytes)):
+            return file
+        if hasattr(file, "getvalue"):
+            return file.getvalue()
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return file.read()
+
+    @staticmethod
+    def _as_openable(source: PdfSource):
+        return io.BytesIO(source) if isinstance(source, bytes) else source
 
     def _extract_page(self, page, target_month: str) -> List[Dict]:
-        words = page.extract_words(use_text_flow=True, keep_blank_chars=False)
-        columns = self._detect_day_columns(words)
-        employee_rows = self._group_by_employee(words)
+        cells_by_employee = None
+        with span("pdf.layout_match"):
+            layout = self.layouts.match(page) if self.layouts is not None else None
+        if layout is not None:
+            with span("pdf.extract_words"):
+                words = page.crop(layout.table_bbox).extract_words(use_text_flow=True, keep_blank_chars=False)
+            cells_by_employee = self._assign_cells(words, layout)
+        if not cells_by_employee:
+            # テンプレートが無い・合わない（表から何も取れない）場合はページ全体から検出し直す
+            with span("pdf.extract_words"):
+                words = page.extract_words(use_text_flow=True, keep_blank_chars=False)
+            with span("pdf.detect_layout"):
+                layout = detect_layout(page, words)
+            if layout is None:
+                return []
+            if self.layouts is not None:
+                self.layouts.add(layout)
+            cells_by_employee = self._assign_cells(words, layout)
 
         parsed_rows: List[Dict] = []
-        for employee_id, tokens in employee_rows.items():
-            parsed_rows.extend(
-                self._extract_rows_for_employee(employee_id, tokens, columns, target_month)
-            )
+        with span("pdf.build_rows") as current:
+            for employee_id, cells in cells_by_employee.items():
+                parsed_rows.extend(self._extract_rows_for_employee(employee_id, cells, target_month))
+            current.add(rows=len(parsed_rows))
         return parsed_rows
 
+    @staticmethod
+    @timed("pdf.assign_cells")
+    def _assign_cells(words: List[dict], layout: PdfLayout) -> Dict[str, List[Tuple[str, int, str]]]:
+        table_words = [word for word in words if layout.contains(word)]
+        return _PageIndex(table_words, list(layout.columns)).assign()
+
     def _detect_day_columns(self, words):
         # 曜日行から x0 を抽出し、最寄りの列を求める。
-        day_columns = {}
-        for word in words:
-            if word.get("text") in ["月", "火", "水", "木", "金", "土", "日"]:
-                day_columns[round(word["x0"], 1)] = word.get("text")
-        return sorted(day_columns.keys())
-
-    def _group_by_employee(self, words):
-        employee_rows: Dict[str, List[dict]] = defaultdict(list)
-        current_emp = None
-        for word in words:
-            text = (word.get("text") or "").strip()
-            if not text:
-                continue
-            if EMPLOYEE_ID_PATTERN.match(text):
-                current_emp = text
-            if current_emp:
-                employee_rows[current_emp].append(word)
-        return employee_rows
-
-    def _extract_rows_for_employee(self, employee_id: str, tokens: List[dict], columns, target_month: str):
-        if not tokens:
+        return detect_day_columns(words)
+
+    def _extract_rows_for_employee(self, employee_id: str, cells: List[Tuple[str, int, str]], target_month: str):
+        """(section, day, text) のセル列から日ごとの行データを組み立てる。同じ日・区分は先勝ち。"""
+
+        if not cells:
             return []
 
         start_times: Dict[int, str] = {}
@@ -72,31 +342,14 @@ class PdfShiftParser:
         status_by_day: Dict[int, str] = {}
         days_with_tokens: Set[int] = set()
 
-        current_section = None
-        for token in tokens:
-            text = (token.get("text") or "").strip()
-            if not text:
-                continue
-            if text == "入":
-                current_section = "start"
-                continue
-            if text == "退":
-                current_section = "end"
-                continue
-            if current_section not in {"start", "end"}:
-                continue
-
-            day = self._nearest_day(token.get("x0"), columns)
-            if day is None:
-                continue
-
+        for section, day, text in cells:
             days_with_tokens.add(day)
 
             times = TIME_PATTERN.findall(text)
             if times:
-                if current_section == "start" and day not in start_times:
+                if section == "start" and day not in start_times:
                     start_times[day] = times[0]
-                if current_section == "end" and day not in end_times:
+                if section == "end" and day not in end_times:
                     end_times[day] = times[0]
 
             status_match = STATUS_PATTERN.search(text)
@@ -122,61 +375,46 @@ class PdfShiftParser:
                 row["raw_status"] = status_by_day[day]
             rows.append(row)
 
-        self._fix_misaligned_end_times(rows)
-
         return rows
 
-    def _fix_misaligned_end_times(self, rows: List[Dict]) -> None:
-        if not rows:
-            return
-        for idx in range(len(rows) - 1):
-            curr = rows[idx]
-            nxt = rows[idx + 1]
-            if curr.get("raw_status") or nxt.get("raw_status"):
-                continue
-            if not curr.get("start_time"):
-                continue
-            curr_date = curr.get("date")
-            next_date = nxt.get("date")
-            if not curr_date or not next_date:
-                continue
-            if (next_date - curr_date).days != 1:
-                continue
-            curr_duration = self._duration_minutes(curr.get("start_time"), curr.get("end_time"))
-            next_duration = self._duration_minutes(nxt.get("start_time"), nxt.get("end_time"))
-            if curr_duration is None or next_duration is None:
-                continue
-            if curr_duration >= self.config.full_threshold_minutes:
-                continue
-            if next_duration < self.config.full_threshold_minutes:
-                continue
-            if curr.get("start_time") != nxt.get("start_time"):
-                continue
-            curr["end_time"] = nxt["end_time"]
+    @timed("pdf.fix_end_times")
+    def _fix_misaligned_end_times(self, raw: pd.DataFrame) -> pd.DataFrame:
+        """短い勤務の翌日が同じ入時刻の Full なら、退時刻が1日ずれたとみなして補正。
 
-    @staticmethod
-    def _duration_minutes(start_time: str | None, end_time: str | None) -> int | None:
-        if not start_time or not end_time:
-            return None
-        try:
-            sh, sm = start_time.split(":")
-            eh, em = end_time.split(":")
-            start_minutes = int(sh) * 60 + int(sm)
-            end_minutes = int(eh) * 60 + int(em)
-        except (ValueError, AttributeError):
-            return None
-        duration = end_minutes - start_minutes
-        if duration < 0:
-            duration += 24 * 60
-        return duration
+        同一社員の隣接行どうしを列演算で比較する。各行の判定は補正前の値だけを
+        参照するため、行ごとに順に補正した場合と結果は同じ。
+        """
 
-    @staticmethod
-    def _nearest_day(x0: float, columns) -> int | None:
-        if not columns:
-            return None
-        nearest = min(columns, key=lambda c: abs(c - x0))
-        # 列リストを 1..len で日付にマッピング
-        return columns.index(nearest) + 1
+        if len(raw) < 2:
+            return raw
+
+        end_time = raw["end_time"]
+        start_minutes = parse_hhmm_series(raw["start_time"])
+        duration = pd.Series(duration_minutes(start_minutes, parse_hhmm_series(end_time)), index=raw.index)
+        next_duration = duration.shift(-1)
+        has_status = raw["raw_status"].notna() & raw["raw_status"].astype(str).ne("")
+        dates = pd.to_datetime(raw["date"])
+
+        full_threshold = self.config.full_threshold_minutes
+        target = (
+            raw["employee_id"].eq(raw["employee_id"].shift(-1))
+            & (dates.shift(-1) - dates).eq(pd.Timedelta(days=1))
+            & ~has_status
+            & ~has_status.shift(-1, fill_value=False)
+            & duration.notna()
+            & next_duration.notna()
+            & (duration < full_threshold)
+            & (next_duration >= full_threshold)
+            & start_minutes.eq(start_minutes.shift(-1))
+        )
+        if not target.any():
+            return raw
+
+        fixed = raw.copy()
+        fixed.loc[target, "end_time"] = end_time.shift(-1)[target]
+        # 入時刻が同じなので補正後の実働分は翌日の実働分と一致する
+        fixed.loc[target, "minutes"] = next_duration[target].astype("int64")
+        return fixed
 
 
 __all__ = ["PdfShiftParser"]
@@ -0,0 +1 @@
+"""ShiftSumma のヘッドレス実行用パッケージ（python -m shiftsumma）。"""
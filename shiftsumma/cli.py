@@ -0,0 +1,165 @@
+"""Streamlit を使わずにシフト表を一括解析・集計するコマンドライン。
+
+    python -m shiftsumma rosters/ --month 2025-12 --output out/
+
+UI / 描画系モジュール（streamlit, matplotlib）は import しない。
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SUPPORTED_SUFFIXES = {".pdf", ".xlsx", ".xls"}
+
+
+@dataclass(frozen=True)
+class BatchOptions:
+    target_month: Optional[str]
+    full_threshold_minutes: int
+    half_min_minutes: int
+    output_dir: Path
+    cache_dir: Optional[Path] = None
+    export_format: str = "csv"
+    bundle: bool = False
+
+
+def collect_inputs(patterns: Sequence[str]) -> List[Path]:
+    """ディレクトリ・glob・ファイルパスから対象ファイルを重複なく集める。"""
+
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = sorted(p for p in path.rglob("*") if p.is_file())
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+        for candidate in candidates:
+            if candidate.suffix.lower() in SUPPORTED_SUFFIXES:
+                found.setdefault(candidate.resolve(), None)
+    return list(found)
+
+
+def output_names(paths: Sequence[Path]) -> List[str]:
+    """ファイル名（拡張子なし）から出力ディレクトリ名を作る。重複時は連番を付ける。"""
+
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for path in paths:
+        count = seen.get(path.stem, 0)
+        seen[path.stem] = count + 1
+        names.append(path.stem if count == 0 else f"{path.stem}_{count + 1}")
+    return names
+
+
+def process_file(path: Path, name: str, options: BatchOptions) -> int:
+    """1ファイルを解析・集計して output_dir/name/ 以下（bundle なら output_dir/name.zip）に書き出す。件数を返す。"""
+
+    from analytics.export import export_tables, write_export_bundle, write_export_dir
+    from analytics.models import ShiftParseConfig
+    from analytics.stats import compute_all_stats
+
+    config = ShiftParseConfig(
+        full_threshold_minutes=options.full_threshold_minutes,
+        half_min_minutes=options.half_min_minutes,
+    )
+    cache = None
+    if options.cache_dir is not None:
+        from parsers.cache import ParseCache
+
+        cache = ParseCache(options.cache_dir)
+
+    if path.suffix.lower() == ".pdf":
+        from parsers.pdf_layout import LayoutStore
+        from parsers.pdf_parser import PdfShiftParser
+
+        # キャッシュディレクトリがあればレイアウトのテンプレートも同じ場所に保存して再利用する
+        layouts = LayoutStore(options.cache_dir / "pdf_layouts.json" if options.cache_dir is not None else None)
+        shift_df = PdfShiftParser(config, cache=cache, layouts=layouts).read(str(path), options.target_month)
+    else:
+        from parsers.excel_parser import ExcelShiftParser
+
+        shift_df = ExcelShiftParser(config, cache=cache, streaming=True).read(str(path))
+
+    tables = export_tables(shift_df, compute_all_stats(shift_df))
+    if options.bundle:
+        options.output_dir.mkdir(parents=True, exist_ok=True)
+        write_export_bundle(options.output_dir / f"{name}.zip", tables, options.export_format)
+    else:
+        write_export_dir(options.output_dir / name, tables, options.export_format)
+    return len(shift_df)
+
+
+def _process_file_safe(path: Path, name: str, options: BatchOptions) -> Tuple[Path, int, Optional[str]]:
+    try:
+        return path, process_file(path, name, options), None
+    except Exception as exc:  # 1ファイルの失敗でバッチ全体を止めない
+        return path, 0, f"{type(exc).__name__}: {exc}"
+
+
+def run_batch(paths: Sequence[Path], options: BatchOptions, workers: int = 1) -> List[Tuple[Path, int, Optional[str]]]:
+    names = output_names(paths)
+    if workers <= 1 or len(paths) <= 1:
+        return [_process_file_safe(path, name, options) for path, name in zip(paths, names)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        return list(executor.map(_process_file_safe, paths, names, [options] * len(paths)))
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m shiftsumma",
+        description="PDF/Excel のシフト表を一括で解析し、ShiftRecord と集計テーブルを CSV / Parquet に書き出す。",
+    )
+    parser.add_argument("inputs", nargs="+", help="入力ファイル・ディレクトリ・glob パターン")
+    parser.add_argument("--month", dest="target_month", help="対象年月 (YYYY-MM)。PDF を含む場合は必須")
+    parser.add_argument("--output", "-o", type=Path, default=Path("shiftsumma_output"), help="出力ディレクトリ")
+    parser.add_argument("--full-threshold", type=int, default=270, help="Full判定閾値(分)")
+    parser.add_argument("--half-threshold", type=int, default=180, help="半日判定閾値(分)")
+    parser.add_argument("--workers", "-j", type=int, default=os.cpu_count() or 1, help="並列プロセス数")
+    parser.add_argument("--format", dest="export_format", choices=["csv", "parquet"], default="csv", help="出力形式（CSV は UTF-8 BOM 付き）")
+    parser.add_argument("--zip", dest="bundle", action="store_true", help="ファイルごとに全テーブルを1つの ZIP にまとめる")
+    parser.add_argument("--cache-dir", type=Path, default=None, help="解析結果キャッシュと PDF レイアウトのテンプレートを置くディレクトリ（省略時は無効）")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print("対象ファイル (.pdf / .xlsx / .xls) が見つかりません。", file=sys.stderr)
+        return 2
+    if args.target_month is None and any(p.suffix.lower() == ".pdf" for p in paths):
+        print("PDF を処理するには --month (YYYY-MM) を指定してください。", file=sys.stderr)
+        return 2
+
+    options = BatchOptions(
+        target_month=args.target_month,
+        full_threshold_minutes=args.full_threshold,
+        half_min_minutes=args.half_threshold,
+        output_dir=args.output,
+        cache_dir=args.cache_dir,
+        export_format=args.export_format,
+        bundle=args.bundle,
+    )
+    results = run_batch(paths, options, workers=args.workers)
+
+    failed = 0
+    for path, count, error in results:
+        if error is None:
+            print(f"OK    {path} ({count} 件)")
+        else:
+            failed += 1
+            print(f"ERROR {path}: {error}", file=sys.stderr)
+    print(f"{len(results) - failed}/{len(results)} ファイルを {options.output_dir} に出力しました。")
+    return 1 if failed else 0
+
+
+__all__ = ["BatchOptions", "collect_inputs", "main", "process_file", "run_batch"]
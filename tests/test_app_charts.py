@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import unittest
+import warnings
+from unittest import mock
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class EmployeeHeatmapTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping chart tests.")
+        try:
+            import matplotlib  # noqa: F401, WPS433
+            import streamlit  # noqa: F401, WPS433
+        except Exception:
+            self.skipTest("streamlit/matplotlib not installed; skipping chart tests.")
+        import app
+        from analytics.stats import build_shift_frame, weekly_employee_stats
+        from benchmarks.workload import generate_workload
+
+        self.app = app
+        self.weekly = weekly_employee_stats(build_shift_frame(generate_workload(300)))
+        # フォントに日本語グリフが無い環境の警告は無視する
+        warnings.filterwarnings("ignore", message="Glyph")
+
+    def _close(self, fig) -> None:
+        self.app.get_pyplot().close(fig)
+
+    def test_large_heatmap_skips_annotations_and_thins_labels(self) -> None:
+        fig = self.app.plot_employee_heatmap(self.weekly)
+        ax = fig.axes[0]
+        self.assertEqual(len(ax.texts), 0)
+        self.assertLessEqual(len(ax.get_yticks()), self.app.HEATMAP_MAX_YTICKS)
+        self._close(fig)
+
+    def test_page_is_annotated(self) -> None:
+        fig = self.app.plot_employee_heatmap(self.weekly, page=1, page_size=20, sort_by_hours=True)
+        ax = fig.axes[0]
+        weeks = self.weekly["week_index"].nunique()
+        self.assertEqual(ax.get_images()[0].get_array().shape, (20, weeks))
+        self.assertEqual(len(ax.texts), 20 * weeks)
+        self._close(fig)
+
+    def test_rendered_png_is_cached_by_input(self) -> None:
+        self.app.render_employee_heatmap.clear()
+        first = self.app.render_employee_heatmap(self.weekly, 0, 20, False)
+        self.assertTrue(first.startswith(b"\x89PNG"))
+        with mock.patch.object(self.app, "plot_employee_heatmap") as plot:
+            self.assertEqual(self.app.render_employee_heatmap(self.weekly.copy(), 0, 20, False), first)
+            plot.assert_not_called()
+
+    def test_staffing_heatmap_has_one_row_per_group(self) -> None:
+        from analytics.coverage import staffing_coverage
+        from analytics.stats import build_shift_frame
+        from benchmarks.workload import generate_workload
+
+        shift_df = build_shift_frame(generate_workload(50))
+        for by, rows in (("weekday", 7), ("date", shift_df["date"].nunique())):
+            with self.subTest(by=by):
+                fig = self.app.plot_staffing_heatmap(staffing_coverage(shift_df, by, 30), by)
+                self.assertEqual(fig.axes[0].get_images()[0].get_array().shape, (rows, 48))
+                self._close(fig)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import unittest
+
+
+class ColdStartImportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        try:
+            import streamlit  # noqa: F401, WPS433
+            import pandas  # noqa: F401, WPS433
+        except Exception:
+            self.skipTest("streamlit/pandas not installed; skipping app import test.")
+
+    def test_app_defers_heavy_imports(self) -> None:
+        from benchmarks.bench_imports import measure_import
+
+        # グラフ描画・PDF/Excel 解析は使う時点まで import しない
+        self.assertEqual(measure_import("app")["heavy_modules"], [])
+        self.assertEqual(measure_import("analytics.stats")["heavy_modules"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
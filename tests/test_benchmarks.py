@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class WorkloadTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping benchmark tests.")
+
+    def test_generate_workload_shape_and_mix(self) -> None:
+        from analytics.stats import build_shift_frame
+        from benchmarks.workload import generate_workload
+
+        workload = generate_workload(20, months=2, start_month="2025-11", seed=1)
+        self.assertEqual(len(workload), 20 * (30 + 31))
+        self.assertEqual(workload["employee_id"].nunique(), 20)
+        pd.testing.assert_frame_equal(workload, generate_workload(20, months=2, start_month="2025-11", seed=1))
+
+        shift_df = build_shift_frame(workload)
+        self.assertEqual(set(shift_df["slot"]), {"Full", "AM半日", "PM半日", "NA"})
+        self.assertTrue(shift_df["raw_status"].notna().any())
+        self.assertTrue((shift_df["start_time"].isna() & shift_df["end_time"].notna()).any())
+
+    def test_bench_scale_reports_every_function(self) -> None:
+        from benchmarks.bench_stats import bench_scale
+
+        results = bench_scale(3, months=1, repeat=1, max_object_rows=10_000)
+        functions = {result["function"] for result in results}
+        self.assertIn("build_shift_records_from_rows", functions)
+        self.assertIn("compute_all_stats", functions)
+        self.assertIn("export_csv", functions)
+        self.assertTrue(all(result["rows"] == 3 * 31 for result in results))
+
+        skipped = {result["function"] for result in bench_scale(3, months=1, repeat=1, max_object_rows=10)}
+        self.assertNotIn("to_dataframe", skipped)
+
+    def test_does_not_import_streamlit_app(self) -> None:
+        code = (
+            "import sys; from benchmarks.bench_stats import bench_scale; "
+            "bench_scale(2, months=1, repeat=1, max_object_rows=10); "
+            "print(sorted({'app', 'streamlit'} & set(sys.modules)))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import io
+import unittest
+from datetime import date
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class CalendarDimTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping calendar tests.")
+
+    def test_table_matches_per_date_rules(self) -> None:
+        from analytics.calendar_dim import calendar_table
+        from analytics.stats import compute_week_index
+
+        table = calendar_table("2025-11-20", "2026-01-10")
+        self.assertEqual(len(table), 52)
+        for row in table.itertuples():
+            with self.subTest(date=row.date):
+                self.assertEqual(row.week_index, compute_week_index(row.date))
+                self.assertEqual(row.iso_week_key, row.date.isocalendar()[0] * 100 + row.date.isocalendar()[1])
+                self.assertEqual(row.week_start_date.weekday(), 0)
+
+    def test_week_start_and_holidays(self) -> None:
+        from analytics.calendar_dim import CalendarConfig, calendar_day
+
+        # 2025-12-01 は月曜、2025-12-07 は日曜
+        sunday_start = CalendarConfig(week_start=6)
+        self.assertEqual(calendar_day(date(2025, 12, 6), sunday_start).week_index, 1)
+        self.assertEqual(calendar_day(date(2025, 12, 7), sunday_start).week_index, 2)
+        self.assertEqual(calendar_day(date(2025, 12, 7), sunday_start).week_start_date, date(2025, 12, 7))
+
+        holiday = CalendarConfig(holidays=["2025-12-31"])
+        day = calendar_day(date(2025, 12, 31), holiday)
+        self.assertEqual((day.is_holiday, day.is_weekday, day.weekday), (True, False, "水"))
+        with self.assertRaises(ValueError):
+            CalendarConfig(week_start=7)
+
+    def test_records_and_stats_follow_calendar(self) -> None:
+        from analytics.calendar_dim import CalendarConfig, apply_calendar, load_holidays
+        from analytics.stats import build_shift_frame, build_shift_records_from_rows, compute_all_stats
+
+        rows = [
+            {"employee_id": "1", "date": "2025-12-06", "start_time": "09:00", "end_time": "18:00"},
+            {"employee_id": "1", "date": "2025-12-07", "start_time": "09:00", "end_time": "18:00"},
+            {"employee_id": "1", "date": "2025-12-08", "start_time": None, "end_time": None},
+        ]
+        holidays = load_holidays(io.StringIO("date,name\n2025-12-08,休業日\n"))
+        calendar = CalendarConfig(week_start=6, holidays=holidays)
+
+        shift_df = build_shift_frame(rows, calendar=calendar)
+        self.assertEqual(shift_df["week_index"].tolist(), [1, 2, 2])
+        self.assertEqual(shift_df["is_weekday"].tolist(), [False, False, False])
+        self.assertEqual([record.week_index for record in build_shift_records_from_rows(rows, calendar=calendar)], [1, 2, 2])
+        pd.testing.assert_frame_equal(apply_calendar(build_shift_frame(rows), calendar), shift_df)
+
+        bundle = compute_all_stats(shift_df, calendar)
+        self.assertEqual(
+            [str(value) for value in bundle.weekly_team["week_start_date"]], ["2025-11-30", "2025-12-07"]
+        )
+        # 休業日の非勤務は平日の NA として数えない
+        self.assertEqual(int(bundle.weekday_na["count"].sum()), 0)
+        default_bundle = compute_all_stats(shift_df)
+        self.assertIsNot(default_bundle, bundle)
+        self.assertEqual(str(default_bundle.weekly_team["week_start_date"].iloc[0]), "2025-12-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class BatchCliTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping CLI tests.")
+        try:
+            import pdfplumber  # noqa: F401, WPS433
+        except Exception:
+            self.skipTest("pdfplumber not available; skipping CLI tests.")
+        self.pdf_path = REPO_ROOT / "2025-12-shift.pdf.pdf"
+        if not self.pdf_path.exists():
+            self.skipTest("Sample PDF not available in repository; skipping CLI tests.")
+
+    def test_batch_writes_records_and_stats(self) -> None:
+        from shiftsumma.cli import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            inputs = Path(tmp) / "in"
+            (inputs / "site-a").mkdir(parents=True)
+            (inputs / "site-b").mkdir(parents=True)
+            for site in ("site-a", "site-b"):
+                (inputs / site / "roster.pdf").write_bytes(self.pdf_path.read_bytes())
+            output = Path(tmp) / "out"
+
+            exit_code = main([str(inputs), "--month", "2025-12", "--output", str(output), "--workers", "2"])
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(sorted(p.name for p in output.iterdir()), ["roster", "roster_2"])
+            records = pd.read_csv(output / "roster" / "shift_records.csv", encoding="utf-8-sig")
+            self.assertEqual(len(records), 372)
+            team = pd.read_csv(output / "roster_2" / "weekly_team_stats.csv", encoding="utf-8-sig")
+            self.assertEqual(team["total_minutes"].sum(), records["minutes"].sum())
+
+    def test_zip_bundle_in_parquet(self) -> None:
+        import zipfile
+
+        from shiftsumma.cli import main
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "out"
+            exit_code = main([str(self.pdf_path), "--month", "2025-12", "-o", str(output), "--format", "parquet", "--zip"])
+
+            self.assertEqual(exit_code, 0)
+            bundle = output / f"{self.pdf_path.stem}.zip"
+            with zipfile.ZipFile(bundle) as archive:
+                self.assertIn("shift_records.parquet", archive.namelist())
+                with archive.open("shift_records.parquet") as fh:
+                    self.assertEqual(len(pd.read_parquet(fh)), 372)
+
+    def test_pdf_requires_month(self) -> None:
+        from shiftsumma.cli import main
+
+        self.assertEqual(main([str(self.pdf_path)]), 2)
+
+    def test_does_not_import_ui_modules(self) -> None:
+        code = (
+            "import sys, shiftsumma.cli, analytics.stats, parsers.pdf_parser, parsers.excel_parser; "
+            "print(sorted({'streamlit', 'matplotlib'} & set(sys.modules)))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
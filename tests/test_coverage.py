@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import unittest
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+# 2025-12-01 は月曜。22:00-6:00 は翌日 6:00 まで数える
+DAY_ROWS = [
+    {"employee_id": "1", "date": "2025-12-01", "start_time": "9:00", "end_time": "18:00"},
+    {"employee_id": "2", "date": "2025-12-01", "start_time": "13:00", "end_time": "14:00"},
+    {"employee_id": "3", "date": "2025-12-01", "start_time": "22:00", "end_time": "6:00"},
+    {"employee_id": "4", "date": "2025-12-02", "start_time": None, "end_time": None},
+]
+# 月曜2日分（12/01・12/08）に対して勤務は1人だけ → 1日あたり 0.5 人
+MONDAY_ROWS = [
+    {"employee_id": "1", "date": "2025-12-01", "start_time": "9:00", "end_time": "9:10"},
+    {"employee_id": "1", "date": "2025-12-08", "start_time": None, "end_time": None},
+]
+
+
+class StaffingCoverageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping coverage tests.")
+
+    def _at(self, coverage, time, **keys):
+        mask = coverage["time"].eq(time)
+        for column, value in keys.items():
+            mask &= coverage[column].astype(str).eq(value)
+        return coverage.loc[mask].iloc[0]
+
+    def test_per_minute_headcount_by_date(self) -> None:
+        from analytics.coverage import staffing_coverage
+        from analytics.stats import build_shift_frame
+
+        coverage = staffing_coverage(build_shift_frame(DAY_ROWS), by="date", bin_minutes=1)
+        self.assertEqual(len(coverage), 2 * 24 * 60)
+        expected = [
+            ("2025-12-01", "08:59", 0), ("2025-12-01", "09:00", 1), ("2025-12-01", "13:30", 2),
+            ("2025-12-01", "14:00", 1), ("2025-12-01", "18:00", 0), ("2025-12-01", "23:00", 1),
+            ("2025-12-02", "05:59", 1), ("2025-12-02", "06:00", 0),
+        ]
+        for day, time, headcount in expected:
+            with self.subTest(day=day, time=time):
+                self.assertEqual(self._at(coverage, time, date=day)["headcount"], headcount)
+        self.assertEqual(self._at(coverage, "00:00", date="2025-12-02")["weekday"], "火")
+
+    def test_bins_and_weekday_average(self) -> None:
+        from analytics.coverage import staffing_coverage
+        from analytics.stats import build_shift_frame
+
+        coverage = staffing_coverage(build_shift_frame(MONDAY_ROWS), by="weekday", bin_minutes=15)
+        self.assertEqual(coverage["weekday"].drop_duplicates().tolist(), ["月", "火", "水", "木", "金", "土", "日"])
+        monday = self._at(coverage, "09:00", weekday="月")
+        self.assertEqual(int(monday["days"]), 2)
+        self.assertAlmostEqual(monday["headcount"], 0.5 * 10 / 15)
+        self.assertAlmostEqual(monday["peak"], 0.5)
+        self.assertEqual(self._at(coverage, "09:15", weekday="火")["headcount"], 0)
+
+    def test_empty_and_invalid_arguments(self) -> None:
+        from analytics.coverage import staffing_coverage
+        from analytics.stats import build_shift_frame
+
+        self.assertTrue(staffing_coverage(pd.DataFrame()).empty)
+        shift_df = build_shift_frame(DAY_ROWS)
+        with self.assertRaises(ValueError):
+            staffing_coverage(shift_df, bin_minutes=7)
+        with self.assertRaises(ValueError):
+            staffing_coverage(shift_df, by="employee")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+import unittest
+from datetime import datetime
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+SHEETS = {
+    "team-a": {
+        "Employee_ID": [101, 101, 102, 102, 103],
+        "Date": [datetime(2025, 12, 1), "2025-12-02", "2025/12/03", None, datetime(2025, 12, 5)],
+        "Start_Time": ["09:00", "13:30", "09:00", "09:00", None],
+        "End_Time": ["18:00", "17:00", "12:00", "18:00", None],
+        "Status": [None, None, None, None, "公休"],
+    },
+    "team-b": {
+        "employee_id": [201, 202, 203],
+        "date": [datetime(2025, 12, 1), datetime(2025, 12, 2), datetime(2025, 12, 3)],
+        "start_time": ["10:00", "22:00", "09:30"],
+        "end_time": ["14:00", "06:00", "18:30"],
+        "status": [None, None, None],
+    },
+}
+
+
+def _workbook_bytes(sheets) -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        for name, columns in sheets.items():
+            pd.DataFrame(columns).to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+class ExcelStreamingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping Excel parser tests.")
+        try:
+            import openpyxl  # noqa: F401, WPS433
+        except Exception:
+            self.skipTest("openpyxl not available; skipping Excel parser tests.")
+
+        self.content = _workbook_bytes(SHEETS)
+
+    def test_streaming_reads_all_sheets_in_chunks(self) -> None:
+        from parsers.excel_parser import ExcelShiftParser
+
+        # 通常モードは先頭シートのみ読むので、シートごとに読んで連結したものと比較する
+        expected = pd.concat(
+            [ExcelShiftParser().read(io.BytesIO(_workbook_bytes({name: columns}))) for name, columns in SHEETS.items()],
+            ignore_index=True,
+        )
+
+        parser = ExcelShiftParser(streaming=True, chunk_size=2)
+        chunks = list(parser.iter_raw_frames(io.BytesIO(self.content)))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1, 1, 2, 1])
+
+        actual = parser.read(io.BytesIO(self.content))
+        # 期待値側は「全欠損の float 列 + 文字列列」の連結で object 型になるため dtype は比較しない
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        self.assertEqual(actual["employee_id"].tolist(), ["101", "101", "102", "103", "201", "202", "203"])
+
+    def test_unparseable_dates_are_dropped(self) -> None:
+        from parsers.excel_parser import ExcelShiftParser
+
+        dates = ExcelShiftParser._parse_dates(pd.Series(["2025-12-01", "2025/12/02", "not a date", None], dtype=object))
+        self.assertEqual(dates.dt.strftime("%Y-%m-%d").tolist()[:2], ["2025-12-01", "2025-12-02"])
+        self.assertTrue(dates.iloc[2:].isna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+import unittest
+import zipfile
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class ExportBundleTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping export tests.")
+        from analytics.export import export_tables
+        from analytics.stats import build_shift_frame, compute_all_stats
+        from benchmarks.workload import generate_workload
+
+        shift_df = build_shift_frame(generate_workload(20))
+        self.tables = export_tables(shift_df, compute_all_stats(shift_df))
+
+    def test_chunked_csv_matches_single_shot(self) -> None:
+        from analytics.export import iter_csv_chunks
+
+        df = self.tables["shift_records"]
+        expected = df.to_csv(index=False).encode("utf-8-sig")
+        self.assertEqual(b"".join(iter_csv_chunks(df, chunk_rows=7)), expected)
+        self.assertEqual(b"".join(iter_csv_chunks(df.head(0))), df.head(0).to_csv(index=False).encode("utf-8-sig"))
+
+    def test_bundle_contains_every_table(self) -> None:
+        from analytics.export import write_export_bundle
+
+        for fmt in ("csv", "parquet"):
+            with self.subTest(fmt=fmt):
+                buffer = io.BytesIO()
+                write_export_bundle(buffer, self.tables, fmt, chunk_rows=100)
+                with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as archive:
+                    self.assertEqual(sorted(archive.namelist()), sorted(f"{name}.{fmt}" for name in self.tables))
+                    data = io.BytesIO(archive.read(f"weekly_team_stats.{fmt}"))
+                loaded = pd.read_csv(data, encoding="utf-8-sig") if fmt == "csv" else pd.read_parquet(data)
+                expected = self.tables["weekly_team_stats"]
+                self.assertEqual(len(loaded), len(expected))
+                self.assertEqual(loaded["total_minutes"].sum(), expected["total_minutes"].sum())
+
+    def test_parquet_keeps_types(self) -> None:
+        from analytics.export import write_table
+
+        buffer = io.BytesIO()
+        write_table(self.tables["shift_records"], buffer, "parquet")
+        loaded = pd.read_parquet(io.BytesIO(buffer.getvalue()))
+        pd.testing.assert_frame_equal(loaded, self.tables["shift_records"])
+
+    def test_unknown_format_is_rejected(self) -> None:
+        from analytics.export import write_export_bundle
+
+        with self.assertRaises(ValueError):
+            write_export_bundle(io.BytesIO(), self.tables, "xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class ShiftHistoryStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping history tests.")
+        try:
+            import pyarrow  # noqa: F401, WPS433
+        except ImportError:
+            self.skipTest("pyarrow not installed; skipping history tests.")
+
+        from analytics.history import ShiftHistoryStore  # noqa: WPS433
+        from analytics.stats import build_shift_frame  # noqa: WPS433
+        from benchmarks.workload import generate_workload  # noqa: WPS433
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.store = ShiftHistoryStore(self._tmp.name)
+        self.shift_df = build_shift_frame(generate_workload(20, months=2, start_month="2025-12"))
+
+    def test_append_partitions_by_month(self) -> None:
+        self.assertEqual(self.store.append(self.shift_df, source="a.pdf"), ["2025-12", "2026-01"])
+        self.assertEqual(self.store.months(), ["2025-12", "2026-01"])
+        self.assertTrue(any(Path(self._tmp.name, "month=2025-12").glob("*.parquet")))
+
+        # 同じ source での追加は置き換え、別 source は別パーツとして足される
+        self.store.append(self.shift_df, source="a.pdf")
+        self.assertEqual(len(self.store.query()), len(self.shift_df))
+        self.store.append(self.shift_df.head(5), source="b.pdf")
+        self.assertEqual(len(self.store.query()), len(self.shift_df) + 5)
+
+        self.store.remove_month("2025-12")
+        self.assertEqual(self.store.months(), ["2026-01"])
+
+    def test_query_filters_dates_and_employees(self) -> None:
+        self.store.append(self.shift_df, source="a.pdf")
+        start, end = pd.Timestamp("2025-12-20").date(), pd.Timestamp("2026-01-10").date()
+        employees = self.shift_df["employee_id"].unique()[:2].tolist()
+
+        result = self.store.query(start, end, employee_ids=employees)
+        expected = self.shift_df[
+            (self.shift_df["date"] >= start)
+            & (self.shift_df["date"] <= end)
+            & self.shift_df["employee_id"].isin(employees)
+        ]
+        self.assertEqual(len(result), len(expected))
+        self.assertEqual(list(result.columns), list(self.shift_df.columns))
+        self.assertEqual(sorted(result["employee_id"].unique()), sorted(employees))
+        self.assertEqual((result["date"].min(), result["date"].max()), (start, end))
+
+        empty = self.store.query("2030-01-01")
+        self.assertTrue(empty.empty)
+        self.assertEqual(list(empty.columns), list(self.shift_df.columns))
+
+    def test_weekly_stats_use_iso_weeks_across_months(self) -> None:
+        self.store.append(self.shift_df, source="a.pdf")
+        weekly = self.store.compute_stats("2025-12-22", "2026-01-11").weekly_team
+
+        # 2025-12-29〜2026-01-04 は月をまたいでも1つの週として数える
+        self.assertEqual(weekly["week_index"].tolist(), [202552, 202601, 202602])
+        self.assertEqual(
+            [str(value) for value in weekly["week_start_date"]], ["2025-12-22", "2025-12-29", "2026-01-05"]
+        )
+
+    def test_iso_week_keys_survive_compact_schema_and_batch(self) -> None:
+        from analytics.models import ShiftRecordBatch
+        from analytics.schema import from_compact_frame, to_compact_frame
+        from analytics.stats import with_iso_week_index
+
+        indexed = with_iso_week_index(self.shift_df)
+        self.assertIn(202601, set(indexed["week_index"]))
+        round_trip = from_compact_frame(to_compact_frame(indexed))
+        self.assertEqual(round_trip["week_index"].tolist(), indexed["week_index"].tolist())
+        batch = ShiftRecordBatch.from_frame(indexed)
+        self.assertEqual(batch.to_frame()["week_index"].tolist(), indexed["week_index"].tolist())
+
+    def test_rejects_frames_without_shift_record_columns(self) -> None:
+        with self.assertRaises(ValueError):
+            self.store.append(self.shift_df.drop(columns=["slot"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
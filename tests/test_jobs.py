@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+import unittest
+from pathlib import Path
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class ParseJobManagerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping parse job tests.")
+        from parsers.jobs import ParseJobManager
+
+        self.manager = ParseJobManager(max_workers=2)
+        self.addCleanup(self.manager.shutdown)
+
+    def test_same_key_joins_running_job(self) -> None:
+        release = threading.Event()
+
+        def work(job):
+            job.report(0, 2, 0)
+            release.wait(5)
+            job.report(2, 2, 10)
+            return pd.DataFrame({"rows": range(10)})
+
+        first = self.manager.submit("a", work, label="a.pdf")
+        second = self.manager.submit("a", work, label="a.pdf")
+        self.assertIs(first, second)
+        self.assertEqual(first.state, "running")
+        release.set()
+
+        self.assertEqual(len(first.result(5)), 10)
+        self.assertEqual((first.state, first.progress.fraction, first.progress.rows), ("done", 1.0, 10))
+        # 終了後の再投入は新しいジョブになる
+        self.assertIsNot(self.manager.submit("a", lambda job: pd.DataFrame(), label="a.pdf"), first)
+
+    def test_job_spans_are_recorded_per_job(self) -> None:
+        from analytics.profiling import merge_profiles, profile_run, span
+
+        def work(job):
+            with span("pdf.page", pages=1):
+                return pd.DataFrame()
+
+        with profile_run(label="streamlit") as profile:
+            job = self.manager.submit("profiled", work, label="a.pdf")
+            job.result(5)
+        self.assertEqual(profile.summary()["name"].tolist(), [])
+        self.assertEqual(job.profile.label, "parse:a.pdf")
+        merged = merge_profiles([profile, job.profile])
+        self.assertEqual(merged.summary()["name"].tolist(), ["pdf.page"])
+
+        # 計測が無効な再実行から投入したジョブは記録しない
+        unprofiled = self.manager.submit("plain", work)
+        unprofiled.result(5)
+        self.assertIsNone(unprofiled.profile)
+
+    def test_cancel_and_failure_states(self) -> None:
+        from parsers.jobs import ParseCancelled
+
+        started = threading.Event()
+        release = threading.Event()
+
+        def work(job):
+            started.set()
+            release.wait(5)
+            job.report(1, 2, 5)
+            return pd.DataFrame()
+
+        job = self.manager.submit("b", work)
+        started.wait(5)
+        job.cancel()
+        release.set()
+        with self.assertRaises(ParseCancelled):
+            job.result(5)
+        self.assertEqual(job.state, "cancelled")
+        self.assertIsNone(job.exception())
+
+        def broken(job):
+            raise ValueError("bad file")
+
+        failed = self.manager.submit("c", broken)
+        with self.assertRaises(ValueError):
+            failed.result(5)
+        self.assertEqual(failed.state, "failed")
+        self.assertIsInstance(failed.exception(), ValueError)
+        self.assertEqual(self.manager.running(), [])
+
+
+class ParserProgressTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pdf_path = Path(__file__).resolve().parent.parent / "2025-12-shift.pdf.pdf"
+        if pd is None:
+            self.skipTest("pandas not installed; skipping parser progress test.")
+        try:
+            import pdfplumber  # noqa: F401, WPS433
+        except Exception:
+            self.skipTest("pdfplumber not available; skipping parser progress test.")
+        if not self.pdf_path.exists():
+            self.skipTest("Sample PDF not available in repository; skipping parser progress test.")
+
+    def test_pdf_reports_each_page(self) -> None:
+        from parsers.pdf_parser import PdfShiftParser
+
+        calls = []
+        df = PdfShiftParser().read_raw(str(self.pdf_path), "2025-12", progress=lambda *args: calls.append(args))
+        self.assertEqual(calls[0], (0, 1, 0))
+        self.assertEqual(calls[-1], (1, 1, len(df)))
+
+    def test_cancel_stops_parsing(self) -> None:
+        from parsers.jobs import ParseCancelled, ParseJob
+        from parsers.pdf_parser import PdfShiftParser
+
+        job = ParseJob("pdf")
+        job.cancel()
+        with self.assertRaises(ParseCancelled):
+            PdfShiftParser().read_raw(str(self.pdf_path), "2025-12", progress=job.report)
+
+
+if __name__ == "__main__":
+    unittest.main()
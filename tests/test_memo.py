@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import unittest
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class FrameMemoTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping memo tests.")
+
+    def test_fingerprint_follows_content(self) -> None:
+        from analytics.memo import frame_fingerprint
+
+        df = pd.DataFrame({"employee_id": ["101", "102"], "minutes": [480, 0]})
+        self.assertEqual(frame_fingerprint(df), frame_fingerprint(df.copy()))
+        self.assertNotEqual(frame_fingerprint(df), frame_fingerprint(df.assign(minutes=[480, 30])))
+        self.assertNotEqual(frame_fingerprint(df), frame_fingerprint(df.astype({"minutes": "float64"})))
+
+    def test_reuses_results_and_evicts_least_recently_used(self) -> None:
+        from analytics.memo import FrameMemo, estimate_bytes
+
+        frames = {name: pd.DataFrame({"value": range(1000)}) for name in "abc"}
+        size = estimate_bytes(frames["a"])
+        memo = FrameMemo(max_bytes=size * 2)
+        calls = []
+
+        def compute(name):
+            calls.append(name)
+            return frames[name]
+
+        self.assertIs(memo.get_or_compute("a", lambda: compute("a")), frames["a"])
+        memo.get_or_compute("b", lambda: compute("b"))
+        memo.get_or_compute("a", lambda: compute("a"))
+        memo.get_or_compute("c", lambda: compute("c"))  # 最も古い b が追い出される
+        memo.get_or_compute("a", lambda: compute("a"))
+        memo.get_or_compute("b", lambda: compute("b"))
+
+        self.assertEqual(calls, ["a", "b", "c", "b"])
+        self.assertEqual(memo.stats()["hits"], 2)
+        self.assertLessEqual(memo.stats()["bytes"], size * 2)
+
+    def test_stats_bundle_size_is_estimated(self) -> None:
+        from analytics.memo import estimate_bytes
+        from analytics.stats import build_shift_frame, compute_all_stats
+        from benchmarks.workload import generate_workload
+
+        bundle = compute_all_stats(build_shift_frame(generate_workload(5)))
+        self.assertEqual(estimate_bytes(bundle), sum(estimate_bytes(t) for t in bundle.tables().values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import unittest
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+# チームごとのロスター（社員2は両方に同じ内容、社員1は内容が食い違う）
+TEAM_A_ROWS = [
+    {"employee_id": "1", "date": "2025-12-01", "start_time": "9:00", "end_time": "18:00"},
+    {"employee_id": "2", "date": "2025-12-01", "start_time": "9:00", "end_time": "13:00"},
+]
+TEAM_B_ROWS = [
+    {"employee_id": "3", "date": "2025-12-02", "start_time": None, "end_time": None},
+    {"employee_id": "2", "date": "2025-12-01", "start_time": "9:00", "end_time": "13:00"},
+    {"employee_id": "1", "date": "2025-12-01", "start_time": "9:00", "end_time": "12:00"},
+]
+
+
+class MergeShiftFramesTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping merge tests.")
+        from analytics.stats import build_shift_frame
+
+        self.team_a = build_shift_frame(TEAM_A_ROWS)
+        self.team_b = build_shift_frame(TEAM_B_ROWS)
+
+    def test_policies_pick_one_row_per_key(self) -> None:
+        from analytics.merge import merge_shift_frames
+
+        expected = {"last": 180, "first": 540, "max_minutes": 540}
+        for policy, minutes in expected.items():
+            with self.subTest(policy=policy):
+                result = merge_shift_frames([self.team_a, self.team_b], policy, ["a.pdf", "b.xlsx"])
+                frame = result.frame
+                self.assertEqual(frame["employee_id"].tolist(), ["1", "2", "3"])
+                self.assertEqual(int(frame.loc[frame["employee_id"] == "1", "minutes"].iloc[0]), minutes)
+                self.assertEqual(list(frame.columns), list(self.team_a.columns))
+                self.assertEqual(result.duplicates, 2)
+
+    def test_conflicts_list_only_differing_candidates(self) -> None:
+        from analytics.merge import merge_shift_frames
+
+        result = merge_shift_frames([self.team_a, self.team_b], "last", ["a.pdf", "b.xlsx"])
+        # 社員2は両ファイルで同じ内容なので競合ではない
+        conflicts = result.conflicts
+        self.assertEqual(conflicts["employee_id"].tolist(), ["1", "1"])
+        self.assertEqual(conflicts["source"].tolist(), ["a.pdf", "b.xlsx"])
+        self.assertEqual(conflicts["kept"].tolist(), [False, True])
+
+    def test_empty_inputs_and_invalid_policy(self) -> None:
+        from analytics.merge import merge_shift_frames
+        from analytics.stats import SHIFT_RECORD_COLUMNS
+
+        result = merge_shift_frames([pd.DataFrame(), self.team_a.iloc[0:0]])
+        self.assertTrue(result.frame.empty)
+        self.assertEqual(list(result.frame.columns), SHIFT_RECORD_COLUMNS)
+        self.assertEqual(merge_shift_frames([pd.DataFrame(), self.team_a]).duplicates, 0)
+        with self.assertRaises(ValueError):
+            merge_shift_frames([self.team_a], policy="newest")
+        with self.assertRaises(ValueError):
+            merge_shift_frames([self.team_a, self.team_b], sources=["a.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
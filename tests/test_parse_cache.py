@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import io
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping parse cache tests.")
+        try:
+            import pyarrow  # noqa: F401, WPS433
+            import openpyxl  # noqa: F401, WPS433
+        except Exception:
+            self.skipTest("pyarrow/openpyxl not available; skipping parse cache tests.")
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _excel_bytes(self, start_time: str) -> bytes:
+        # openpyxl は作成時刻を書き込むため、同一内容のバイト列は1回だけ生成して使い回す
+        source = pd.DataFrame(
+            {
+                "employee_id": ["101", "102"],
+                "date": [date(2025, 12, 1), date(2025, 12, 2)],
+                "start_time": [start_time, "13:30"],
+                "end_time": ["18:00", "17:00"],
+            }
+        )
+        buffer = io.BytesIO()
+        source.to_excel(buffer, index=False)
+        return buffer.getvalue()
+
+    def test_repeat_read_hits_cache(self) -> None:
+        from analytics.stats import ShiftParseConfig
+        from parsers.cache import ParseCache
+        from parsers.excel_parser import ExcelShiftParser
+
+        cache = ParseCache(self.cache_dir)
+        parser = ExcelShiftParser(cache=cache)
+
+        content = self._excel_bytes("09:00")
+        first = parser.read(io.BytesIO(content))
+        second = parser.read(io.BytesIO(content))
+        pd.testing.assert_frame_equal(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # 内容が変われば別エントリになる
+        parser.read(io.BytesIO(self._excel_bytes("10:00")))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        # キャッシュは閾値に依存しない raw テーブルなので、閾値変更は再解析せずに再分類される
+        reclassified = ExcelShiftParser(ShiftParseConfig(full_threshold_minutes=600), cache=cache).read(io.BytesIO(content))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(cache.stats()["entries"], 2)
+        self.assertEqual(first["slot"].tolist(), ["Full", "PM半日"])
+        self.assertEqual(reclassified["slot"].tolist(), ["PM半日", "PM半日"])
+
+    def test_evicts_least_recently_used(self) -> None:
+        import os
+
+        from parsers.cache import ParseCache
+
+        cache = ParseCache(self.cache_dir)
+        frame = pd.DataFrame({"minutes": list(range(100))})
+        cache.put("old", frame)
+        cache.put("new", frame)
+        os.utime(self.cache_dir / "old.parquet", (1, 1))
+        entry_size = (self.cache_dir / "new.parquet").stat().st_size
+
+        cache.max_bytes = entry_size * 2
+        cache.put("newest", frame)
+
+        self.assertIsNone(cache.get("old"))
+        self.assertIsNotNone(cache.get("new"))
+        self.assertIsNotNone(cache.get("newest"))
+
+
+if __name__ == "__main__":
+    unittest.main()
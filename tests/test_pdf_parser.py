@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+import dataclasses
+import io
+import tempfile
+import time
 import unittest
 from pathlib import Path
 
@@ -48,6 +52,132 @@ class PdfParserIntegrationTest(unittest.TestCase):
                 self.assertEqual(int(row.iloc[0]["minutes"]), minutes)
                 self.assertEqual(row.iloc[0]["slot"], slot)
 
+    def _multi_page_pdf(self, pages: int) -> bytes:
+        try:
+            import pypdfium2 as pdfium  # noqa: WPS433
+        except Exception:
+            self.skipTest("pypdfium2 not available; skipping multi-page PDF test.")
+
+        # サンプル PDF のページを複製して複数ページの PDF を作る
+        source = pdfium.PdfDocument(str(self.pdf_path))
+        merged = pdfium.PdfDocument.new()
+        merged.import_pages(source, [0] * pages)
+        buffer = io.BytesIO()
+        merged.save(buffer)
+        return buffer.getvalue()
+
+    def test_parallel_matches_serial(self) -> None:
+        data = self._multi_page_pdf(3)
+
+        serial = self.parser_cls().read(io.BytesIO(data), "2025-12")
+        parallel = self.parser_cls(workers=2).read(io.BytesIO(data), "2025-12")
+        pd.testing.assert_frame_equal(parallel, serial)
+
+    def test_iter_frames_stream_pages(self) -> None:
+        data = self._multi_page_pdf(3)
+        parser = self.parser_cls()
+
+        rows = parser.iter_rows(io.BytesIO(data), "2025-12")
+        self.assertEqual(next(rows)["employee_id"], "234198")
+        rows.close()
+
+        frames = list(parser.iter_frames(io.BytesIO(data), "2025-12"))
+        self.assertEqual([len(frame) for frame in frames], [372, 372, 372])
+        pd.testing.assert_frame_equal(
+            pd.concat(frames, ignore_index=True), parser.read(io.BytesIO(data), "2025-12")
+        )
+
+    def test_parallel_iter_frames_closes_without_parsing_remaining_pages(self) -> None:
+        data = self._multi_page_pdf(16)
+        parser = self.parser_cls(workers=2)
+
+        started = time.perf_counter()
+        frames = parser.iter_frames(data, "2025-12")
+        # 並列時はページ範囲（ここでは2ページ）ごとに返る
+        self.assertEqual(len(next(frames)) % 372, 0)
+        first_chunk = time.perf_counter() - started
+        # 残りのページ範囲（1ワーカーあたり数範囲分）の完了を待たずに閉じられる
+        started = time.perf_counter()
+        frames.close()
+        self.assertLess(time.perf_counter() - started, first_chunk)
+
+    def test_parallel_parse_stops_on_cancel(self) -> None:
+        from parsers.jobs import ParseCancelled, ParseJob
+
+        data = self._multi_page_pdf(16)
+        job = ParseJob("pdf")
+        timings = {}
+
+        def progress(pages_done: int, pages_total: int, rows: int) -> None:
+            if pages_done and not job.cancelled:
+                timings["first_chunk"] = time.perf_counter() - started
+                timings["cancelled_at"] = time.perf_counter()
+                job.cancel()
+            job.report(pages_done, pages_total, rows)
+
+        started = time.perf_counter()
+        with self.assertRaises(ParseCancelled):
+            self.parser_cls(workers=2).read_raw(data, "2025-12", progress=progress)
+        self.assertLess(time.perf_counter() - timings["cancelled_at"], timings["first_chunk"])
+
+    def test_layout_template_is_reused_and_drift_falls_back(self) -> None:
+        from parsers.pdf_layout import LayoutStore
+
+        expected = self.parser_cls().read_raw(str(self.pdf_path), "2025-12")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "layouts.json"
+            first = LayoutStore(path)
+            pd.testing.assert_frame_equal(self.parser_cls(layouts=first).read_raw(str(self.pdf_path), "2025-12"), expected)
+            self.assertEqual(first.stats()["misses"], 1)
+
+            # 保存したテンプレートを別インスタンス（別プロセス相当）で再利用する
+            second = LayoutStore(path)
+            pd.testing.assert_frame_equal(self.parser_cls(layouts=second).read_raw(str(self.pdf_path), "2025-12"), expected)
+            self.assertEqual(second.stats()["hits"], 1)
+
+            # 列位置がずれたテンプレートしか無い場合は照合に失敗し、全体検出に戻る
+            (layout,) = second.layouts()
+            shifted = dataclasses.replace(layout, columns=tuple(x + 5 for x in layout.columns))
+            drifted = LayoutStore(None)
+            drifted.add(shifted)
+            pd.testing.assert_frame_equal(self.parser_cls(layouts=drifted).read_raw(str(self.pdf_path), "2025-12"), expected)
+            self.assertEqual(drifted.stats()["drifts"], 1)
+            self.assertEqual(drifted.stats()["layouts"], 2)
+
+            # 見出しの位置が同じでも、表（行の目印）の左端がずれたテンプレートは使わない
+            moved = dataclasses.replace(layout, table_left=layout.table_left + 20)
+            stale = LayoutStore(None)
+            stale.add(moved)
+            pd.testing.assert_frame_equal(self.parser_cls(layouts=stale).read_raw(str(self.pdf_path), "2025-12"), expected)
+            self.assertEqual((stale.stats()["hits"], stale.stats()["drifts"], stale.stats()["layouts"]), (0, 1, 2))
+
+    def test_footer_rows_are_not_assigned_to_last_employee(self) -> None:
+        raw = self.parser_cls().read_raw(str(self.pdf_path), "2025-12")
+        last = raw[raw["employee_id"] == "253940"].set_index("date")
+        # 表の下の注記（「お休みについて」等）が最後の社員の勤務日に紛れ込まない
+        self.assertTrue(pd.isna(last.loc[pd.Timestamp("2025-12-01").date(), "raw_status"]))
+
+    def test_words_are_assigned_by_geometry(self) -> None:
+        from parsers.pdf_parser import _PageIndex
+
+        def word(text, x0, top):
+            return {"text": text, "x0": x0, "top": top, "bottom": top + 4}
+
+        columns = [100.0, 120.0, 140.0]
+        words = [
+            word("退", 80, 16), word("18:00", 121, 16.3),
+            word("123456", 60, 10.3), word("入", 80, 10), word("09:00", 101, 10.3), word("公休", 130, 10.3),
+            word("654321", 60, 30.3), word("入", 80, 30), word("13:00", 139, 30.3),
+        ]
+        cells = _PageIndex(words, columns).assign()
+
+        # 出現順ではなく座標で割り当てる。x=130 は 2日目と3日目の中点なので左の列
+        self.assertEqual(
+            cells["123456"],
+            [("end", 2, "18:00"), ("start", 1, "09:00"), ("start", 2, "公休")],
+        )
+        self.assertEqual(cells["654321"], [("start", 3, "13:00")])
+
 
 if __name__ == "__main__":
     unittest.main()
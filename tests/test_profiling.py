@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import unittest
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class ProfilingTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping profiling tests.")
+
+    def test_disabled_spans_record_nothing(self) -> None:
+        from analytics.profiling import current_profile, profile_run, span
+
+        with profile_run(enabled=False) as profile:
+            self.assertIsNone(profile)
+            self.assertIsNone(current_profile())
+            # 無効時は共有オブジェクトを返すだけ
+            self.assertIs(span("a"), span("b"))
+            with span("a") as current:
+                current.add(rows=10)
+
+    def test_records_nested_spans_with_counts(self) -> None:
+        from analytics.profiling import profile_run, span, timed, timed_iter
+
+        @timed("square")
+        def square(values):
+            return [value * value for value in values]
+
+        with profile_run(label="test") as profile:
+            with span("outer", pages=2) as outer:
+                square([1, 2, 3])
+                outer.add(rows=5, pages=1)
+            items = list(timed_iter("chunks", iter([[1, 2], [3]]), rows=len))
+
+        self.assertEqual(items, [[1, 2], [3]])
+        self.assertEqual(
+            [(span.name, span.depth, span.rows, span.pages) for span in profile.spans],
+            [("outer", 0, 5, 3), ("square", 1, 3, None), ("chunks", 0, 2, None), ("chunks", 0, 1, None)],
+        )
+        outer_span, inner_span = profile.spans[:2]
+        self.assertGreaterEqual(inner_span.start, outer_span.start)
+        self.assertLessEqual(inner_span.seconds, outer_span.seconds)
+        self.assertGreaterEqual(profile.total_seconds, outer_span.seconds)
+
+        summary = profile.summary().set_index("name")
+        self.assertEqual(int(summary.loc["chunks", "calls"]), 2)
+        self.assertEqual(int(summary.loc["chunks", "rows"]), 3)
+        self.assertTrue(pd.isna(summary.loc["square", "pages"]))
+
+        payload = json.loads(profile.to_json())
+        self.assertEqual(payload["label"], "test")
+        self.assertEqual(len(payload["spans"]), 4)
+
+    def test_cprofile_capture(self) -> None:
+        from analytics.profiling import profile_run
+        from analytics.stats import build_shift_frame, compute_all_stats
+        from benchmarks.workload import generate_workload
+
+        shift_df = build_shift_frame(generate_workload(10))
+        with profile_run(cprofile=True) as profile:
+            compute_all_stats(shift_df)
+
+        names = [span.name for span in profile.spans]
+        self.assertIn("stats.compute_all_stats", names)
+        self.assertIn("compute_all_stats", profile.cprofile_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
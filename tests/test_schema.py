@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import unittest
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class CompactSchemaTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping schema tests.")
+        from analytics.stats import build_shift_frame
+        from benchmarks.workload import generate_workload
+
+        self.shift_df = build_shift_frame(generate_workload(30, months=2, start_month="2025-11", seed=3))
+
+    def test_dtypes_follow_schema(self) -> None:
+        from analytics.schema import COMPACT_DTYPES, to_compact_frame
+
+        compact = to_compact_frame(self.shift_df)
+        for column, dtype in COMPACT_DTYPES.items():
+            with self.subTest(column=column):
+                self.assertEqual(str(compact[column].dtype), str(pd.api.types.pandas_dtype(dtype)))
+        first = self.shift_df["start_time"].first_valid_index()
+        self.assertEqual(compact["start_time"][first], self._minutes(self.shift_df["start_time"][first]))
+
+    def test_every_stats_function_matches_standard_frame(self) -> None:
+        from analytics import stats
+        from analytics.schema import to_compact_frame
+
+        compact = to_compact_frame(self.shift_df)
+        for name in (
+            "weekly_employee_stats",
+            "weekly_team_stats",
+            "weekday_slot_stats",
+            "weekday_slot_stats_working",
+            "weekday_na_counts",
+        ):
+            func = getattr(stats, name)
+            with self.subTest(function=name):
+                pd.testing.assert_frame_equal(func(compact), func(self.shift_df))
+
+        bundle = stats.compute_all_stats(compact)
+        pd.testing.assert_frame_equal(bundle.weekly_team, stats.weekly_team_stats(self.shift_df))
+
+        raw = compact.drop(columns=["slot", "is_half"])
+        reclassified = stats.classify_slots(raw, stats.ShiftParseConfig(full_threshold_minutes=300))
+        expected = stats.classify_slots(self.shift_df.drop(columns=["slot", "is_half"]), stats.ShiftParseConfig(full_threshold_minutes=300))
+        self.assertEqual(reclassified["slot"].tolist(), expected["slot"].tolist())
+        self.assertEqual(reclassified["is_half"].tolist(), expected["is_half"].tolist())
+
+    def test_round_trip_and_memory(self) -> None:
+        from analytics.schema import from_compact_frame, memory_per_record, to_compact_frame
+
+        compact = to_compact_frame(self.shift_df)
+        restored = from_compact_frame(compact)
+        # 時刻は "9:30" → "09:30" のようにゼロ埋めに正規化される
+        pd.testing.assert_frame_equal(
+            restored.drop(columns=["start_time", "end_time"]),
+            self.shift_df.drop(columns=["start_time", "end_time"]),
+            check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(to_compact_frame(restored), compact)
+        self.assertLess(memory_per_record(compact), memory_per_record(self.shift_df) / 3)
+
+    @staticmethod
+    def _minutes(value: str) -> int:
+        hour, minute = value.split(":")
+        return int(hour) * 60 + int(minute)
+
+
+if __name__ == "__main__":
+    unittest.main()
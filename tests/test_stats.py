@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import random
+import unittest
+from datetime import date, timedelta
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+if pd is not None:
+    from analytics.models import WeekdaySlotStats, WeeklyEmployeeStats, WeeklyTeamStats
+    from analytics.stats import WEEKDAY_LABELS, WORKING_SLOTS_ORDER
+
+SAMPLE_ROWS = [
+    {"employee_id": "101", "date": date(2025, 12, 1), "start_time": "09:00", "end_time": "18:00"},
+    {"employee_id": "101", "date": date(2025, 12, 2), "start_time": "09:00", "end_time": "13:00"},
+    {"employee_id": "101", "date": date(2025, 12, 3), "start_time": "13:30", "end_time": "17:00"},
+    {"employee_id": "101", "date": date(2025, 12, 6), "raw_status": "公休"},
+    {"employee_id": 102, "date": "2025-12-04", "start_time": "10:00", "end_time": "12:00"},
+    {"employee_id": 102, "date": "2025-12-05", "start_time": "22:00", "end_time": "06:00"},
+    {"employee_id": 102, "date": "2025-12-31", "start_time": "bad", "end_time": "18:00"},
+    {"employee_id": 103, "date": None, "start_time": "09:00", "end_time": "18:00"},
+]
+
+
+# --- 集計関数の旧実装（リファクタリング前の挙動を固定するリファレンス） ---
+
+
+def _legacy_weekly_employee_stats(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=[f.name for f in WeeklyEmployeeStats.__dataclass_fields__.values()])
+
+    grouped = df.groupby(["employee_id", "week_index"])
+    agg = grouped.agg(
+        week_minutes=("minutes", "sum"),
+        week_workdays=("minutes", lambda s: (s > 0).sum()),
+        week_half_days=("is_half", "sum"),
+        week_start_date=("date", lambda s: (s.min() - timedelta(days=s.min().weekday()))),
+    ).reset_index()
+
+    agg["week_hours"] = (agg["week_minutes"] / 60).round(2)
+    agg["week_half_ratio"] = agg.apply(
+        lambda row: row["week_half_days"] / row["week_workdays"] if row["week_workdays"] else 0.0,
+        axis=1,
+    )
+
+    return agg[
+        [
+            "employee_id",
+            "week_index",
+            "week_start_date",
+            "week_minutes",
+            "week_hours",
+            "week_workdays",
+            "week_half_days",
+            "week_half_ratio",
+        ]
+    ].sort_values(["employee_id", "week_index"])
+
+
+def _legacy_weekly_team_stats(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=[f.name for f in WeeklyTeamStats.__dataclass_fields__.values()])
+
+    agg = df.groupby("week_index").agg(
+        total_minutes=("minutes", "sum"),
+        total_hours=("minutes", lambda s: (s.sum() / 60).round(2)),
+        week_start_date=("date", lambda s: (s.min() - timedelta(days=s.min().weekday()))),
+        employee_count=("employee_id", lambda s: s.nunique()),
+    ).reset_index()
+    agg["avg_hours_per_employee"] = agg.apply(
+        lambda row: row["total_hours"] / row["employee_count"] if row["employee_count"] else 0.0,
+        axis=1,
+    )
+    return agg[
+        [
+            "week_index",
+            "week_start_date",
+            "total_minutes",
+            "total_hours",
+            "avg_hours_per_employee",
+        ]
+    ].sort_values("week_index")
+
+
+def _legacy_weekday_slot_stats(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return pd.DataFrame(columns=[f.name for f in WeekdaySlotStats.__dataclass_fields__.values()])
+
+    weekday_df = df[df["is_weekday"]].copy()
+    if weekday_df.empty:
+        return pd.DataFrame(columns=[f.name for f in WeekdaySlotStats.__dataclass_fields__.values()])
+
+    grouped = weekday_df.groupby(["weekday", "slot"]).size().reset_index(name="count")
+    total_by_weekday = weekday_df.groupby("weekday").size().rename("total")
+    grouped = grouped.merge(total_by_weekday, on="weekday", how="left")
+    grouped["ratio_in_day"] = grouped["count"] / grouped["total"]
+
+    return grouped[["weekday", "slot", "count", "ratio_in_day"]].sort_values(["weekday", "slot"])
+
+
+def _legacy_weekday_slot_stats_working(df: pd.DataFrame) -> pd.DataFrame:
+    """曜日×時間帯（勤務ありのみ）を集計。
+
+    - 対象: minutes > 0 かつ slot in {"AM半日","Full","PM半日"}
+    - 表示: 平日（月〜金）のみ
+    - ratio_in_day: 同一weekday内（勤務あり）の構成比
+    """
+
+    columns = [f.name for f in WeekdaySlotStats.__dataclass_fields__.values()]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    working_df = df[(df["minutes"] > 0) & (df["slot"].isin(WORKING_SLOTS_ORDER))].copy()
+    working_df = working_df[working_df["is_weekday"]]
+    if working_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # 全weekday×slot を作って 0 埋め（表示が安定する）
+    full_index = pd.MultiIndex.from_product(
+        [WEEKDAY_LABELS[:5], WORKING_SLOTS_ORDER],
+        names=["weekday", "slot"],
+    )
+    counts = working_df.groupby(["weekday", "slot"]).size().reindex(full_index, fill_value=0)
+    grouped = counts.reset_index(name="count")
+    totals = grouped.groupby("weekday")["count"].transform("sum")
+    grouped["ratio_in_day"] = grouped["count"].div(totals.where(totals > 0, 1))
+    grouped.loc[totals == 0, "ratio_in_day"] = 0.0
+
+    # 並び順を固定
+    grouped["weekday"] = pd.Categorical(grouped["weekday"], categories=WEEKDAY_LABELS[:5], ordered=True)
+    grouped["slot"] = pd.Categorical(grouped["slot"], categories=WORKING_SLOTS_ORDER, ordered=True)
+    return grouped[["weekday", "slot", "count", "ratio_in_day"]].sort_values(["weekday", "slot"])
+
+
+def _legacy_weekday_na_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """NA（非勤務）だけの件数を曜日別に集計。
+
+    対象: minutes == 0 かつ 平日(is_weekday==True)
+    """
+
+    if df.empty:
+        return pd.DataFrame(columns=["weekday", "count"])
+
+    na_df = df[(df["minutes"] == 0) & (df["is_weekday"])].copy()
+    if na_df.empty:
+        return pd.DataFrame(columns=["weekday", "count"])
+
+    counts = (
+        na_df.groupby("weekday")
+        .size()
+        .reindex(WEEKDAY_LABELS[:5], fill_value=0)
+        .reset_index(name="count")
+    )
+    counts["weekday"] = pd.Categorical(counts["weekday"], categories=WEEKDAY_LABELS[:5], ordered=True)
+    return counts[["weekday", "count"]].sort_values("weekday")
+
+
+def _random_rows(seed: int, employees: int = 40, days: int = 62):
+    rng = random.Random(seed)
+    start = date(2025, 11, 1)
+    starts = ["09:00", "09:30", "10:00", "13:30", "14:00", "22:00", None]
+    ends = ["12:00", "13:00", "14:30", "17:00", "18:00", "06:00", None]
+    rows = []
+    for emp in range(employees):
+        for offset in range(days):
+            if rng.random() < 0.2:
+                continue
+            row = {"employee_id": f"E{emp:04d}", "date": start + timedelta(days=offset)}
+            if rng.random() < 0.15:
+                row["raw_status"] = rng.choice(["公休", "非番", "休"])
+            else:
+                row["start_time"] = rng.choice(starts)
+                row["end_time"] = rng.choice(ends)
+            rows.append(row)
+    return rows
+
+
+class BuildShiftFrameTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping stats tests.")
+
+    def test_matches_record_based_builder(self) -> None:
+        from analytics.stats import (
+            ShiftParseConfig,
+            build_shift_frame,
+            build_shift_records_from_rows,
+            to_dataframe,
+        )
+
+        for config in (ShiftParseConfig(), ShiftParseConfig(full_threshold_minutes=200, half_min_minutes=100)):
+            with self.subTest(config=config):
+                expected = to_dataframe(build_shift_records_from_rows(SAMPLE_ROWS, config))
+                actual = build_shift_frame(SAMPLE_ROWS, config)
+                pd.testing.assert_frame_equal(actual, expected)
+
+    def test_accepts_dataframe_and_empty_input(self) -> None:
+        from analytics.stats import SHIFT_RECORD_COLUMNS, build_shift_frame
+
+        from_rows = build_shift_frame(SAMPLE_ROWS)
+        from_frame = build_shift_frame(pd.DataFrame(SAMPLE_ROWS))
+        self.assertEqual(from_rows["minutes"].tolist(), from_frame["minutes"].tolist())
+        self.assertEqual(from_rows["slot"].tolist(), from_frame["slot"].tolist())
+
+        empty = build_shift_frame([])
+        self.assertTrue(empty.empty)
+        self.assertEqual(list(empty.columns), SHIFT_RECORD_COLUMNS)
+
+    def test_classify_slots_on_raw_frame(self) -> None:
+        from analytics.stats import (
+            RAW_SHIFT_COLUMNS,
+            ShiftParseConfig,
+            build_raw_shift_frame,
+            build_shift_frame,
+            classify_slots,
+        )
+
+        raw = build_raw_shift_frame(SAMPLE_ROWS)
+        self.assertEqual(list(raw.columns), RAW_SHIFT_COLUMNS)
+        for config in (ShiftParseConfig(), ShiftParseConfig(full_threshold_minutes=120, half_min_minutes=60)):
+            with self.subTest(config=config):
+                pd.testing.assert_frame_equal(classify_slots(raw, config), build_shift_frame(SAMPLE_ROWS, config))
+
+
+class AggregationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping stats tests.")
+
+    def _frames(self):
+        from analytics.stats import build_shift_frame
+
+        yield "sample", build_shift_frame(SAMPLE_ROWS)
+        for seed in range(3):
+            yield f"random-{seed}", build_shift_frame(_random_rows(seed))
+        yield "empty", build_shift_frame([])
+
+    def test_stats_bundle_matches_legacy_functions(self) -> None:
+        from analytics.stats import compute_all_stats
+
+        for name, df in self._frames():
+            with self.subTest(frame=name):
+                bundle = compute_all_stats(df)
+                pd.testing.assert_frame_equal(bundle.weekly_employee, _legacy_weekly_employee_stats(df))
+                pd.testing.assert_frame_equal(bundle.weekly_team, _legacy_weekly_team_stats(df))
+                pd.testing.assert_frame_equal(bundle.weekday_slot, _legacy_weekday_slot_stats(df))
+                pd.testing.assert_frame_equal(bundle.weekday_slot_working, _legacy_weekday_slot_stats_working(df))
+                pd.testing.assert_frame_equal(bundle.weekday_na, _legacy_weekday_na_counts(df))
+
+    def test_weekly_stats_match_legacy_on_random_data(self) -> None:
+        from analytics.stats import build_shift_frame, weekly_employee_stats, weekly_team_stats
+
+        for seed in range(10, 20):
+            rows = _random_rows(seed, employees=random.Random(seed).randint(1, 60), days=random.Random(seed).randint(1, 90))
+            df = build_shift_frame(rows)
+            with self.subTest(seed=seed):
+                pd.testing.assert_frame_equal(weekly_employee_stats(df), _legacy_weekly_employee_stats(df))
+                pd.testing.assert_frame_equal(weekly_team_stats(df), _legacy_weekly_team_stats(df))
+
+    def test_compute_all_stats_is_memoized_per_frame(self) -> None:
+        from analytics.stats import build_shift_frame, compute_all_stats
+
+        df = build_shift_frame(SAMPLE_ROWS)
+        self.assertIs(compute_all_stats(df), compute_all_stats(df))
+        self.assertIsNot(compute_all_stats(df), compute_all_stats(df.copy()))
+
+
+class ShiftRecordBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping model tests.")
+
+    def test_batch_matches_record_objects(self) -> None:
+        from analytics.models import ShiftRecordBatch, records_to_dicts
+        from analytics.stats import build_shift_record_batch, build_shift_records_from_rows, to_dataframe
+
+        records = build_shift_records_from_rows(SAMPLE_ROWS)
+        batch = build_shift_record_batch(SAMPLE_ROWS)
+
+        self.assertEqual(len(batch), len(records))
+        self.assertEqual(list(batch), records)
+        self.assertEqual(batch[-1], records[-1])
+        self.assertEqual(records_to_dicts(batch), records_to_dicts(records))
+        pd.testing.assert_frame_equal(to_dataframe(batch), to_dataframe(records))
+        self.assertEqual(list(ShiftRecordBatch.from_records(records)), records)
+
+    def test_records_are_slotted(self) -> None:
+        from analytics.stats import build_shift_record_batch
+
+        record = build_shift_record_batch(SAMPLE_ROWS)[0]
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(record.to_dict()["employee_id"], "101")
+
+    def test_empty_and_invalid_batches(self) -> None:
+        from analytics.models import ShiftRecordBatch
+        from analytics.stats import SHIFT_RECORD_COLUMNS, build_shift_record_batch
+
+        empty = build_shift_record_batch([])
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(list(empty.to_frame().columns), SHIFT_RECORD_COLUMNS)
+        with self.assertRaises(IndexError):
+            empty[0]
+        with self.assertRaises(ValueError):
+            ShiftRecordBatch({"employee_id": ["1"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
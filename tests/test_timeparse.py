@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import unittest
+from datetime import date
+
+try:
+    import pandas as pd
+except ImportError:  # 環境に依存するため、無ければテストをスキップ
+    pd = None
+
+
+class TimeParseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        if pd is None:
+            self.skipTest("pandas not installed; skipping time parsing tests.")
+
+    def test_parses_padded_and_unpadded_tokens(self) -> None:
+        from analytics.timeparse import parse_hhmm_to_minutes
+
+        cases = {"9:00": 540, "09:00": 540, " 9:30 ": 570, "0:05": 5, "26:00": 1560, "9:5": None, "24:60": None,
+                 "abc": None, "": None, None: None, 480: 480}
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(parse_hhmm_to_minutes(value), expected)
+
+    def test_series_round_trip(self) -> None:
+        from analytics.timeparse import minutes_to_hhmm_series, parse_hhmm_series
+
+        values = pd.Series(["9:00", "18:30", None, "x", "9:00"], dtype=object)
+        minutes = parse_hhmm_series(values)
+        self.assertEqual(minutes.tolist()[:2], [540.0, 1110.0])
+        self.assertTrue(minutes.iloc[2:4].isna().all())
+        self.assertEqual(minutes_to_hhmm_series(minutes).tolist()[:2], ["09:00", "18:30"])
+        # 数値列（コンパクト表現）はそのまま
+        self.assertEqual(parse_hhmm_series(pd.Series([540, None], dtype="Int16")).tolist()[0], 540.0)
+
+    def test_slots_compare_times_as_minutes(self) -> None:
+        from analytics.stats import ShiftParseConfig, build_shift_frame, build_shift_records_from_rows
+
+        rows = [
+            # 文字列比較では "9:30" > "14:30" となり PM と誤判定されていた
+            {"employee_id": "1", "date": "2025-12-01", "start_time": "5:30", "end_time": "9:30"},
+            {"employee_id": "1", "date": "2025-12-02", "start_time": "14:00", "end_time": "18:00"},
+            {"employee_id": "1", "date": "2025-12-03", "start_time": "10:00", "end_time": "14:00"},
+        ]
+        expected = [
+            (ShiftParseConfig(), ["AM半日", "PM半日", "AM半日"]),
+            (ShiftParseConfig(am_end_minutes=13 * 60), ["AM半日", "PM半日", "PM半日"]),
+        ]
+        for config, slots in expected:
+            with self.subTest(config=config):
+                self.assertEqual(build_shift_frame(rows, config)["slot"].tolist(), slots)
+                self.assertEqual([record.slot for record in build_shift_records_from_rows(rows, config)], slots)
+
+    def test_overnight_duration(self) -> None:
+        from analytics.stats import ShiftParseConfig, build_shift_record
+
+        record = build_shift_record("1", date(2025, 12, 1), "22:00", "6:00", None, ShiftParseConfig())
+        self.assertEqual((record.minutes, record.slot), (480, "Full"))
+
+
+if __name__ == "__main__":
+    unittest.main()